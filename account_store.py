@@ -0,0 +1,270 @@
+import itertools
+import json
+import os
+import threading
+import time
+import weakref
+import zlib
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, Optional, Set, Tuple
+
+_CROCKFORD = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+
+# Live generators, so a forked child stops continuing its parent's sequence
+_generators: 'weakref.WeakSet[ULIDGenerator]' = weakref.WeakSet()
+
+
+class AccountError(Exception):
+    """A write was refused; the account is left unchanged"""
+
+
+class UnknownAccount(AccountError):
+    """No account has this number"""
+
+
+class InsufficientFunds(AccountError):
+    """A debit would take the balance below zero"""
+
+
+class ULIDGenerator:
+    """ULID-style ids: a 48-bit millisecond timestamp then 80 random bits, as 26 Crockford base32 characters
+
+    Ids sort in creation order. Within one millisecond, or if the clock steps back,
+    the random part is incremented instead of redrawn, so ids from one generator
+    are strictly increasing and never repeat, however many threads ask at once.
+    """
+    
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self.clock = clock
+        self._last_ms = -1
+        self._random = 0
+        self._lock = threading.Lock()
+        _generators.add(self)
+    
+    def __call__(self) -> str:
+        with self._lock:
+            ms = int(self.clock() * 1000)
+            if ms > self._last_ms:
+                self._last_ms = ms
+                self._random = int.from_bytes(os.urandom(10), 'big')
+            else:
+                self._random += 1
+                if self._random >> 80:
+                    # 2**80 ids in one millisecond: borrow the next one
+                    self._last_ms += 1
+                    self._random = 0
+            value = self._last_ms << 80 | self._random
+        chars = []
+        for _ in range(26):
+            chars.append(_CROCKFORD[value & 31])
+            value >>= 5
+        return ''.join(reversed(chars))
+
+
+def _reset_after_fork():
+    # Parent and child would otherwise count up from the same random part within a millisecond
+    for generator in list(_generators):
+        generator._lock = threading.Lock()
+        generator._last_ms = -1
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+class WriteAheadLog:
+    """Append-only JSON-lines log of account writes, replayed to rebuild the store after a restart
+
+    Every record is flushed to the OS before the write it describes is applied, so
+    a crashed process loses nothing. With fsync=True it also survives power loss;
+    concurrent writers then share fsyncs (group commit): one syncs the file for
+    everything appended so far while the others wait for it rather than queueing
+    their own.
+    """
+    
+    def __init__(self, path: str, fsync: bool = False):
+        self.path = path
+        self.fsync = fsync
+        self._file = open(path, 'ab')
+        self._appended = 0
+        self._synced = 0
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self.stats = {"records": 0, "fsyncs": 0}
+    
+    def append(self, record: Dict):
+        line = (json.dumps(record, separators=(',', ':')) + '\n').encode('utf-8')
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            self._appended += 1
+            ticket = self._appended
+            self.stats["records"] += 1
+        if self.fsync:
+            self._sync(ticket)
+    
+    def _sync(self, ticket: int):
+        with self._sync_lock:
+            if self._synced >= ticket:
+                return
+            with self._lock:
+                covered = self._appended
+            os.fsync(self._file.fileno())
+            self._synced = covered
+            self.stats["fsyncs"] += 1
+    
+    def records(self) -> Iterator[Dict]:
+        """Replay the log from the start, stopping at a torn final line"""
+        with open(self.path, 'rb') as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    return
+    
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class AccountStore:
+    """Thread-safe account records: per-shard locks, atomic read-modify-write, optional write-ahead log
+
+    Accounts hash onto `shards` re-entrant locks, so writes to unrelated accounts
+    rarely contend. Writes touching two accounts take both shard locks in index
+    order, which rules out deadlock. Reads return copies, so callers never see a
+    record change under them; each record's "version" changes on every write to
+    it, so anything derived from a copy can tell when it is stale. Callers may
+    hold locked() across several calls to make them one atomic step.
+    """
+    
+    def __init__(self, accounts: Optional[Dict[str, Dict]] = None, shards: int = 64,
+                 wal: Optional[WriteAheadLog] = None, on_replay: Optional[Callable[[Dict], None]] = None):
+        self._locks = [threading.RLock() for _ in range(shards)]
+        # One counter for the whole store, so a replaced record never reuses an old version
+        self._versions = itertools.count(1)
+        self._accounts: Dict[str, Dict] = {}
+        for account in (accounts or {}).values():
+            self._accounts[account["account_number"]] = {**account, "version": next(self._versions)}
+        self._blocked: Dict[str, Set[str]] = {}
+        self.wal = wal
+        if wal is not None:
+            for record in wal.records():
+                self._apply(record)
+                if on_replay is not None:
+                    on_replay(record)
+    
+    def __len__(self) -> int:
+        return len(self._accounts)
+    
+    def __contains__(self, account_number: str) -> bool:
+        return account_number in self._accounts
+    
+    def _shard(self, account_number: str) -> int:
+        return zlib.crc32(account_number.encode()) % len(self._locks)
+    
+    def locked(self, *account_numbers: str):
+        """Hold the locks of these accounts' shards, taken in a fixed order"""
+        return self._hold(sorted({self._shard(number) for number in account_numbers}))
+    
+    @contextmanager
+    def _hold(self, shards: Iterable[int]):
+        locks = [self._locks[shard] for shard in shards]
+        for lock in locks:
+            lock.acquire()
+        try:
+            yield
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+    
+    def _log(self, record: Dict):
+        if self.wal is not None:
+            self.wal.append(record)
+    
+    def _apply(self, record: Dict):
+        op = record["op"]
+        if op == "open":
+            account = record["account"]
+            self._accounts[account["account_number"]] = {**account, "version": next(self._versions)}
+        elif op in ("balance", "transfer"):
+            for account_number, balance in record["balances"].items():
+                account = self._accounts[account_number]
+                account["balance"] = balance
+                account["version"] = next(self._versions)
+        elif op == "block_card":
+            self._blocked.setdefault(record["account"], set()).add(record["card"])
+    
+    def _account(self, account_number: str) -> Dict:
+        account = self._accounts.get(account_number)
+        if account is None:
+            raise UnknownAccount(f"Account {account_number} not found")
+        return account
+    
+    def get(self, account_number: str) -> Optional[Dict]:
+        with self.locked(account_number):
+            account = self._accounts.get(account_number)
+            return dict(account) if account is not None else None
+    
+    def credit_score(self, account_number: str) -> int:
+        with self.locked(account_number):
+            account = self._accounts.get(account_number)
+            return account["credit_score"] if account else 0
+    
+    def open_account(self, account: Dict):
+        """Add or replace an account record"""
+        with self.locked(account["account_number"]):
+            record = {"op": "open", "account": account}
+            self._log(record)
+            self._apply(record)
+    
+    def adjust_balance(self, account_number: str, amount: float) -> float:
+        """Add amount (negative to debit) to the balance in one step; the new balance"""
+        with self.locked(account_number):
+            balance = round(self._account(account_number)["balance"] + amount, 2)
+            if balance < 0:
+                raise InsufficientFunds(f"Insufficient funds in account {account_number}")
+            record = {"op": "balance", "balances": {account_number: balance}}
+            self._log(record)
+            self._apply(record)
+            return balance
+    
+    def transfer(self, source: str, destination: str, amount: float, **details) -> Tuple[float, float]:
+        """Move amount between two accounts atomically; both new balances. Details go into the log record"""
+        if amount <= 0:
+            raise AccountError("Transfer amount must be positive")
+        if source == destination:
+            raise AccountError("Cannot transfer to the same account")
+        with self.locked(source, destination):
+            source_balance = round(self._account(source)["balance"] - amount, 2)
+            destination_balance = round(self._account(destination)["balance"] + amount, 2)
+            if source_balance < 0:
+                raise InsufficientFunds(f"Insufficient funds in account {source}")
+            record = {"op": "transfer", "from": source, "to": destination, "amount": amount,
+                      "balances": {source: source_balance, destination: destination_balance}, **details}
+            self._log(record)
+            self._apply(record)
+            return source_balance, destination_balance
+    
+    def block_card(self, account_number: str, card_type: str) -> bool:
+        """Block a card; blocking one that already is blocked succeeds without a new log record"""
+        with self.locked(account_number):
+            if card_type not in self._blocked.get(account_number, ()):
+                record = {"op": "block_card", "account": account_number, "card": card_type}
+                self._log(record)
+                self._apply(record)
+            return True
+    
+    def is_card_blocked(self, account_number: str, card_type: str) -> bool:
+        with self.locked(account_number):
+            return card_type in self._blocked.get(account_number, ())
+    
+    def blocked_cards(self) -> Set[str]:
+        """Every blocked card as an "<account_number>_<card_type>" id"""
+        with self._hold(range(len(self._locks))):
+            return {f"{number}_{card}" for number, cards in self._blocked.items() for card in cards}
+    
+    def snapshot(self) -> Dict[str, Dict]:
+        """Consistent copy of every account, taken with all shard locks held"""
+        with self._hold(range(len(self._locks))):
+            return {number: dict(account) for number, account in self._accounts.items()}
@@ -0,0 +1,283 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+# Seconds each kind of read stays fresh: balances move often, credit scores rarely
+DEFAULT_TTLS = {
+    "account_details": 5.0,
+    "transactions": 30.0,
+    "credit_score": 3600.0,
+}
+
+
+class _Flight:
+    """One in-progress backend read that concurrent identical requests wait on"""
+    
+    __slots__ = ('event', 'result', 'error')
+    
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+def _copy(value):
+    """A copy of a cached account record or transaction list, so no caller can change the cached one"""
+    if isinstance(value, dict):
+        return dict(value)
+    if isinstance(value, list):
+        return [dict(item) if isinstance(item, dict) else item for item in value]
+    return value
+
+
+class CachingBankingAPI:
+    """Read-through cache with single-flight coalescing in front of a MockBankingAPI
+
+    Reads are served from a per-kind TTL cache; concurrent misses for the same key
+    share one backend call (threads wait on an event, coroutines on a future).
+    Writes go straight to the backend and invalidate everything cached for the
+    account; reads that start after a write never join a fetch that started
+    before it. Every read returns its own copy, as the backend does. Anything not
+    wrapped here is delegated to the backend unchanged.
+    """
+    
+    def __init__(self, backend, ttls: Optional[Dict[str, float]] = None, max_entries: int = 100000,
+                 clock: Callable[[], float] = time.monotonic):
+        self.backend = backend
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.max_entries = max_entries
+        self.clock = clock
+        
+        self._entries: "OrderedDict[Hashable, Tuple[float, object]]" = OrderedDict()
+        self._keys_by_account: Dict[str, set] = {}
+        # Bumped on every write, so reads that started before it don't repopulate stale data. Flights
+        # are keyed by it too, so a read after a write starts a fresh fetch instead of joining an old one
+        self._generations: Dict[str, int] = {}
+        self._flights: Dict[Tuple[Hashable, int], _Flight] = {}
+        # Per event loop: a task from one loop cannot be awaited on another
+        self._async_flights: Dict[Tuple[asyncio.AbstractEventLoop, Hashable, int], asyncio.Task] = {}
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "coalesced": 0, "backend_calls": 0, "invalidations": 0}
+    
+    def __getattr__(self, name):
+        return getattr(self.backend, name)
+    
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of reads that did not need their own backend call"""
+        served = self.stats["hits"] + self.stats["coalesced"]
+        total = served + self.stats["misses"]
+        return served / total if total else 0.0
+    
+    def get_account_details(self, account_number: str) -> Optional[Dict]:
+        return self._read("account_details", account_number, ("account_details", account_number),
+                          lambda: self.backend.get_account_details(account_number))
+    
+    def get_transaction_history(self, account_number: str, days: int = 30, limit: Optional[int] = None,
+                                offset: int = 0) -> List[Dict]:
+        key = ("transactions", account_number, days, limit, offset)
+        return self._read("transactions", account_number, key,
+                          lambda: self.backend.get_transaction_history(account_number, days, limit, offset))
+    
+    def check_credit_score(self, account_number: str) -> int:
+        return self._read("credit_score", account_number, ("credit_score", account_number),
+                          lambda: self.backend.check_credit_score(account_number))
+    
+    def get_accounts_details(self, account_numbers: List[str]) -> Dict[str, Optional[Dict]]:
+        return self._read_batch("account_details", account_numbers, self.backend.get_accounts_details)
+    
+    def check_credit_scores(self, account_numbers: List[str]) -> Dict[str, int]:
+        return self._read_batch("credit_score", account_numbers, self.backend.check_credit_scores)
+    
+    async def aget_account_details(self, account_number: str) -> Optional[Dict]:
+        return await self._aread("account_details", account_number, ("account_details", account_number),
+                                 lambda: self.backend.aget_account_details(account_number))
+    
+    async def aget_transaction_history(self, account_number: str, days: int = 30, limit: Optional[int] = None,
+                                       offset: int = 0) -> List[Dict]:
+        key = ("transactions", account_number, days, limit, offset)
+        return await self._aread("transactions", account_number, key,
+                                 lambda: self.backend.aget_transaction_history(account_number, days, limit, offset))
+    
+    async def acheck_credit_score(self, account_number: str) -> int:
+        return await self._aread("credit_score", account_number, ("credit_score", account_number),
+                                 lambda: self.backend.acheck_credit_score(account_number))
+    
+    def block_card(self, account_number: str, card_type: str) -> bool:
+        return self._write([account_number], lambda: self.backend.block_card(account_number, card_type))
+    
+    def apply_loan(self, account_number: str, loan_type: str, amount: float) -> Dict:
+        return self._write([account_number], lambda: self.backend.apply_loan(account_number, loan_type, amount))
+    
+    def transfer(self, from_account: str, to_account: str, amount: float) -> Dict:
+        return self._write([from_account, to_account],
+                           lambda: self.backend.transfer(from_account, to_account, amount))
+    
+    def block_cards(self, cards: List[Tuple[str, str]]) -> List[bool]:
+        return self._write([card[0] for card in cards], lambda: self.backend.block_cards(cards))
+    
+    def apply_loans(self, applications: List[Tuple[str, str, float]]) -> List[Dict]:
+        return self._write([application[0] for application in applications],
+                           lambda: self.backend.apply_loans(applications))
+    
+    async def ablock_card(self, account_number: str, card_type: str) -> bool:
+        return await self._awrite([account_number], lambda: self.backend.ablock_card(account_number, card_type))
+    
+    async def aapply_loan(self, account_number: str, loan_type: str, amount: float) -> Dict:
+        return await self._awrite([account_number],
+                                  lambda: self.backend.aapply_loan(account_number, loan_type, amount))
+    
+    async def atransfer(self, from_account: str, to_account: str, amount: float) -> Dict:
+        return await self._awrite([from_account, to_account],
+                                  lambda: self.backend.atransfer(from_account, to_account, amount))
+    
+    async def ablock_cards(self, cards: List[Tuple[str, str]]) -> List[bool]:
+        return await self._awrite([card[0] for card in cards], lambda: self.backend.ablock_cards(cards))
+    
+    async def aapply_loans(self, applications: List[Tuple[str, str, float]]) -> List[Dict]:
+        return await self._awrite([application[0] for application in applications],
+                                  lambda: self.backend.aapply_loans(applications))
+    
+    def invalidate(self, account_number: str):
+        """Drop everything cached for an account"""
+        with self._lock:
+            self._generations[account_number] = self._generations.get(account_number, 0) + 1
+            for key in self._keys_by_account.pop(account_number, ()):
+                self._entries.pop(key, None)
+            self.stats["invalidations"] += 1
+    
+    def _write(self, account_numbers: List[str], call: Callable[[], object]):
+        """Run a backend write, invalidating its accounts both before and after it lands"""
+        for account_number in account_numbers:
+            self.invalidate(account_number)
+        try:
+            return call()
+        finally:
+            for account_number in account_numbers:
+                self.invalidate(account_number)
+    
+    async def _awrite(self, account_numbers: List[str], call: Callable):
+        for account_number in account_numbers:
+            self.invalidate(account_number)
+        try:
+            return await call()
+        finally:
+            for account_number in account_numbers:
+                self.invalidate(account_number)
+    
+    def _lookup(self, key: Hashable, now: float):
+        """Return (hit, value) for a fresh entry; caller holds the lock"""
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > now:
+            self._entries.move_to_end(key)
+            return True, entry[1]
+        return False, None
+    
+    def _store(self, kind: str, account_number: str, key: Hashable, value, generation: int):
+        """Cache a fetched value unless a write to the account happened meanwhile; caller holds the lock"""
+        if self._generations.get(account_number, 0) != generation:
+            return
+        self._entries[key] = (self.clock() + self.ttls[kind], value)
+        self._entries.move_to_end(key)
+        self._keys_by_account.setdefault(account_number, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            old_key, _ = self._entries.popitem(last=False)
+            keys = self._keys_by_account.get(old_key[1])
+            if keys is not None:
+                keys.discard(old_key)
+    
+    def _read(self, kind: str, account_number: str, key: Hashable, fetch: Callable[[], object]):
+        with self._lock:
+            hit, value = self._lookup(key, self.clock())
+            if hit:
+                self.stats["hits"] += 1
+                return _copy(value)
+            generation = self._generations.get(account_number, 0)
+            flight_key = (key, generation)
+            flight = self._flights.get(flight_key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[flight_key] = _Flight()
+                self.stats["misses"] += 1
+            else:
+                self.stats["coalesced"] += 1
+        
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return _copy(flight.result)
+        
+        try:
+            flight.result = fetch()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self.stats["backend_calls"] += 1
+                self._flights.pop(flight_key, None)
+                if flight.error is None:
+                    self._store(kind, account_number, key, flight.result, generation)
+            flight.event.set()
+        return _copy(flight.result)
+    
+    async def _aread(self, kind: str, account_number: str, key: Hashable, fetch: Callable):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            hit, value = self._lookup(key, self.clock())
+            if hit:
+                self.stats["hits"] += 1
+                return _copy(value)
+            generation = self._generations.get(account_number, 0)
+            flight_key = (loop, key, generation)
+            task = self._async_flights.get(flight_key)
+            if task is not None:
+                self.stats["coalesced"] += 1
+            else:
+                self.stats["misses"] += 1
+                task = self._async_flights[flight_key] = asyncio.ensure_future(
+                    self._afetch(kind, account_number, key, fetch, generation, flight_key))
+        # The fetch runs as its own task, so cancelling any caller, the first one included,
+        # leaves it and every other waiter alone
+        return _copy(await asyncio.shield(task))
+    
+    async def _afetch(self, kind: str, account_number: str, key: Hashable, fetch: Callable, generation: int,
+                      flight_key: Tuple[asyncio.AbstractEventLoop, Hashable, int]):
+        try:
+            result = await fetch()
+            with self._lock:
+                self._store(kind, account_number, key, result, generation)
+            return result
+        finally:
+            with self._lock:
+                self._async_flights.pop(flight_key, None)
+                self.stats["backend_calls"] += 1
+    
+    def _read_batch(self, kind: str, account_numbers: List[str], fetch: Callable[[List[str]], Dict]) -> Dict:
+        """Serve what is cached and fetch only the missing accounts, in one batch call"""
+        results = {}
+        missing = []
+        with self._lock:
+            now = self.clock()
+            generations = {}
+            for account_number in account_numbers:
+                hit, value = self._lookup((kind, account_number), now)
+                if hit:
+                    results[account_number] = _copy(value)
+                    self.stats["hits"] += 1
+                else:
+                    missing.append(account_number)
+                    generations[account_number] = self._generations.get(account_number, 0)
+                    self.stats["misses"] += 1
+        
+        if missing:
+            fetched = fetch(missing)
+            with self._lock:
+                self.stats["backend_calls"] += 1
+                for account_number, value in fetched.items():
+                    self._store(kind, account_number, (kind, account_number), value, generations[account_number])
+            results.update((account_number, _copy(value)) for account_number, value in fetched.items())
+        return {account_number: results[account_number] for account_number in account_numbers}
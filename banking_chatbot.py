@@ -1,20 +1,60 @@
-import google.generativeai as genai
+import asyncio
 import json
-import random
+import logging
 import time
 from datetime import datetime, timedelta
-from typing import Dict, List, Tuple, Optional
-import re
+from typing import AsyncIterator, Dict, Iterator, List, Set, Tuple, Optional
 
-# Configure Google GenAI
-genai.configure(api_key='YOUR_GOOGLE_API_KEY')  # Replace with your actual API key
-model = genai.GenerativeModel('gemini-pro')
+from account_store import AccountError, AccountStore, ULIDGenerator, WriteAheadLog
+from entity_extractor import ExtractedEntities, extract_entities
+from intent_classifier import IntentClassifier
+from intent_router import IntentRouter
+from interaction_log import InteractionLog
+from llm_cache import ResponseCache, normalize_utterance, prompt_fingerprint
+from metrics import Metrics, TimedProxy, estimate_tokens, timed
+from model_provider import GenAIProvider, ModelProvider
+from prompts import classification_prompt, merged_prompt, reasoning_prompt, relevant_fields
+from response_templates import ReplyTemplates, VersionedDict
+from sessions import SessionManager, SessionState
+from transaction_store import TransactionStore
+
+logger = logging.getLogger(__name__)
+
+# The Gemini model is built on first use; set GOOGLE_API_KEY or pass a provider with your key
+default_model_provider = GenAIProvider('gemini-pro')
+
+
+def __getattr__(name: str):
+    # The module-level model used to be created at import; keep banking_chatbot.model working
+    if name == 'model':
+        return default_model_provider.get()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+_JSON_DECODER = json.JSONDecoder()
+
+DEFAULT_REASONING = "I understand you need help with banking services. Let me assist you."
+
+# Classifications made without the model; their turns don't call it for reasoning either,
+# so a bot whose turns all classify locally needs no network at all
+_LOCAL_SOURCES = frozenset(('fast_path', 'local_model', 'fallback'))
+
+# Metric names exported by BankingChatbot.metrics
+STAGE_SECONDS = 'chatbot_stage_duration_seconds'
+LLM_SECONDS = 'chatbot_llm_request_duration_seconds'
+LLM_TOKENS = 'chatbot_llm_tokens'
+LLM_ERRORS = 'chatbot_llm_errors'
+API_SECONDS = 'chatbot_api_call_duration_seconds'
 
 class MockBankingAPI:
     """Mock APIs for banking operations"""
     
-    def __init__(self):
-        self.accounts = {
+    def __init__(self, latency_scale: float = 1.0, shards: int = 64, wal_path: Optional[str] = None,
+                 fsync: bool = False):
+        # Multiplier applied to every simulated round-trip (0 disables the delays)
+        self.latency_scale = latency_scale
+        
+        accounts = {
             "12345678": {
                 "account_number": "12345678",
                 "account_type": "Savings",
@@ -35,53 +75,192 @@ class MockBankingAPI:
             }
         }
         
-        self.transactions = {
-            "12345678": [
-                {"date": "2024-07-25", "type": "Credit", "amount": 5000, "description": "Salary Credit"},
-                {"date": "2024-07-24", "type": "Debit", "amount": 1200, "description": "Online Purchase"},
-                {"date": "2024-07-23", "type": "Debit", "amount": 500, "description": "ATM Withdrawal"},
-                {"date": "2024-07-22", "type": "Credit", "amount": 2000, "description": "Transfer from savings"}
-            ]
-        }
+        # Dated relative to today so the sample history stays inside the default 30-day window
+        def days_ago(days: int) -> str:
+            return (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
         
-        self.interest_rates = {
+        self.transactions = TransactionStore()
+        self.transactions.load_records([
+            {"account_number": "12345678", "date": days_ago(5), "type": "Credit", "amount": 2000, "description": "Transfer from savings"},
+            {"account_number": "12345678", "date": days_ago(4), "type": "Debit", "amount": 500, "description": "ATM Withdrawal"},
+            {"account_number": "12345678", "date": days_ago(3), "type": "Debit", "amount": 1200, "description": "Online Purchase"},
+            {"account_number": "12345678", "date": days_ago(2), "type": "Credit", "amount": 5000, "description": "Salary Credit"}
+        ])
+        
+        # Balances and card state; with a WAL path, writes are logged and replayed on the next start
+        self.store = AccountStore(accounts, shards, WriteAheadLog(wal_path, fsync) if wal_path else None,
+                                  on_replay=self._replay)
+        self.ids = ULIDGenerator()
+        
+        # Versioned, so the rates reply is re-rendered only after a rate changes
+        self.interest_rates = VersionedDict({
             "personal_loan": 10.5,
             "home_loan": 8.75,
             "car_loan": 9.25,
             "savings_account": 4.0,
             "fixed_deposit": 6.5
-        }
-        
-        self.blocked_cards = set()
+        })
+    
+    @property
+    def blocked_cards(self) -> Set[str]:
+        return self.store.blocked_cards()
+    
+    def _simulate_delay(self, seconds: float):
+        """Block for a simulated backend round-trip"""
+        if self.latency_scale > 0:
+            time.sleep(seconds * self.latency_scale)
+    
+    async def _asimulate_delay(self, seconds: float):
+        """Yield to the event loop for a simulated backend round-trip"""
+        if self.latency_scale > 0:
+            await asyncio.sleep(seconds * self.latency_scale)
     
     def get_account_details(self, account_number: str) -> Optional[Dict]:
         """Mock API to get account details"""
-        time.sleep(0.5)  # Simulate API delay
-        return self.accounts.get(account_number)
+        self._simulate_delay(0.5)  # Simulate API delay
+        return self.store.get(account_number)
     
-    def get_transaction_history(self, account_number: str, days: int = 30) -> List[Dict]:
-        """Mock API to get transaction history"""
-        time.sleep(0.5)
-        return self.transactions.get(account_number, [])
+    def get_transaction_history(self, account_number: str, days: int = 30, limit: Optional[int] = None,
+                                offset: int = 0) -> List[Dict]:
+        """Mock API to get transaction history, most recent first"""
+        self._simulate_delay(0.5)
+        return self._history(account_number, days, limit, offset)
     
     def check_credit_score(self, account_number: str) -> int:
         """Mock API to check credit score"""
-        time.sleep(0.5)
-        account = self.accounts.get(account_number)
-        return account["credit_score"] if account else 0
+        self._simulate_delay(0.5)
+        return self._credit_score(account_number)
     
     def block_card(self, account_number: str, card_type: str) -> bool:
         """Mock API to block card"""
-        time.sleep(0.5)
-        card_id = f"{account_number}_{card_type}"
-        self.blocked_cards.add(card_id)
-        return True
+        self._simulate_delay(0.5)
+        return self._block_card(account_number, card_type)
     
     def apply_loan(self, account_number: str, loan_type: str, amount: float) -> Dict:
-        """Mock API for loan application"""
-        time.sleep(1.0)
-        credit_score = self.check_credit_score(account_number)
-        
+        """Mock API for loan application; the credit check happens server-side in the same call"""
+        self._simulate_delay(1.0)
+        return self._loan_decision(loan_type, amount, self._credit_score(account_number))
+    
+    def transfer(self, from_account: str, to_account: str, amount: float) -> Dict:
+        """Mock API to transfer funds between accounts"""
+        self._simulate_delay(1.0)
+        return self._transfer(from_account, to_account, amount)
+    
+    def get_accounts_details(self, account_numbers: List[str]) -> Dict[str, Optional[Dict]]:
+        """Batch API: account details for many accounts in one round-trip"""
+        self._simulate_delay(0.5)
+        return {account_number: self.store.get(account_number) for account_number in account_numbers}
+    
+    def check_credit_scores(self, account_numbers: List[str]) -> Dict[str, int]:
+        """Batch API: credit scores for many accounts in one round-trip"""
+        self._simulate_delay(0.5)
+        return {account_number: self._credit_score(account_number) for account_number in account_numbers}
+    
+    def block_cards(self, cards: List[Tuple[str, str]]) -> List[bool]:
+        """Batch API: block many (account_number, card_type) cards in one round-trip"""
+        self._simulate_delay(0.5)
+        return [self._block_card(account_number, card_type) for account_number, card_type in cards]
+    
+    def apply_loans(self, applications: List[Tuple[str, str, float]]) -> List[Dict]:
+        """Batch API: decide many (account_number, loan_type, amount) applications in one round-trip"""
+        self._simulate_delay(1.0)
+        return [self._loan_decision(loan_type, amount, self._credit_score(account_number))
+                for account_number, loan_type, amount in applications]
+    
+    async def aget_account_details(self, account_number: str) -> Optional[Dict]:
+        """Async mock API to get account details"""
+        await self._asimulate_delay(0.5)
+        return self.store.get(account_number)
+    
+    async def aget_transaction_history(self, account_number: str, days: int = 30, limit: Optional[int] = None,
+                                       offset: int = 0) -> List[Dict]:
+        """Async mock API to get transaction history, most recent first"""
+        await self._asimulate_delay(0.5)
+        return self._history(account_number, days, limit, offset)
+    
+    async def acheck_credit_score(self, account_number: str) -> int:
+        """Async mock API to check credit score"""
+        await self._asimulate_delay(0.5)
+        return self._credit_score(account_number)
+    
+    async def ablock_card(self, account_number: str, card_type: str) -> bool:
+        """Async mock API to block card"""
+        await self._asimulate_delay(0.5)
+        return self._block_card(account_number, card_type)
+    
+    async def aapply_loan(self, account_number: str, loan_type: str, amount: float) -> Dict:
+        """Async mock API for loan application"""
+        await self._asimulate_delay(1.0)
+        return self._loan_decision(loan_type, amount, self._credit_score(account_number))
+    
+    async def atransfer(self, from_account: str, to_account: str, amount: float) -> Dict:
+        """Async mock API to transfer funds between accounts"""
+        await self._asimulate_delay(1.0)
+        return self._transfer(from_account, to_account, amount)
+    
+    async def aget_accounts_details(self, account_numbers: List[str]) -> Dict[str, Optional[Dict]]:
+        """Async batch API: account details for many accounts in one round-trip"""
+        await self._asimulate_delay(0.5)
+        return {account_number: self.store.get(account_number) for account_number in account_numbers}
+    
+    async def acheck_credit_scores(self, account_numbers: List[str]) -> Dict[str, int]:
+        """Async batch API: credit scores for many accounts in one round-trip"""
+        await self._asimulate_delay(0.5)
+        return {account_number: self._credit_score(account_number) for account_number in account_numbers}
+    
+    async def ablock_cards(self, cards: List[Tuple[str, str]]) -> List[bool]:
+        """Async batch API: block many (account_number, card_type) cards in one round-trip"""
+        await self._asimulate_delay(0.5)
+        return [self._block_card(account_number, card_type) for account_number, card_type in cards]
+    
+    async def aapply_loans(self, applications: List[Tuple[str, str, float]]) -> List[Dict]:
+        """Async batch API: decide many (account_number, loan_type, amount) applications in one round-trip"""
+        await self._asimulate_delay(1.0)
+        return [self._loan_decision(loan_type, amount, self._credit_score(account_number))
+                for account_number, loan_type, amount in applications]
+    
+    def _credit_score(self, account_number: str) -> int:
+        """Backend-side credit score lookup, no round-trip"""
+        return self.store.credit_score(account_number)
+    
+    def _block_card(self, account_number: str, card_type: str) -> bool:
+        """Backend-side card block, no round-trip"""
+        return self.store.block_card(account_number, card_type)
+    
+    def _history(self, account_number: str, days: int, limit: Optional[int], offset: int) -> List[Dict]:
+        # Under the account's lock, so a transfer's rows are never seen half-written
+        with self.store.locked(account_number):
+            return self.transactions.recent(account_number, days, limit, offset)
+    
+    def _transfer(self, from_account: str, to_account: str, amount: float) -> Dict:
+        """Backend-side transfer: both balances and both history rows change together, or nothing does"""
+        reference = f"TXN{self.ids()}"
+        today = datetime.now().strftime('%Y-%m-%d')
+        try:
+            with self.store.locked(from_account, to_account):
+                balance, _ = self.store.transfer(from_account, to_account, amount, reference=reference, date=today)
+                self._record_transfer(from_account, to_account, amount, today)
+        except AccountError as e:
+            return {"status": "Failed", "message": str(e), "amount": amount}
+        return {
+            "reference": reference,
+            "status": "Completed",
+            "message": f"₹{amount:,.2f} transferred from account {from_account} to account {to_account}.",
+            "amount": amount,
+            "balance": balance
+        }
+    
+    def _record_transfer(self, from_account: str, to_account: str, amount: float, date_iso: str):
+        self.transactions.add(from_account, date_iso, "Debit", amount, f"Transfer to {to_account}")
+        self.transactions.add(to_account, date_iso, "Credit", amount, f"Transfer from {from_account}")
+    
+    def _replay(self, record: Dict):
+        """Rebuild the history rows of transfers found in the write-ahead log"""
+        if record["op"] == "transfer":
+            self._record_transfer(record["from"], record["to"], record["amount"], record["date"])
+    
+    def _loan_decision(self, loan_type: str, amount: float, credit_score: int) -> Dict:
+        """Decide a loan application from the applicant's credit score"""
         if credit_score >= 700:
             status = "Approved"
             message = f"Congratulations! Your {loan_type} application for ₹{amount:,.2f} has been approved."
@@ -93,62 +272,242 @@ class MockBankingAPI:
             message = f"Unfortunately, your {loan_type} application has been rejected due to low credit score."
         
         return {
-            "application_id": f"LOAN{random.randint(100000, 999999)}",
+            "application_id": f"LOAN{self.ids()}",
             "status": status,
             "message": message,
             "amount": amount,
-            "loan_type": loan_type
+            "loan_type": loan_type,
+            "credit_score": credit_score
         }
 
 class BankingChatbot:
     """Main Banking Chatbot Class implementing Sense -> Reason -> Action -> Learn"""
     
-    def __init__(self):
-        self.api = MockBankingAPI()
-        self.conversation_history = []
-        self.user_context = {}
-        self.learning_data = []
+    def __init__(self, api: Optional[MockBankingAPI] = None, llm=None,
+                 sessions: Optional[SessionManager] = None, router: Optional[IntentRouter] = None,
+                 cache: Optional[ResponseCache] = None, skip_unused_reasoning: bool = False,
+                 interaction_log: Optional[InteractionLog] = None, metrics: Optional[Metrics] = None,
+                 verbose: bool = False, classifier: Optional[IntentClassifier] = None,
+                 model_provider: Optional[ModelProvider] = None, merge_reasoning: bool = False,
+                 locale: str = 'en'):
+        # Timings and token counts; pass Metrics(enabled=False) to turn them off
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.metrics.describe(STAGE_SECONDS, "Time spent in each Sense/Reason/Action/Learn stage")
+        self.metrics.describe(LLM_SECONDS, "Model request latency")
+        self.metrics.describe(LLM_TOKENS, "Model tokens, as reported by the model or estimated from text length")
+        self.metrics.describe(LLM_ERRORS, "Model requests that raised")
+        self.metrics.describe(API_SECONDS, "Banking API call latency")
+        # Debug output for the interactive CLI; kept off the hot path otherwise
+        self.verbose = verbose
         
-    def sense(self, user_input: str) -> Dict:
-        """Sense: Understand user input and extract intent"""
+        # Both collaborators are injectable so tests and benchmarks can stub them out
+        self.api = api or MockBankingAPI()
+        if self.metrics.enabled:
+            self.api = TimedProxy(self.api, self.metrics, API_SECONDS)
+        # An explicit llm wins; otherwise the provider builds the model the first time one is needed
+        self._llm = llm
+        self.model_provider = model_provider if model_provider is not None else default_model_provider
+        self.router = router if router is not None else IntentRouter()
+        # Optional on-box model consulted after the keyword router and before the LLM
+        self.classifier = classifier
+        self.cache = cache if cache is not None else ResponseCache()
         
-        # Use GenAI to classify intent and extract entities
-        classification_prompt = f"""
-        Analyze this banking customer query and classify it into one of these categories:
-        1. BASIC_QUERY - General questions about services, rates, charges
-        2. ACCOUNT_QUERY - Balance inquiry, transaction history, account details
-        3. SPECIFIC_TASK - Loan application, card blocking, specific actions
+        # The reasoning text is only informational; action() works from the plan alone
+        self.skip_unused_reasoning = skip_unused_reasoning
+        # Ask for the classification and the reasoning in one model call instead of two
+        self.merge_reasoning = merge_reasoning
         
-        User Query: "{user_input}"
+        # The pipeline itself is stateless; per-customer state lives in sessions
+        self.sessions = sessions if sessions is not None else SessionManager()
+        self.session = SessionState('default', self.sessions.history_limit)  # used when no session id is given
         
-        Return a JSON response with:
-        - category: one of the three categories above
-        - intent: specific intent (balance_inquiry, loan_application, card_blocking, etc.)
-        - entities: any account numbers, amounts, or specific details mentioned
-        - confidence: confidence score 0-1
+        # Reply texts for this locale, pre-rendered where possible
+        self.replies = ReplyTemplates(locale)
         
-        JSON Response:
+        # Bounded in memory; pass an InteractionLog with a directory to keep the full record on disk
+        self.interaction_log = interaction_log if interaction_log is not None else InteractionLog()
+    
+    @property
+    def llm(self):
+        if self._llm is None:
+            self._llm = self.model_provider.get()
+        return self._llm
+    
+    @llm.setter
+    def llm(self, llm):
+        self._llm = llm
+    
+    @property
+    def learning_data(self):
+        """The most recent interactions still held in memory"""
+        return self.interaction_log.recent
+    
+    @property
+    def user_context(self) -> Dict:
+        """Context of the default session"""
+        return self.session.user_context
+    
+    @user_context.setter
+    def user_context(self, context: Dict):
+        self.session.user_context = context
+    
+    @property
+    def conversation_history(self):
+        """Conversation history of the default session"""
+        return self.session.conversation_history
+    
+    @timed(STAGE_SECONDS, stage='sense')
+    def sense(self, user_input: str, context: Optional[Dict] = None) -> Dict:
+        """Sense: Understand user input and extract intent
+
+        With merge_reasoning and the session context given, the same model call
+        also returns the reasoning text, which reason() then uses.
         """
         
+        # Unambiguous queries are classified locally without a model round-trip
+        routed = self._route_locally(user_input)
+        if routed is not None:
+            return routed
+        
+        cache_key = self._classification_cache_key(user_input)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return json.loads(cached)
+        
+        # Use GenAI to classify intent and extract entities
+        prompt, kind = self._sense_prompt(user_input, context)
+        
         try:
-            response = model.generate_content(classification_prompt)
-            # Parse the response to extract structured data
-            response_text = response.text.strip()
-            
-            # Extract JSON from response
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-            if json_match:
-                classification = json.loads(json_match.group())
-            else:
-                # Fallback classification
-                classification = self._fallback_classification(user_input)
-                
+            response = self._generate(prompt, kind)
+            classification = self._parse_classification(response.text)
         except Exception as e:
-            print(f"GenAI classification error: {e}")
-            classification = self._fallback_classification(user_input)
+            if self.verbose:
+                print(f"GenAI classification error: {e}")
+            return self._local_classification(user_input)
         
+        return self._remember_classification(cache_key, classification, user_input, context)
+    
+    @timed(STAGE_SECONDS, stage='sense')
+    async def asense(self, user_input: str, context: Optional[Dict] = None) -> Dict:
+        """Sense (async): Understand user input without blocking the event loop"""
+        
+        routed = self._route_locally(user_input)
+        if routed is not None:
+            return routed
+        
+        cache_key = self._classification_cache_key(user_input)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return json.loads(cached)
+        
+        prompt, kind = self._sense_prompt(user_input, context)
+        
+        try:
+            response = await self._agenerate(prompt, kind)
+            classification = self._parse_classification(response.text)
+        except Exception as e:
+            if self.verbose:
+                print(f"GenAI classification error: {e}")
+            return self._local_classification(user_input)
+        
+        return self._remember_classification(cache_key, classification, user_input, context)
+    
+    def _route_locally(self, user_input: str) -> Optional[Dict]:
+        """Keyword fast path first, then the local classifier if one is configured"""
+        routed = self.router.route(user_input)
+        if routed is None and self.classifier is not None:
+            routed = self.classifier.route(user_input)
+        return routed
+    
+    def _generate(self, prompt: str, kind: str):
+        """Call the model, recording latency and token counts under this kind of request"""
+        try:
+            with self.metrics.timer(LLM_SECONDS, kind=kind):
+                response = self.llm.generate_content(prompt)
+        except Exception as e:
+            self.metrics.inc(LLM_ERRORS, kind=kind, error=type(e).__name__)
+            raise
+        self._count_tokens(kind, prompt, response)
+        return response
+    
+    async def _agenerate(self, prompt: str, kind: str):
+        """Call the model's native async API, or run the sync call off the event loop"""
+        try:
+            with self.metrics.timer(LLM_SECONDS, kind=kind):
+                if hasattr(self.llm, 'generate_content_async'):
+                    response = await self.llm.generate_content_async(prompt)
+                else:
+                    response = await asyncio.to_thread(self.llm.generate_content, prompt)
+        except Exception as e:
+            self.metrics.inc(LLM_ERRORS, kind=kind, error=type(e).__name__)
+            raise
+        self._count_tokens(kind, prompt, response)
+        return response
+    
+    def _count_tokens(self, kind: str, prompt: str, response):
+        """Use the model's reported usage when it has one, otherwise estimate from the text"""
+        if not self.metrics.enabled:
+            return
+        usage = getattr(response, 'usage_metadata', None)
+        prompt_tokens = getattr(usage, 'prompt_token_count', None)
+        completion_tokens = getattr(usage, 'candidates_token_count', None)
+        if prompt_tokens is None:
+            prompt_tokens = estimate_tokens(prompt)
+        if completion_tokens is None:
+            try:
+                completion_tokens = estimate_tokens(response.text)
+            except Exception:
+                completion_tokens = 0
+        self.metrics.inc(LLM_TOKENS, prompt_tokens, kind=kind, direction='prompt')
+        self.metrics.inc(LLM_TOKENS, completion_tokens, kind=kind, direction='completion')
+    
+    def _sense_prompt(self, user_input: str, context: Optional[Dict]) -> Tuple[str, str]:
+        """The prompt for sense() and the kind its tokens are counted under"""
+        if self.merge_reasoning and not self.skip_unused_reasoning and context is not None:
+            return merged_prompt(user_input, context), 'sense_reason'
+        return self._classification_prompt(user_input), 'sense'
+    
+    def _classification_prompt(self, user_input: str) -> str:
+        """Build the intent classification prompt for the model"""
+        return classification_prompt(user_input)
+    
+    def _parse_classification(self, response_text: str) -> Optional[Dict]:
+        """Parse the structured classification out of the model's reply, None if it has none"""
+        response_text = response_text.strip()
+        
+        # The first JSON object in the reply, ignoring any prose or code fences around it
+        start = response_text.find('{')
+        if start < 0:
+            return None
+        classification, _ = _JSON_DECODER.raw_decode(response_text, start)
+        return classification if isinstance(classification, dict) else None
+    
+    def _classification_cache_key(self, user_input: str) -> str:
+        """Queries that differ only in case, punctuation or numbers share a classification"""
+        return prompt_fingerprint('sense', normalize_utterance(user_input))
+    
+    def _remember_classification(self, cache_key: str, classification: Optional[Dict], user_input: str,
+                                 context: Optional[Dict] = None) -> Dict:
+        """Cache a parsed model classification, or fall back to keywords when there was none"""
+        if classification is None:
+            # Fallback classification
+            return self._fallback_classification(user_input)
+        
+        # Entities belong to this query only (e.g. one customer's account number), so they aren't shared;
+        # merged reasoning is cached under its own key, since it depends on the known fields too
+        shared = {**classification, "entities": {}}
+        reasoning = shared.pop("reasoning", None)
+        self.cache.put(cache_key, json.dumps(shared))
+        if reasoning and context is not None:
+            self.cache.put(self._reasoning_cache_key(classification, context), reasoning)
         return classification
     
+    def _local_classification(self, user_input: str) -> Dict:
+        """Best answer without the model: the local classifier at any confidence, else keywords"""
+        if self.classifier is not None:
+            return {**self.classifier.classify(user_input), "source": "fallback"}
+        return self._fallback_classification(user_input)
+    
     def _fallback_classification(self, user_input: str) -> Dict:
         """Fallback intent classification using keyword matching"""
         user_input_lower = user_input.lower()
@@ -181,60 +540,97 @@ class BankingChatbot:
             "category": category,
             "intent": intent,
             "entities": {},
-            "confidence": 0.7
+            "confidence": 0.7,
+            "source": "fallback"
         }
     
-    def reason(self, classification: Dict, user_input: str) -> Dict:
+    @timed(STAGE_SECONDS, stage='reason')
+    def reason(self, classification: Dict, user_input: str, context: Optional[Dict] = None) -> Dict:
         """Reason: Determine what information is needed and what actions to take"""
         
-        reasoning_prompt = f"""
-        Based on this customer request classification, determine what information is needed:
+        context = self.user_context if context is None else context
+        if self.skip_unused_reasoning or classification.get('source') in _LOCAL_SOURCES:
+            return {"reasoning": DEFAULT_REASONING, **self._plan(classification, context)}
         
-        Category: {classification['category']}
-        Intent: {classification['intent']}
-        User Input: "{user_input}"
-        Current Context: {self.user_context}
+        cache_key = self._reasoning_cache_key(classification, context)
+        reasoning = classification.get('reasoning') or self.cache.get(cache_key)
+        if reasoning is None:
+            reasoning_prompt = self._reasoning_prompt(classification, user_input, context)
+            
+            try:
+                response = self._generate(reasoning_prompt, 'reason')
+                reasoning = response.text.strip()
+                self.cache.put(cache_key, reasoning)
+            except Exception:
+                logger.exception("Reasoning call failed; using the default plan")
+                reasoning = DEFAULT_REASONING
         
-        Determine:
-        1. What information do we need from the user?
-        2. What API calls are required?
-        3. What is the next best action?
-        4. Should we ask for clarification?
+        return {"reasoning": reasoning, **self._plan(classification, context)}
+    
+    @timed(STAGE_SECONDS, stage='reason')
+    async def areason(self, classification: Dict, user_input: str, context: Optional[Dict] = None) -> Dict:
+        """Reason (async): Same as reason() without blocking the event loop"""
         
-        Respond in a conversational, helpful banking assistant tone.
-        """
+        context = self.user_context if context is None else context
+        if self.skip_unused_reasoning or classification.get('source') in _LOCAL_SOURCES:
+            return {"reasoning": DEFAULT_REASONING, **self._plan(classification, context)}
         
-        try:
-            response = model.generate_content(reasoning_prompt)
-            reasoning = response.text.strip()
-        except Exception as e:
-            reasoning = "I understand you need help with banking services. Let me assist you."
+        cache_key = self._reasoning_cache_key(classification, context)
+        reasoning = classification.get('reasoning') or self.cache.get(cache_key)
+        if reasoning is None:
+            reasoning_prompt = self._reasoning_prompt(classification, user_input, context)
+            
+            try:
+                response = await self._agenerate(reasoning_prompt, 'reason')
+                reasoning = response.text.strip()
+                self.cache.put(cache_key, reasoning)
+            except Exception:
+                logger.exception("Reasoning call failed; using the default plan")
+                reasoning = DEFAULT_REASONING
+        
+        return {"reasoning": reasoning, **self._plan(classification, context)}
+    
+    def _reasoning_cache_key(self, classification: Dict, context: Dict) -> str:
+        """The plan depends on the intent and which of its details are known, not on their values"""
+        intent = classification.get('intent')
+        return prompt_fingerprint('reason', classification.get('category'), intent,
+                                  *relevant_fields(intent, context))
+    
+    def _reasoning_prompt(self, classification: Dict, user_input: str, context: Dict) -> str:
+        """Build the action planning prompt for the model"""
+        return reasoning_prompt(classification, user_input, context)
+    
+    def _plan(self, classification: Dict, context: Dict) -> Dict:
+        """Work out the missing information and API calls from the context alone"""
         
         # Determine required information based on category
         required_info = []
         api_calls_needed = []
         
         if classification['category'] in ['ACCOUNT_QUERY', 'SPECIFIC_TASK']:
-            if 'account_number' not in self.user_context:
+            if 'account_number' not in context:
                 required_info.append('account_number')
         
         if classification['intent'] == 'loan_application':
-            api_calls_needed.extend(['get_account_details', 'check_credit_score', 'apply_loan'])
-            if 'loan_type' not in self.user_context:
+            # apply_loan runs the credit check itself and returns the score
+            api_calls_needed.append('apply_loan')
+            if 'loan_type' not in context:
                 required_info.append('loan_type')
-            if 'loan_amount' not in self.user_context:
+            if 'loan_amount' not in context:
                 required_info.append('loan_amount')
         
         return {
-            "reasoning": reasoning,
             "required_info": required_info,
             "api_calls_needed": api_calls_needed,
             "next_action": "gather_info" if required_info else "execute_task"
         }
     
-    def action(self, classification: Dict, reasoning: Dict, user_input: str) -> str:
+    @timed(STAGE_SECONDS, stage='action')
+    def action(self, classification: Dict, reasoning: Dict, user_input: str,
+               context: Optional[Dict] = None) -> str:
         """Action: Execute the determined action and provide response"""
         
+        context = self.user_context if context is None else context
         category = classification['category']
         intent = classification['intent']
         
@@ -246,229 +642,440 @@ class BankingChatbot:
             return self._handle_basic_query(intent, user_input)
         
         elif category == 'ACCOUNT_QUERY':
-            return self._handle_account_query(intent)
+            return self._handle_account_query(intent, context)
+        
+        elif category == 'SPECIFIC_TASK':
+            return self._handle_specific_task(intent, context)
+        
+        else:
+            return self.replies["fallback"]
+    
+    @timed(STAGE_SECONDS, stage='action')
+    async def aaction(self, classification: Dict, reasoning: Dict, user_input: str,
+                      prefetched: Optional[Dict] = None, context: Optional[Dict] = None) -> str:
+        """Action (async): Execute the determined action, reusing any prefetched API data"""
+        
+        context = self.user_context if context is None else context
+        category = classification['category']
+        intent = classification['intent']
+        prefetched = prefetched or {}
+        
+        if reasoning['next_action'] == 'gather_info':
+            return self._gather_information(reasoning['required_info'])
+        
+        elif category == 'BASIC_QUERY':
+            return self._handle_basic_query(intent, user_input)
+        
+        elif category == 'ACCOUNT_QUERY':
+            return await self._ahandle_account_query(intent, context, prefetched)
         
         elif category == 'SPECIFIC_TASK':
-            return self._handle_specific_task(intent)
+            return await self._ahandle_specific_task(intent, context)
         
         else:
-            return "I'm here to help you with your banking needs. Could you please tell me what you'd like to do today?"
+            return self.replies["fallback"]
+    
+    def iter_action(self, classification: Dict, reasoning: Dict, user_input: str,
+                    context: Optional[Dict] = None) -> Iterator[str]:
+        """Action, streamed: yield the reply in chunks as each part is ready"""
+        
+        context = self.user_context if context is None else context
+        category = classification['category']
+        intent = classification['intent']
+        
+        # Multi-line template replies stream line by line; the rest are one chunk
+        if reasoning['next_action'] != 'gather_info':
+            if category == 'BASIC_QUERY':
+                yield from self._iter_basic_query(intent, user_input)
+                return
+            if category == 'ACCOUNT_QUERY':
+                yield from self._iter_account_query(intent, context)
+                return
+        
+        yield self.action(classification, reasoning, user_input, context)
+    
+    async def aiter_action(self, classification: Dict, reasoning: Dict, user_input: str,
+                           context: Optional[Dict] = None) -> AsyncIterator[str]:
+        """Action, streamed (async): yield the reply in chunks as each part is ready"""
+        
+        context = self.user_context if context is None else context
+        category = classification['category']
+        intent = classification['intent']
+        
+        if reasoning['next_action'] != 'gather_info':
+            if category == 'BASIC_QUERY':
+                for chunk in self._iter_basic_query(intent, user_input):
+                    yield chunk
+                return
+            if category == 'ACCOUNT_QUERY':
+                async for chunk in self._aiter_account_query(intent, context, {}):
+                    yield chunk
+                return
+        
+        yield await self.aaction(classification, reasoning, user_input, context=context)
+    
+    async def _aprefetch(self, classification: Dict, context: Dict) -> Dict:
+        """Fetch the read-only API data the action stage will need for this turn"""
+        
+        account_number = context.get('account_number')
+        if not account_number or self._plan(classification, context)['next_action'] != 'execute_task':
+            return {}
+        
+        # Only reads are prefetched; writes wait until the turn has been reasoned about
+        reads = {}
+        if classification['category'] == 'ACCOUNT_QUERY':
+            reads['account_details'] = self.api.aget_account_details(account_number)
+            if classification['intent'] == 'transaction_history':
+                reads['transactions'] = self.api.aget_transaction_history(account_number, limit=5)
+        
+        results = await asyncio.gather(*reads.values())
+        return dict(zip(reads, results))
     
     def _gather_information(self, required_info: List[str]) -> str:
         """Gather missing information from user"""
         
         if 'account_number' in required_info:
-            return "To assist you better, I'll need your account number. Could you please provide your 8-digit account number?"
+            return self.replies["ask_account_number"]
         
         elif 'loan_type' in required_info:
-            return """What type of loan are you interested in? We offer:
-• Personal Loan
-• Home Loan  
-• Car Loan
-
-Please let me know which one you'd prefer."""
+            return self.replies["ask_loan_type"]
         
         elif 'loan_amount' in required_info:
-            return "What loan amount are you looking for? Please specify the amount you need."
+            return self.replies["ask_loan_amount"]
         
         else:
-            return "I need some additional information to help you. What would you like to do today?"
+            return self.replies["ask_more_info"]
     
     def _handle_basic_query(self, intent: str, user_input: str) -> str:
         """Handle basic queries about services, rates, etc."""
+        return ''.join(self._iter_basic_query(intent, user_input))
+    
+    def _iter_basic_query(self, intent: str, user_input: str) -> Iterator[str]:
+        """Yield the reply to a basic query, the rates table one line at a time"""
         
         user_input_lower = user_input.lower()
         
         if 'interest' in user_input_lower or 'rate' in user_input_lower:
-            rates_info = "Here are our current interest rates:\n"
-            for service, rate in self.api.interest_rates.items():
-                rates_info += f"• {service.replace('_', ' ').title()}: {rate}% per annum\n"
-            return rates_info
+            yield from self.replies.rates(self.api.interest_rates)
         
         elif 'charge' in user_input_lower or 'fee' in user_input_lower:
-            return """Our current charges:
-• ATM withdrawal (own): Free
-• ATM withdrawal (other banks): ₹20 per transaction
-• SMS alerts: ₹25 per month
-• Cheque book: ₹200 per booklet
-• Account maintenance: ₹500 per quarter (waived for minimum balance ≥ ₹10,000)"""
+            yield self.replies["charges"]
         
         else:
-            return """I'm here to help you with:
-• Account balance and transaction inquiries
-• Loan applications (Personal, Home, Car loans)
-• Card blocking services
-• Interest rates and charges information
-
-What would you like to know about?"""
+            yield self.replies["menu"]
+    
     
-    def _handle_account_query(self, intent: str) -> str:
+    def _handle_account_query(self, intent: str, context: Dict) -> str:
         """Handle account-related queries"""
+        return ''.join(self._iter_account_query(intent, context))
+    
+    def _iter_account_query(self, intent: str, context: Dict) -> Iterator[str]:
+        """Fetch the account data, then yield the reply in chunks"""
         
-        account_number = self.user_context.get('account_number')
+        account_number = context.get('account_number')
         if not account_number:
-            return "I need your account number to fetch your account details."
+            yield self.replies["account_number_needed"]
+            return
         
         account_details = self.api.get_account_details(account_number)
+        transactions = None
+        if account_details and intent == 'transaction_history':
+            transactions = self.api.get_transaction_history(account_number, limit=5)  # Show last 5 transactions
+        
+        yield from self._iter_account_reply(intent, account_number, account_details, transactions)
+    
+    async def _ahandle_account_query(self, intent: str, context: Dict, prefetched: Dict) -> str:
+        """Handle account-related queries (async), reusing data prefetched during reasoning"""
+        return ''.join([chunk async for chunk in self._aiter_account_query(intent, context, prefetched)])
+    
+    async def _aiter_account_query(self, intent: str, context: Dict, prefetched: Dict) -> AsyncIterator[str]:
+        """Fetch the account data (async) unless prefetched, then yield the reply in chunks"""
+        
+        account_number = context.get('account_number')
+        if not account_number:
+            yield self.replies["account_number_needed"]
+            return
+        
+        if 'account_details' in prefetched:
+            account_details = prefetched['account_details']
+        else:
+            account_details = await self.api.aget_account_details(account_number)
+        
+        transactions = prefetched.get('transactions')
+        if account_details and intent == 'transaction_history' and transactions is None:
+            transactions = await self.api.aget_transaction_history(account_number, limit=5)
+        
+        for chunk in self._iter_account_reply(intent, account_number, account_details, transactions):
+            yield chunk
+    
+    def _iter_account_reply(self, intent: str, account_number: str, account_details: Optional[Dict],
+                            transactions: Optional[List[Dict]]) -> Iterator[str]:
+        """Yield the reply for an account query from the fetched API data"""
+        
         if not account_details:
-            return "I couldn't find an account with that number. Please check and try again."
+            yield self.replies["account_not_found"]
         
-        if intent == 'balance_inquiry':
-            return f"""Hello {account_details['customer_name']}! 
-            
-Your account balance details:
-• Account Number: {account_details['account_number']}
-• Account Type: {account_details['account_type']}
-• Available Balance: ₹{account_details['balance']:,.2f}
-
-Is there anything else I can help you with?"""
+        elif intent == 'balance_inquiry':
+            yield self.replies.account("balance", account_details)
         
         elif intent == 'transaction_history':
-            transactions = self.api.get_transaction_history(account_number)
             if not transactions:
-                return "No recent transactions found for your account."
+                yield self.replies["no_transactions"]
+                return
             
-            trans_text = f"Here are your recent transactions for account {account_number}:\n\n"
-            for trans in transactions[:5]:  # Show last 5 transactions
-                trans_text += f"• {trans['date']} - {trans['type']} - ₹{trans['amount']:,.2f} - {trans['description']}\n"
-            
-            return trans_text
+            yield from self.replies.transactions(account_number, transactions)
         
         else:
-            return f"""Account Details for {account_details['customer_name']}:
-• Account Number: {account_details['account_number']}
-• Account Type: {account_details['account_type']}
-• Balance: ₹{account_details['balance']:,.2f}
-• Email: {account_details['email']}
-• Phone: {account_details['phone']}"""
-    
-    def _handle_specific_task(self, intent: str) -> str:
+            yield self.replies.account("account_details", account_details)
+    
+    
+    def _handle_specific_task(self, intent: str, context: Dict) -> str:
         """Handle specific banking tasks"""
         
-        account_number = self.user_context.get('account_number')
+        account_number = context.get('account_number')
         if not account_number:
-            return "I need your account number to proceed with this request."
+            return self.replies["task_account_number_needed"]
         
         if intent == 'loan_application':
-            loan_type = self.user_context.get('loan_type')
-            loan_amount = self.user_context.get('loan_amount')
-            
-            if not loan_type or not loan_amount:
-                missing = []
-                if not loan_type:
-                    missing.append("loan type")
-                if not loan_amount:
-                    missing.append("loan amount")
-                return f"I need the {' and '.join(missing)} to process your loan application."
+            loan_type, loan_amount, error = self._loan_request(context)
+            if error:
+                return error
             
-            # Process loan application
-            try:
-                loan_amount_float = float(loan_amount.replace(',', '').replace('₹', ''))
-                result = self.api.apply_loan(account_number, loan_type, loan_amount_float)
-                
-                response = f"""Loan Application Processed!
-                
-Application ID: {result['application_id']}
-Status: {result['status']}
-
-{result['message']}
-
-Your credit score: {self.api.check_credit_score(account_number)}
-
-Is there anything else I can help you with?"""
-                return response
-                
-            except ValueError:
-                return "Please provide a valid loan amount in numbers."
+            # Process loan application; the result already carries the credit score it was decided on
+            result = self.api.apply_loan(account_number, loan_type, loan_amount)
+            return self._render_loan_result(result, result['credit_score'])
         
         elif intent == 'card_blocking':
-            card_type = self.user_context.get('card_type', 'debit')
+            card_type = context.get('card_type', 'debit')
             success = self.api.block_card(account_number, card_type)
+            return self._render_card_blocked(card_type, success)
+        
+        else:
+            return self.replies["task_menu"]
+    
+    async def _ahandle_specific_task(self, intent: str, context: Dict) -> str:
+        """Handle specific banking tasks (async)"""
+        
+        account_number = context.get('account_number')
+        if not account_number:
+            return self.replies["task_account_number_needed"]
+        
+        if intent == 'loan_application':
+            loan_type, loan_amount, error = self._loan_request(context)
+            if error:
+                return error
             
-            if success:
-                return f"""Your {card_type} card has been successfully blocked for security.
-
-• Card Status: BLOCKED
-• Date & Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-• Reason: Customer Request
-
-A new card will be dispatched to your registered address within 5-7 business days.
-
-For immediate assistance, please contact our 24/7 helpline.
-Is there anything else I can help you with?"""
-            else:
-                return "I couldn't block your card at the moment. Please try again or contact customer service."
+            result = await self.api.aapply_loan(account_number, loan_type, loan_amount)
+            return self._render_loan_result(result, result['credit_score'])
+        
+        elif intent == 'card_blocking':
+            card_type = context.get('card_type', 'debit')
+            success = await self.api.ablock_card(account_number, card_type)
+            return self._render_card_blocked(card_type, success)
         
         else:
-            return "I can help you with loan applications or card blocking. What would you like to do?"
+            return self.replies["task_menu"]
     
-    def learn(self, user_input: str, classification: Dict, response: str):
+    def _loan_request(self, context: Dict) -> Tuple[Optional[str], Optional[float], Optional[str]]:
+        """Validate the loan details in context, returning (loan_type, amount, error)"""
+        
+        loan_type = context.get('loan_type')
+        loan_amount = context.get('loan_amount')
+        
+        if not loan_type or not loan_amount:
+            missing = []
+            if not loan_type:
+                missing.append(self.replies["loan_missing_type"])
+            if not loan_amount:
+                missing.append(self.replies["loan_missing_amount"])
+            missing = self.replies["loan_missing_joiner"].join(missing)
+            return None, None, self.replies.render("loan_missing", missing=missing)
+        
+        try:
+            return loan_type, float(str(loan_amount).replace(',', '').replace('₹', '')), None
+        except ValueError:
+            return None, None, self.replies["loan_invalid_amount"]
+    
+    def _render_loan_result(self, result: Dict, credit_score: int) -> str:
+        """Build the reply for a processed loan application"""
+        return self.replies.render("loan_result", application_id=result['application_id'], status=result['status'],
+                                   message=result['message'], credit_score=credit_score)
+    
+    def _render_card_blocked(self, card_type: str, success: bool) -> str:
+        """Build the reply for a card blocking request"""
+        
+        if success:
+            return self.replies.render("card_blocked", card_type=card_type,
+                                       timestamp=datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+        else:
+            return self.replies["card_block_failed"]
+    
+    @timed(STAGE_SECONDS, stage='learn')
+    def learn(self, user_input: str, classification: Dict, response: str,
+              session: Optional[SessionState] = None):
         """Learn: Store interaction data for improvement"""
         
+        session = session or self.session
+        timestamp = datetime.now().isoformat()
         interaction = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": timestamp,
+            "session_id": session.session_id,
             "user_input": user_input,
             "classification": classification,
             "response": response,
-            "user_context": self.user_context.copy()
+            "user_context": session.user_context.copy()
         }
         
-        self.learning_data.append(interaction)
-        self.conversation_history.append({
+        self.interaction_log.append(interaction)
+        session.conversation_history.append({
             "user": user_input,
             "bot": response,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": timestamp
         })
     
-    def extract_entities(self, user_input: str):
+    def extract_entities(self, user_input: str) -> ExtractedEntities:
         """Extract entities like account numbers, amounts from user input"""
+        return extract_entities(user_input)
+    
+    def chat(self, user_input: str, session_id: Optional[str] = None) -> str:
+        """Main chat function implementing the complete flow"""
         
-        # Account number pattern (8 digits)
-        account_match = re.search(r'\b\d{8}\b', user_input)
-        if account_match:
-            self.user_context['account_number'] = account_match.group()
-        
-        # Amount pattern
-        amount_match = re.search(r'₹?[\d,]+(?:\.\d{2})?', user_input)
-        if amount_match:
-            self.user_context['loan_amount'] = amount_match.group()
-        
-        # Loan type
-        loan_types = ['personal loan', 'home loan', 'car loan', 'personal', 'home', 'car']
-        for loan_type in loan_types:
-            if loan_type in user_input.lower():
-                self.user_context['loan_type'] = loan_type.replace(' loan', '').title() + ' Loan'
-                break
+        if self.verbose:
+            print(f"\n🤖 Processing: {user_input}")
+        session = self._session_for(session_id)
+        try:
+            context = session.user_context
+            
+            # Extract entities from user input
+            context.update(self.extract_entities(user_input).as_context())
+            
+            # SENSE: Understand user intent
+            classification = self.sense(user_input, context)
+            if self.verbose:
+                print(f"📊 Classification: {classification}")
+            
+            # REASON: Determine required actions
+            reasoning = self.reason(classification, user_input, context)
+            if self.verbose:
+                print(f"🧠 Reasoning: Next action - {reasoning['next_action']}")
+            
+            # ACTION: Execute and respond
+            response = self.action(classification, reasoning, user_input, context)
+            
+            # LEARN: Store interaction for improvement
+            self.learn(user_input, classification, response, session)
+        except BaseException:
+            # Hand the session back unsaved
+            self.sessions.release(session)
+            raise
+        self.sessions.update(session)
         
-        # Card type
-        if 'credit card' in user_input.lower():
-            self.user_context['card_type'] = 'credit'
-        elif 'debit card' in user_input.lower():
-            self.user_context['card_type'] = 'debit'
+        return response
     
-    def chat(self, user_input: str) -> str:
-        """Main chat function implementing the complete flow"""
+    async def achat(self, user_input: str, session_id: Optional[str] = None) -> str:
+        """Async chat: same flow as chat(), overlapping independent stages on the event loop"""
         
-        print(f"\n🤖 Processing: {user_input}")
+        if self.verbose:
+            print(f"\n🤖 Processing: {user_input}")
+        session = await self._asession_for(session_id)
+        try:
+            context = session.user_context
+            
+            # Extract entities from user input
+            context.update(self.extract_entities(user_input).as_context())
+            
+            # SENSE: Understand user intent
+            classification = await self.asense(user_input, context)
+            if self.verbose:
+                print(f"📊 Classification: {classification}")
+            
+            # REASON: The reasoning call and the API reads it doesn't influence run side by side
+            reasoning, prefetched = await asyncio.gather(
+                self.areason(classification, user_input, context),
+                self._aprefetch(classification, context)
+            )
+            if self.verbose:
+                print(f"🧠 Reasoning: Next action - {reasoning['next_action']}")
+            
+            # ACTION: Execute and respond
+            response = await self.aaction(classification, reasoning, user_input, prefetched, context)
+            
+            # LEARN: Store interaction for improvement
+            self.learn(user_input, classification, response, session)
+        except BaseException:
+            # Hand the session back unsaved
+            self.sessions.release(session)
+            raise
+        await self.sessions.aupdate(session)
         
-        # Extract entities from user input
-        self.extract_entities(user_input)
+        return response
+    
+    def chat_stream(self, user_input: str, session_id: Optional[str] = None) -> Iterator[str]:
+        """Streaming chat: yield the reply in chunks as soon as each one is ready
         
-        # SENSE: Understand user intent
-        classification = self.sense(user_input)
-        print(f"📊 Classification: {classification}")
+        The reasoning text never reaches the reply, so the streamed path plans from
+        the context alone instead of waiting on a second model call.
+        """
         
-        # REASON: Determine required actions
-        reasoning = self.reason(classification, user_input)
-        print(f"🧠 Reasoning: Next action - {reasoning['next_action']}")
+        session = self._session_for(session_id)
+        chunks = []
+        try:
+            context = session.user_context
+            context.update(self.extract_entities(user_input).as_context())
+            
+            classification = self.sense(user_input)
+            reasoning = {"reasoning": None, **self._plan(classification, context)}
+            
+            for chunk in self.iter_action(classification, reasoning, user_input, context):
+                chunks.append(chunk)
+                yield chunk
+        except GeneratorExit:
+            # The consumer stopped early (a break, a client that went away): the turn still
+            # happened, so what was sent is learned from and the session saved
+            pass
+        except BaseException:
+            self.sessions.release(session)
+            raise
         
-        # ACTION: Execute and respond
-        response = self.action(classification, reasoning, user_input)
+        self.learn(user_input, classification, ''.join(chunks), session)
+        self.sessions.update(session)
+    
+    async def achat_stream(self, user_input: str, session_id: Optional[str] = None) -> AsyncIterator[str]:
+        """Streaming chat (async): yield the reply in chunks as soon as each one is ready"""
         
-        # LEARN: Store interaction for improvement
-        self.learn(user_input, classification, response)
+        session = await self._asession_for(session_id)
+        chunks = []
+        try:
+            context = session.user_context
+            context.update(self.extract_entities(user_input).as_context())
+            
+            classification = await self.asense(user_input)
+            reasoning = {"reasoning": None, **self._plan(classification, context)}
+            
+            async for chunk in self.aiter_action(classification, reasoning, user_input, context):
+                chunks.append(chunk)
+                yield chunk
+        except GeneratorExit:
+            # Closed early by the consumer, as in chat_stream()
+            pass
+        except BaseException:
+            self.sessions.release(session)
+            raise
         
-        return response
+        self.learn(user_input, classification, ''.join(chunks), session)
+        await self.sessions.aupdate(session)
+    
+    def _session_for(self, session_id: Optional[str]) -> SessionState:
+        """Resolve the state a turn runs against; no id means the single default session"""
+        if session_id is None:
+            return self.session
+        return self.sessions.get(session_id)
+    
+    async def _asession_for(self, session_id: Optional[str]) -> SessionState:
+        if session_id is None:
+            return self.session
+        return await self.sessions.aget(session_id)
+
 
 def main():
     """Main function to run the banking chatbot"""
@@ -482,7 +1089,7 @@ def main():
     print("• Interest rates and charges information")
     print("=" * 50)
     
-    chatbot = BankingChatbot()
+    chatbot = BankingChatbot(verbose=True)
     
     print("\n💬 Hi! I'm your AI banking assistant. How can I help you today?")
     print("(Type 'quit' to exit, 'reset' to clear context)")
@@ -511,7 +1118,7 @@ def main():
             # Get response from chatbot
             response = chatbot.chat(user_input)
             print(f"\n🤖 Assistant: {response}")
-            
+        
         except KeyboardInterrupt:
             print("\n\n🤖 Thank you for using AI Banking Assistant. Goodbye!")
             break
@@ -519,5 +1126,6 @@ def main():
             print(f"\n❌ Sorry, I encountered an error: {e}")
             print("Please try again or contact customer support.")
 
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
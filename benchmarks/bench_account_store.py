@@ -0,0 +1,136 @@
+"""Benchmark: MockBankingAPI write throughput by thread count, one global lock vs sharded locks
+
+Threads run a mix of transfers, card blocks, loan applications and history
+reads against a shared API. Each transfer holds its accounts' locks for --hold
+seconds, standing in for the core-banking round-trip a real write waits on
+inside its transaction. One shard is a single global lock; with 64, transfers
+on unrelated accounts proceed in parallel. After every run the final state is
+checked: money is conserved, no balance is negative, every completed transfer
+left exactly two history rows, every application id is unique and increasing
+per thread, and every requested card is blocked. With --wal the log is
+replayed into a fresh API, which must match the one that wrote it.
+
+Run from the repository root:
+    python -m benchmarks.bench_account_store --accounts 1000 --ops 2000 --threads 1,2,4,8,16 --hold 0.001
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional
+
+from banking_chatbot import MockBankingAPI
+
+OPENING_BALANCE = 10000.0
+CARD_TYPES = ("debit", "credit")
+
+
+def build_api(accounts: int, shards: int, wal_path: Optional[str] = None, fsync: bool = False) -> MockBankingAPI:
+    api = MockBankingAPI(0, shards=shards, wal_path=wal_path, fsync=fsync)
+    template = api.store.get("12345678")
+    for i in range(accounts):
+        api.store.open_account({**template, "account_number": f"{30000000 + i}", "balance": OPENING_BALANCE})
+    return api
+
+
+def worker(api: MockBankingAPI, account_numbers: List[str], ops: int, hold: float, seed: int, result: Dict):
+    rng = random.Random(seed)
+    for _ in range(ops):
+        roll = rng.random()
+        if roll < 0.7:
+            source, destination = rng.sample(account_numbers, 2)
+            with api.store.locked(source, destination):
+                if hold:
+                    time.sleep(hold)
+                outcome = api.transfer(source, destination, float(rng.randint(1, 500)))
+            result["transfers"] += outcome["status"] == "Completed"
+        elif roll < 0.8:
+            card = (rng.choice(account_numbers), rng.choice(CARD_TYPES))
+            api.block_card(*card)
+            result["cards"].add(f"{card[0]}_{card[1]}")
+        elif roll < 0.9:
+            decision = api.apply_loan(rng.choice(account_numbers), "Car Loan", 50000.0)
+            result["application_ids"].append(decision["application_id"])
+        else:
+            api.get_transaction_history(rng.choice(account_numbers), limit=5)
+
+
+def check(api: MockBankingAPI, account_numbers: List[str], rows_before: int, results: List[Dict]) -> Dict[str, bool]:
+    snapshot = api.store.snapshot()
+    balances = [snapshot[number]["balance"] for number in account_numbers]
+    ids = [application_id for result in results for application_id in result["application_ids"]]
+    return {
+        "money_conserved": round(sum(balances) * 100) == round(OPENING_BALANCE * len(account_numbers) * 100),
+        "no_negative_balances": min(balances) >= 0,
+        "history_rows_match": len(api.transactions) == rows_before + 2 * sum(result["transfers"] for result in results),
+        "application_ids_unique": len(set(ids)) == len(ids),
+        "application_ids_increasing": all(result["application_ids"] == sorted(result["application_ids"])
+                                          for result in results),
+        "cards_blocked": api.blocked_cards >= set().union(*(result["cards"] for result in results)),
+    }
+
+
+def run(accounts: int, shards: int, threads: int, ops: int, hold: float, wal_path: Optional[str],
+        fsync: bool) -> Dict:
+    api = build_api(accounts, shards, wal_path, fsync)
+    account_numbers = [f"{30000000 + i}" for i in range(accounts)]
+    rows_before = len(api.transactions)
+    results = [{"transfers": 0, "cards": set(), "application_ids": []} for _ in range(threads)]
+    pool = [threading.Thread(target=worker, args=(api, account_numbers, ops // threads, hold, i, results[i]))
+            for i in range(threads)]
+    start = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    
+    checks = check(api, account_numbers, rows_before, results)
+    if wal_path:
+        api.store.wal.close()
+        replayed = MockBankingAPI(0, shards=shards, wal_path=wal_path)
+        checks["wal_replay_matches"] = (replayed.store.snapshot() == api.store.snapshot()
+                                        and len(replayed.transactions) == len(api.transactions)
+                                        and replayed.blocked_cards == api.blocked_cards)
+        replayed.store.wal.close()
+        os.remove(wal_path)
+    return {
+        "locking": "global" if shards == 1 else f"{shards} shards",
+        "threads": threads,
+        "ops": ops // threads * threads,
+        "ops_per_s": round(ops // threads * threads / elapsed),
+        "checks_passed": all(checks.values()),
+        **({} if all(checks.values()) else {"failed": [name for name, ok in checks.items() if not ok]}),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--accounts", type=int, default=1000)
+    parser.add_argument("--ops", type=int, default=2000, help="operations per run, split across the threads")
+    parser.add_argument("--threads", default="1,2,4,8,16")
+    parser.add_argument("--shards", type=int, default=64)
+    parser.add_argument("--hold", type=float, default=0.001, help="seconds each transfer holds its locks")
+    parser.add_argument("--wal", action="store_true", help="log writes and verify a replay of the log")
+    parser.add_argument("--fsync", action="store_true", help="fsync the log on every write (group commit)")
+    args = parser.parse_args()
+    
+    for shards in (1, args.shards):
+        baseline = None
+        for threads in (int(n) for n in args.threads.split(",")):
+            wal_path = None
+            if args.wal:
+                fd, wal_path = tempfile.mkstemp(suffix=".wal")
+                os.close(fd)
+            result = run(args.accounts, shards, threads, args.ops, args.hold, wal_path, args.fsync)
+            baseline = baseline or result["ops_per_s"]
+            result["speedup"] = round(result["ops_per_s"] / baseline, 2)
+            print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
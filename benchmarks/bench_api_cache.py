@@ -0,0 +1,122 @@
+"""Load test: backend calls saved by CachingBankingAPI's read-through cache and coalescing
+
+Runs many concurrent sessions (on one event loop, and on a thread pool for the
+sync path) that look up a small pool of accounts, once against the bare
+MockBankingAPI and once through CachingBankingAPI, and reports backend
+round-trips, cache hits and coalesced requests.
+
+Run from the repository root:
+    python -m benchmarks.bench_api_cache --sessions 500 --accounts 20
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+from api_cache import CachingBankingAPI
+from banking_chatbot import BankingChatbot, MockBankingAPI
+from tests.stub_model import StubModel
+
+TURNS = [
+    "Check the balance of account {account}",
+    "Show my transaction history",
+    "Show account details",
+    "What is my balance?",
+]
+
+
+class CountingAPI(MockBankingAPI):
+    """MockBankingAPI that counts simulated backend round-trips"""
+    
+    def __init__(self, latency_scale: float, accounts: int):
+        super().__init__(latency_scale)
+        self.round_trips = 0
+        template = self.store.get("12345678")
+        for i in range(accounts):
+            self.store.open_account({**template, "account_number": f"{20000000 + i}"})
+    
+    def _simulate_delay(self, seconds: float):
+        self.round_trips += 1
+        super()._simulate_delay(seconds)
+    
+    async def _asimulate_delay(self, seconds: float):
+        self.round_trips += 1
+        await super()._asimulate_delay(seconds)
+
+
+def scripts(sessions: int, accounts: int) -> List[List[str]]:
+    return [[turn.format(account=20000000 + i % accounts) for turn in TURNS] for i in range(sessions)]
+
+
+def run_async(api, conversations: List[List[str]]) -> float:
+    bot = BankingChatbot(api=api, llm=StubModel(0))
+    
+    async def converse(session_id: str, script: List[str]):
+        for turn in script:
+            await bot.achat(turn, session_id=session_id)
+    
+    async def run_all():
+        await asyncio.gather(*(converse(str(i), script) for i, script in enumerate(conversations)))
+    
+    start = time.perf_counter()
+    asyncio.run(run_all())
+    return time.perf_counter() - start
+
+
+def run_threads(api, conversations: List[List[str]], workers: int) -> float:
+    bot = BankingChatbot(api=api, llm=StubModel(0))
+    
+    def converse(session_id: str, script: List[str]):
+        for turn in script:
+            bot.chat(turn, session_id=session_id)
+    
+    start = time.perf_counter()
+    with ThreadPoolExecutor(workers) as pool:
+        list(pool.map(converse, (str(i) for i in range(len(conversations))), conversations))
+    return time.perf_counter() - start
+
+
+def report(mode: str, raw: CountingAPI, raw_s: float, cached_backend: CountingAPI,
+           cached: CachingBankingAPI, cached_s: float) -> Dict:
+    return {
+        "mode": mode,
+        "raw_round_trips": raw.round_trips,
+        "cached_round_trips": cached_backend.round_trips,
+        "reduction": round(1 - cached_backend.round_trips / raw.round_trips, 3),
+        "raw_s": round(raw_s, 2),
+        "cached_s": round(cached_s, 2),
+        **cached.stats,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=500)
+    parser.add_argument("--accounts", type=int, default=20)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--api-latency-scale", type=float, default=0.02)
+    args = parser.parse_args()
+    
+    conversations = scripts(args.sessions, args.accounts)
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = []
+        for mode, run in (("async", lambda api: run_async(api, conversations)),
+                          ("threads", lambda api: run_threads(api, conversations, args.threads))):
+            raw = CountingAPI(args.api_latency_scale, args.accounts)
+            raw_s = run(raw)
+            backend = CountingAPI(args.api_latency_scale, args.accounts)
+            cached = CachingBankingAPI(backend)
+            cached_s = run(cached)
+            results.append(report(mode, raw, raw_s, backend, cached, cached_s))
+    
+    for result in results:
+        print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Benchmark: sync chat() vs asyncio-native achat() over simulated conversations
+
+Drives N scripted conversations through BankingChatbot with a stubbed model
+(fixed simulated latency, no network) and reports turns/sec and p50/p99 turn
+latency for the sync path (one conversation at a time, as a single worker
+serves customers today) and for the async path (all conversations on one
+event loop).
+
+Run from the repository root:
+    python -m benchmarks.bench_async_chat --conversations 200
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import time
+from typing import Dict, List
+
+from banking_chatbot import BankingChatbot, MockBankingAPI
+from tests.stub_model import StubModel
+
+CONVERSATIONS = [
+    ["Check the balance of account 12345678", "Show my transaction history"],
+    ["What are your interest rates?", "What charges do you have?"],
+    ["I want a personal loan of 50000 for account 87654321"],
+    ["Block my debit card, account 12345678"],
+    ["Show account details for 87654321", "What is my balance?"],
+]
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile"""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def summarize(name: str, latencies: List[float], elapsed: float) -> Dict:
+    return {
+        "path": name,
+        "turns": len(latencies),
+        "elapsed_s": round(elapsed, 3),
+        "turns_per_s": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+    }
+
+
+def run_sync(conversations: List[List[str]], api: MockBankingAPI, llm: StubModel) -> Dict:
+    bot = BankingChatbot(api=api, llm=llm)
+    latencies = []
+    start = time.perf_counter()
+    for session_id, script in enumerate(conversations):
+        for turn in script:
+            t0 = time.perf_counter()
+            bot.chat(turn, session_id=str(session_id))
+            latencies.append(time.perf_counter() - t0)
+    return summarize("sync chat()", latencies, time.perf_counter() - start)
+
+
+async def run_async(conversations: List[List[str]], api: MockBankingAPI, llm: StubModel) -> Dict:
+    bot = BankingChatbot(api=api, llm=llm)
+    latencies = []
+    
+    async def converse(session_id: str, script: List[str]):
+        for turn in script:
+            t0 = time.perf_counter()
+            await bot.achat(turn, session_id=session_id)
+            latencies.append(time.perf_counter() - t0)
+    
+    start = time.perf_counter()
+    await asyncio.gather(*(converse(str(i), script) for i, script in enumerate(conversations)))
+    return summarize("async achat()", latencies, time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--conversations", type=int, default=200)
+    parser.add_argument("--sync-conversations", type=int, default=20,
+                        help="the sync path is serial, so it replays a smaller sample")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="seconds per stubbed model call")
+    parser.add_argument("--api-latency-scale", type=float, default=0.1,
+                        help="multiplier on MockBankingAPI's simulated round-trips")
+    args = parser.parse_args()
+    
+    scripts = [CONVERSATIONS[i % len(CONVERSATIONS)] for i in range(args.conversations)]
+    llm = StubModel(args.llm_latency)
+    
+    with contextlib.redirect_stdout(io.StringIO()):
+        sync_result = run_sync(scripts[:args.sync_conversations], MockBankingAPI(args.api_latency_scale), llm)
+        async_result = asyncio.run(run_async(scripts, MockBankingAPI(args.api_latency_scale), llm))
+    
+    for result in (sync_result, async_result):
+        print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Micro-benchmark: single-pass extract_entities vs the old multi-search extractor
+
+Builds a large corpus of banking utterances from templates and reports
+utterances/sec for both extractors, plus how often the old one stored an
+account number as the loan amount or read a card as a car loan.
+
+Run from the repository root:
+    python -m benchmarks.bench_entity_extractor --utterances 200000
+"""
+
+import argparse
+import json
+import random
+import re
+import time
+from typing import Callable, Dict, List
+
+from entity_extractor import extract_entities
+
+TEMPLATES = [
+    "What is the balance of account {account}?",
+    "Show my transaction history for {account}",
+    "I want a {loan} loan of {amount} for account {account}",
+    "Apply for a {loan} loan, amount {amount}",
+    "Block my {card} card, account number {account}",
+    "I lost my {card} card",
+    "What are your interest rates?",
+    "Need {lakhs} lakhs for a {loan} loan",
+    "Can I get {crore} crore as a {loan} loan on {account}",
+    "Please help me with my account",
+]
+
+
+def legacy_extract(user_input: str) -> Dict:
+    """extract_entities as it was before the single-pass scanner"""
+    context = {}
+    account_match = re.search(r'\b\d{8}\b', user_input)
+    if account_match:
+        context['account_number'] = account_match.group()
+    
+    amount_match = re.search(r'₹?[\d,]+(?:\.\d{2})?', user_input)
+    if amount_match:
+        context['loan_amount'] = amount_match.group()
+    
+    loan_types = ['personal loan', 'home loan', 'car loan', 'personal', 'home', 'car']
+    for loan_type in loan_types:
+        if loan_type in user_input.lower():
+            context['loan_type'] = loan_type.replace(' loan', '').title() + ' Loan'
+            break
+    
+    if 'credit card' in user_input.lower():
+        context['card_type'] = 'credit'
+    elif 'debit card' in user_input.lower():
+        context['card_type'] = 'debit'
+    return context
+
+
+def corpus(size: int, seed: int = 11) -> List[str]:
+    rng = random.Random(seed)
+    return [
+        rng.choice(TEMPLATES).format(
+            account=rng.choice(("12345678", "87654321", f"{rng.randrange(10 ** 7, 10 ** 8)}")),
+            loan=rng.choice(("personal", "home", "car")),
+            amount=rng.choice(("50000", "₹75,000", "Rs. 1,20,000", "2500.50")),
+            card=rng.choice(("credit", "debit")),
+            lakhs=rng.randint(1, 50),
+            crore=rng.choice(("1", "2.5")),
+        )
+        for _ in range(size)
+    ]
+
+
+def throughput(extract: Callable[[str], object], utterances: List[str]) -> float:
+    start = time.perf_counter()
+    for utterance in utterances:
+        extract(utterance)
+    return len(utterances) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--utterances", type=int, default=200_000)
+    args = parser.parse_args()
+    
+    utterances = corpus(args.utterances)
+    legacy_rate = throughput(legacy_extract, utterances)
+    rate = throughput(extract_entities, utterances)
+    
+    account_as_amount = car_from_card = 0
+    for utterance in utterances:
+        legacy = legacy_extract(utterance)
+        if legacy.get('loan_amount') is not None and legacy.get('loan_amount') == legacy.get('account_number'):
+            account_as_amount += 1
+        if legacy.get('loan_type') == 'Car Loan' and extract_entities(utterance).loan_type != 'Car Loan':
+            car_from_card += 1
+    
+    print(json.dumps({
+        "utterances": len(utterances),
+        "legacy_per_s": round(legacy_rate),
+        "single_pass_per_s": round(rate),
+        "speedup": round(rate / legacy_rate, 2),
+        "legacy_account_as_amount": account_as_amount,
+        "legacy_car_loan_from_card": car_from_card,
+    }))
+
+
+if __name__ == "__main__":
+    main()
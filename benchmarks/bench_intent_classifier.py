@@ -0,0 +1,186 @@
+"""Benchmark: local IntentClassifier vs the model call in sense()
+
+Generates labeled banking utterances from paraphrase templates, replays the
+training half through BankingChatbot (keyword fast path off, stub model with
+simulated latency) so the labels come from learning_data exactly as they would
+in production, trains an IntentClassifier from those interactions, saves and
+memory-maps it, and reports held-out accuracy, single-utterance and batch
+classification latency, and sense() latency with and without the classifier.
+
+Run from the repository root:
+    python -m benchmarks.bench_intent_classifier --utterances 4000 --llm-latency 0.2
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import tempfile
+import time
+from typing import List, Tuple
+
+from banking_chatbot import BankingChatbot, MockBankingAPI
+from intent_classifier import IntentClassifier, examples_from_interactions
+from intent_router import IntentRouter
+from interaction_log import InteractionLog
+from llm_cache import ResponseCache
+from benchmarks.bench_async_chat import percentile
+from tests.stub_model import StubModel
+
+# (category, intent) -> paraphrases; {account}, {amount}, {loan} and {card} are filled in
+TEMPLATES = {
+    ("ACCOUNT_QUERY", "balance_inquiry"): [
+        "What is the balance of account {account}?", "how much money do I have in {account}",
+        "check my balance", "show available funds in my savings", "balance please",
+        "what's left in my account {account}",
+    ],
+    ("ACCOUNT_QUERY", "transaction_history"): [
+        "Show my transaction history for {account}", "list my recent transactions",
+        "what did I spend last month", "mini statement for {account}", "show me my last payments",
+        "recent debits and credits on {account}",
+    ],
+    ("ACCOUNT_QUERY", "account_details"): [
+        "Show account details for {account}", "what type of account is {account}",
+        "who is the holder of account {account}", "my account information", "account profile please",
+    ],
+    ("SPECIFIC_TASK", "loan_application"): [
+        "I want a {loan} loan of {amount}", "apply for a {loan} loan for account {account}",
+        "can I borrow {amount} to buy a house", "need {amount} financing for a new car",
+        "I'd like to take a {loan} loan", "please process my loan request of {amount}",
+    ],
+    ("SPECIFIC_TASK", "card_blocking"): [
+        "Block my {card} card", "I lost my {card} card", "my {card} card was stolen, freeze it",
+        "please deactivate my card right now", "someone took my wallet with my {card} card",
+    ],
+    ("BASIC_QUERY", "general_inquiry"): [
+        "What are your interest rates?", "what charges do you have", "hello", "what services do you offer",
+        "what are the fees for a savings account", "how do fixed deposit rates compare",
+        "what time do branches open",
+    ],
+}
+
+
+def generate(size: int, seed: int = 7) -> List[Tuple[str, str, str]]:
+    rng = random.Random(seed)
+    labels = list(TEMPLATES)
+    utterances = []
+    for _ in range(size):
+        category, intent = rng.choice(labels)
+        text = rng.choice(TEMPLATES[(category, intent)]).format(
+            account=f"{rng.randrange(10 ** 7, 10 ** 8)}",
+            amount=rng.choice(("50000", "₹75,000", "2 lakhs", "1.5 crore")),
+            loan=rng.choice(("personal", "home", "car")),
+            card=rng.choice(("credit", "debit")),
+        )
+        if rng.random() < 0.3:
+            text = rng.choice(("please ", "hi, ", "")) + text.lower()
+        utterances.append((text, category, intent))
+    return utterances
+
+
+class LabelingModel(StubModel):
+    """Stub model that answers with the generated label, standing in for a correct LLM"""
+    
+    def __init__(self, latency: float, labels):
+        super().__init__(latency)
+        self.labels = labels
+    
+    def _reply(self, prompt: str):
+        reply = super()._reply(prompt)
+        query = re.search(r'User Query: "(.*)"', prompt)
+        if query and query.group(1) in self.labels:
+            category, intent = self.labels[query.group(1)]
+            reply.text = json.dumps({"category": category, "intent": intent, "entities": {}, "confidence": 0.9})
+        return reply
+
+
+def sense_latencies(bot: BankingChatbot, utterances: List[Tuple[str, str, str]]) -> List[float]:
+    latencies = []
+    for text, _, _ in utterances:
+        start = time.perf_counter()
+        bot.sense(text)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--utterances", type=int, default=4000)
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="seconds per stub model call")
+    parser.add_argument("--sense-sample", type=int, default=50,
+                        help="held-out utterances timed through sense() with and without the classifier")
+    parser.add_argument("--threshold", type=float, default=0.6)
+    args = parser.parse_args()
+    
+    data = generate(args.utterances)
+    train, test = data[:len(data) // 2], data[len(data) // 2:]
+    
+    # Collect labeled interactions the way the chatbot does; only the labels matter here
+    labels = {text: (category, intent) for text, category, intent in data}
+    collector = BankingChatbot(api=MockBankingAPI(0), llm=LabelingModel(0, labels),
+                               router=IntentRouter(threshold=1.1), cache=ResponseCache(max_entries=0),
+                               interaction_log=InteractionLog(capacity=len(train)))
+    for text, _, _ in train:
+        collector.learn(text, collector.sense(text), "", None)
+    
+    start = time.perf_counter()
+    classifier = IntentClassifier.train(examples_from_interactions(collector.learning_data),
+                                        threshold=args.threshold)
+    train_s = time.perf_counter() - start
+    
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "intents.bin")
+        classifier.save(path)
+        start = time.perf_counter()
+        loaded = IntentClassifier.load(path, threshold=args.threshold)
+        load_s = time.perf_counter() - start
+        model_mb = os.path.getsize(path) / 1e6
+        
+        texts = [text for text, _, _ in test]
+        single = []
+        predictions = []
+        for text in texts:
+            t0 = time.perf_counter()
+            predictions.append(loaded.classify(text))
+            single.append(time.perf_counter() - t0)
+        start = time.perf_counter()
+        batch = loaded.classify_batch(texts)
+        batch_s = time.perf_counter() - start
+        
+        hits = sum((p["category"], p["intent"]) == (category, intent)
+                   for p, (_, category, intent) in zip(predictions, test))
+        confident = [(p, label) for p, label in zip(predictions, test) if p["confidence"] >= args.threshold]
+        confident_hits = sum((p["category"], p["intent"]) == (category, intent)
+                             for p, (_, category, intent) in confident)
+        assert batch == predictions
+        
+        sample = test[:args.sense_sample]
+        llm_only = BankingChatbot(api=MockBankingAPI(0), llm=LabelingModel(args.llm_latency, labels),
+                                  router=IntentRouter(threshold=1.1), cache=ResponseCache(max_entries=0))
+        with_classifier = BankingChatbot(api=MockBankingAPI(0), llm=LabelingModel(args.llm_latency, labels),
+                                         router=IntentRouter(threshold=1.1), cache=ResponseCache(max_entries=0),
+                                         classifier=loaded)
+        llm_latencies = sense_latencies(llm_only, sample)
+        local_latencies = sense_latencies(with_classifier, sample)
+    
+    print(json.dumps({
+        "backend": loaded.backend,
+        "train_examples": len(train),
+        "labels": len(classifier.labels),
+        "train_s": round(train_s, 3),
+        "model_mb": round(model_mb, 2),
+        "load_ms": round(load_s * 1000, 3),
+        "accuracy": round(hits / len(test), 4),
+        "answered_locally": round(len(confident) / len(test), 4),
+        "accuracy_when_answered": round(confident_hits / len(confident), 4) if confident else None,
+        "classify_p50_us": round(percentile(single, 50) * 1e6, 1),
+        "classify_p99_us": round(percentile(single, 99) * 1e6, 1),
+        "batch_per_s": round(len(texts) / batch_s),
+        "sense_llm_p50_ms": round(percentile(llm_latencies, 50) * 1000, 3),
+        "sense_with_classifier_p50_ms": round(percentile(local_latencies, 50) * 1000, 3),
+    }))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Benchmark: LLM calls and sense() latency saved by the fast-path IntentRouter
+
+Replays a labeled utterance corpus through BankingChatbot.sense() with the
+router disabled and enabled (stubbed model with a fixed latency) and reports
+LLM calls, fast-path hit rate, total sense() time, and how often fast-path
+answers agree with the labels.
+
+Run from the repository root:
+    python -m benchmarks.bench_intent_router --llm-latency 0.02 --threshold 0.75
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import time
+from typing import Dict, List, Tuple
+
+from banking_chatbot import BankingChatbot, MockBankingAPI
+from intent_router import IntentRouter
+from tests.stub_model import StubModel
+
+# (utterance, category, intent)
+CORPUS: List[Tuple[str, str, str]] = [
+    ("What is my balance?", "ACCOUNT_QUERY", "balance_inquiry"),
+    ("Check the balance of account 12345678", "ACCOUNT_QUERY", "balance_inquiry"),
+    ("How much money do I have", "ACCOUNT_QUERY", "balance_inquiry"),
+    ("balance please", "ACCOUNT_QUERY", "balance_inquiry"),
+    ("Show my transaction history", "ACCOUNT_QUERY", "transaction_history"),
+    ("last 5 transactions for 87654321", "ACCOUNT_QUERY", "transaction_history"),
+    ("Can I get my account statement", "ACCOUNT_QUERY", "transaction_history"),
+    ("show account details for 87654321", "ACCOUNT_QUERY", "account_details"),
+    ("What email is on my account?", "ACCOUNT_QUERY", "account_details"),
+    ("What are your interest rates?", "BASIC_QUERY", "general_inquiry"),
+    ("fixed deposit rates", "BASIC_QUERY", "general_inquiry"),
+    ("What charges do you have?", "BASIC_QUERY", "general_inquiry"),
+    ("Are there any ATM fees", "BASIC_QUERY", "general_inquiry"),
+    ("hello", "BASIC_QUERY", "general_inquiry"),
+    ("What services do you offer?", "BASIC_QUERY", "general_inquiry"),
+    ("What is the interest rate on a home loan?", "BASIC_QUERY", "general_inquiry"),
+    ("I want to apply for a personal loan", "SPECIFIC_TASK", "loan_application"),
+    ("home loan of 5000000 for account 12345678", "SPECIFIC_TASK", "loan_application"),
+    ("need a car loan", "SPECIFIC_TASK", "loan_application"),
+    ("Block my debit card", "SPECIFIC_TASK", "card_blocking"),
+    ("I lost my credit card, account 12345678", "SPECIFIC_TASK", "card_blocking"),
+    ("my card was stolen please block it", "SPECIFIC_TASK", "card_blocking"),
+    ("12345678", "ACCOUNT_QUERY", "balance_inquiry"),
+    ("personal", "SPECIFIC_TASK", "loan_application"),
+]
+
+
+class CountingModel(StubModel):
+    """StubModel that counts calls"""
+    
+    def __init__(self, latency: float):
+        super().__init__(latency)
+        self.calls = 0
+    
+    def generate_content(self, prompt: str):
+        self.calls += 1
+        return super().generate_content(prompt)
+
+
+def replay(threshold: float, llm_latency: float, repeat: int) -> Dict:
+    llm = CountingModel(llm_latency)
+    router = IntentRouter(threshold=threshold)
+    bot = BankingChatbot(api=MockBankingAPI(latency_scale=0), llm=llm, router=router)
+    
+    fast_answers = fast_correct = 0
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            for utterance, category, intent in CORPUS:
+                classification = bot.sense(utterance)
+                if classification.get("source") == "fast_path":
+                    fast_answers += 1
+                    fast_correct += (classification["category"], classification["intent"]) == (category, intent)
+    elapsed = time.perf_counter() - start
+    
+    return {
+        "threshold": threshold if threshold <= 1 else "disabled",
+        "utterances": repeat * len(CORPUS),
+        "llm_calls": llm.calls,
+        "fast_path_hit_rate": round(router.hit_rate, 3),
+        "fast_path_accuracy": round(fast_correct / fast_answers, 3) if fast_answers else None,
+        "sense_total_s": round(elapsed, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--llm-latency", type=float, default=0.02)
+    parser.add_argument("--threshold", type=float, default=0.75)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    
+    baseline = replay(float("inf"), args.llm_latency, args.repeat)
+    routed = replay(args.threshold, args.llm_latency, args.repeat)
+    for result in (baseline, routed):
+        print(json.dumps(result))
+    print(json.dumps({
+        "llm_call_reduction": round(1 - routed["llm_calls"] / baseline["llm_calls"], 3),
+        "latency_saved_s": round(baseline["sense_total_s"] - routed["sense_total_s"], 3),
+    }))
+
+
+if __name__ == "__main__":
+    main()
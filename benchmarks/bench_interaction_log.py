@@ -0,0 +1,109 @@
+"""Benchmark: InteractionLog append latency, memory and on-disk size vs an unbounded list
+
+Appends N chatbot-shaped interaction records to a plain list (the old
+learning_data) and to InteractionLog with and without a background writer,
+reporting per-append latency, peak traced memory and what is still held once
+the writer has caught up, bytes on
+disk (plain and gzip segments) and the rate at which read_interactions scans
+them back.
+
+Run from the repository root:
+    python -m benchmarks.bench_interaction_log --records 200000
+"""
+
+import argparse
+import gc
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List
+
+from benchmarks.bench_async_chat import percentile
+from interaction_log import InteractionLog, read_interactions
+
+
+def make_record(i: int) -> Dict:
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "session_id": f"s{i % 5000}",
+        "user_input": "Show my transaction history for account 12345678",
+        "classification": {"category": "ACCOUNT_QUERY", "intent": "transaction_history",
+                           "entities": {"account_number": "12345678"}, "confidence": 0.9},
+        "response": "Here are your recent transactions for account 12345678:\n\n" + "• 2024-01-15 - Credit\n" * 5,
+        "user_context": {"account_number": "12345678"},
+    }
+
+
+def measure(append: Callable[[Dict], None], records: int, settle: Callable[[], object] = lambda: None) -> Dict:
+    gc.collect()
+    tracemalloc.start()
+    latencies: List[float] = []
+    for i in range(records):
+        record = make_record(i)
+        start = time.perf_counter()
+        append(record)
+        latencies.append(time.perf_counter() - start)
+    settle()
+    traced, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "append_p50_us": round(percentile(latencies, 50) * 1e6, 2),
+        "append_p99_us": round(percentile(latencies, 99) * 1e6, 2),
+        "peak_mb": round(peak / 2 ** 20, 1),
+        "retained_mb": round(traced / 2 ** 20, 1),
+    }
+
+
+def directory_bytes(directory: str) -> int:
+    return sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=200_000)
+    parser.add_argument("--capacity", type=int, default=1000)
+    parser.add_argument("--segment-mb", type=float, default=16)
+    args = parser.parse_args()
+    
+    unbounded: List[Dict] = []
+    print(json.dumps({"store": "list", **measure(unbounded.append, args.records)}))
+    del unbounded
+    
+    memory_only = InteractionLog(capacity=args.capacity)
+    print(json.dumps({"store": "ring", **measure(memory_only.append, args.records)}))
+    
+    for compress in (False, True):
+        with tempfile.TemporaryDirectory() as directory:
+            log = InteractionLog(directory, capacity=args.capacity, compress=compress,
+                                 segment_bytes=int(args.segment_mb * 2 ** 20))
+            drain = {}
+            
+            def settle():
+                start = time.perf_counter()
+                log.flush()
+                drain["s"] = time.perf_counter() - start
+            
+            result = measure(log.append, args.records, settle)
+            log.close()
+            
+            start = time.perf_counter()
+            scanned = sum(1 for _ in read_interactions(directory))
+            scan_s = time.perf_counter() - start
+            assert scanned == args.records - log.stats["dropped"], scanned
+            
+            print(json.dumps({
+                "store": "ring+gzip" if compress else "ring+jsonl",
+                **result,
+                "drain_after_last_append_s": round(drain["s"], 2),
+                "segments": log.stats["segments"],
+                "dropped": log.stats["dropped"],
+                "disk_mb": round(directory_bytes(directory) / 2 ** 20, 1),
+                "scan_records_per_s": round(scanned / scan_s),
+            }))
+
+
+if __name__ == "__main__":
+    main()
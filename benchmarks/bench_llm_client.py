@@ -0,0 +1,94 @@
+"""Benchmark: raw model calls vs ResilientModel against a fake server through slow spells and an outage
+
+Runs concurrent sense() calls through two chatbots talking to the same local
+fake model server, one calling it directly and one through ResilientModel,
+across scripted phases: healthy, a slow tail, a full outage and recovery.
+Reports p50/p99 sense() latency, how often the local fallback answered, and
+the client's retry, hedge and circuit-breaker counters per phase. Queries
+arrive at a fixed rate, as they would from customers.
+
+Run from the repository root:
+    python -m benchmarks.bench_llm_client --turns 200 --threads 16
+"""
+
+import argparse
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+from banking_chatbot import BankingChatbot, MockBankingAPI
+from intent_router import IntentRouter
+from llm_cache import ResponseCache
+from llm_client import CircuitBreaker, ResilientModel
+from benchmarks.bench_async_chat import CONVERSATIONS, percentile
+from benchmarks.fake_model_server import FakeModelServer, HTTPModel
+
+# (name, server settings)
+PHASES = [
+    ("healthy", {"latency": 0.03, "slow_rate": 0.0, "error_rate": 0.0}),
+    ("slow tail", {"latency": 0.03, "slow_rate": 0.05, "slow_latency": 1.5, "error_rate": 0.0}),
+    ("flaky", {"latency": 0.03, "slow_rate": 0.0, "error_rate": 0.2}),
+    ("outage", {"latency": 0.03, "slow_rate": 0.0, "error_rate": 1.0}),
+    ("recovered", {"latency": 0.03, "slow_rate": 0.0, "error_rate": 0.0}),
+]
+
+
+def chatbot(model) -> BankingChatbot:
+    # Keyword routing and caching off, so every query goes to the model
+    return BankingChatbot(api=MockBankingAPI(0), llm=model, router=IntentRouter(threshold=1.1),
+                          cache=ResponseCache(max_entries=0))
+
+
+def run_phase(bot: BankingChatbot, turns: int, threads: int, qps: float) -> Dict:
+    queries = [turn for script in CONVERSATIONS for turn in script]
+    # Open-loop arrivals: queries keep coming at qps however fast or slow the answers are
+    first = time.perf_counter()
+    
+    def sense(i: int):
+        time.sleep(max(0.0, first + i / qps - time.perf_counter()))
+        start = time.perf_counter()
+        classification = bot.sense(queries[i % len(queries)])
+        return time.perf_counter() - start, classification.get("source") == "fallback"
+    
+    with ThreadPoolExecutor(threads) as executor:
+        results = list(executor.map(sense, range(turns)))
+    latencies: List[float] = [latency for latency, _ in results]
+    return {
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "fallback_share": round(sum(fallback for _, fallback in results) / len(results), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=200, help="sense() calls per phase and client")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--qps", type=float, default=200.0, help="query arrival rate per phase")
+    parser.add_argument("--timeout", type=float, default=0.5, help="ResilientModel per-call deadline")
+    parser.add_argument("--hedge-after", type=float, default=0.15)
+    parser.add_argument("--rate", type=float, default=None, help="ResilientModel requests per second")
+    args = parser.parse_args()
+    
+    with FakeModelServer() as server:
+        raw = chatbot(HTTPModel(server.url))
+        client = ResilientModel(HTTPModel(server.url), rate=args.rate, max_concurrency=args.threads,
+                                timeout=args.timeout, retries=1, backoff=0.02, hedge_after=args.hedge_after,
+                                breaker=CircuitBreaker(failure_threshold=10, reset_timeout=0.5))
+        resilient = chatbot(client)
+        
+        for name, settings in PHASES:
+            for key, value in settings.items():
+                setattr(server, key, value)
+            before = dict(client.stats)
+            raw_result = run_phase(raw, args.turns, args.threads, args.qps)
+            resilient_result = run_phase(resilient, args.turns, args.threads, args.qps)
+            resilient_result.update({key: value - before[key] for key, value in client.stats.items()})
+            resilient_result["breaker"] = client.breaker.state
+            print(json.dumps({"phase": name, "raw": raw_result, "resilient": resilient_result}))
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Benchmark: per-turn cost of metrics, verbose debug output and the sampling profiler
+
+Replays the scripted conversations with a zero-latency stub model and no
+simulated API delay, so the pipeline's own overhead dominates, and reports
+turns/sec and p50/p99 turn latency with metrics disabled, enabled, enabled
+with verbose printing (written to a discarded buffer) and enabled under the
+sampling profiler.
+
+Run from the repository root:
+    python -m benchmarks.bench_metrics --rounds 2000
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import time
+from typing import Dict, List
+
+from banking_chatbot import BankingChatbot, MockBankingAPI
+from llm_cache import ResponseCache
+from metrics import Metrics, SamplingProfiler
+from benchmarks.bench_async_chat import CONVERSATIONS, summarize
+from tests.stub_model import StubModel
+
+
+def run(name: str, rounds: int, metrics: Metrics, verbose: bool = False,
+        profiler: SamplingProfiler = None) -> Dict:
+    # No response cache, so every turn reaches the model and is timed as such
+    bot = BankingChatbot(api=MockBankingAPI(0), llm=StubModel(0), cache=ResponseCache(max_entries=0),
+                         metrics=metrics, verbose=verbose)
+    latencies: List[float] = []
+    with contextlib.ExitStack() as stack:
+        stack.enter_context(contextlib.redirect_stdout(io.StringIO()))
+        if profiler is not None:
+            stack.enter_context(profiler)
+        start = time.perf_counter()
+        for round_number in range(rounds):
+            for i, script in enumerate(CONVERSATIONS):
+                session_id = f"{round_number}-{i}"
+                for turn in script:
+                    t0 = time.perf_counter()
+                    bot.chat(turn, session_id=session_id)
+                    latencies.append(time.perf_counter() - t0)
+        elapsed = time.perf_counter() - start
+    return summarize(name, latencies, elapsed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=2000, help="times to replay the scripted conversations")
+    args = parser.parse_args()
+    
+    results = [
+        run("metrics off", args.rounds, Metrics(enabled=False)),
+        run("metrics on", args.rounds, Metrics()),
+        run("metrics on, verbose", args.rounds, Metrics(), verbose=True),
+        run("metrics on, profiler", args.rounds, Metrics(), profiler=SamplingProfiler()),
+    ]
+    baseline = results[0]["turns_per_s"]
+    for result in results:
+        result["relative"] = round(result["turns_per_s"] / baseline, 3)
+        print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Benchmark: prompt tokens and model round-trips per turn, old prompts vs templates vs merged
+
+Replays the scripted conversations with the keyword fast path and response
+cache off, so every turn reaches the stub model, and counts model calls,
+prompt tokens (estimated at 4 characters per token) and turn latency for the
+original f-string prompts, the compact templates, and the merged sense+reason
+request.
+
+Run from the repository root:
+    python -m benchmarks.bench_prompts --rounds 20 --llm-latency 0.05
+"""
+
+import argparse
+import json
+import time
+from typing import Dict
+
+from banking_chatbot import BankingChatbot, MockBankingAPI
+from intent_router import IntentRouter
+from llm_cache import ResponseCache
+from metrics import estimate_tokens
+from benchmarks.bench_async_chat import CONVERSATIONS
+from tests.stub_model import StubModel
+
+
+class LegacyPromptChatbot(BankingChatbot):
+    """BankingChatbot with the prompts as they were before the templates"""
+    
+    def _classification_prompt(self, user_input: str) -> str:
+        return f"""
+        Analyze this banking customer query and classify it into one of these categories:
+        1. BASIC_QUERY - General questions about services, rates, charges
+        2. ACCOUNT_QUERY - Balance inquiry, transaction history, account details
+        3. SPECIFIC_TASK - Loan application, card blocking, specific actions
+        
+        User Query: "{user_input}"
+        
+        Return a JSON response with:
+        - category: one of the three categories above
+        - intent: specific intent (balance_inquiry, loan_application, card_blocking, etc.)
+        - entities: any account numbers, amounts, or specific details mentioned
+        - confidence: confidence score 0-1
+        
+        JSON Response:
+        """
+    
+    def _reasoning_prompt(self, classification: Dict, user_input: str, context: Dict) -> str:
+        return f"""
+        Based on this customer request classification, determine what information is needed:
+        
+        Category: {classification['category']}
+        Intent: {classification['intent']}
+        User Input: "{user_input}"
+        Current Context: {context}
+        
+        Determine:
+        1. What information do we need from the user?
+        2. What API calls are required?
+        3. What is the next best action?
+        4. Should we ask for clarification?
+        
+        Respond in a conversational, helpful banking assistant tone.
+        """
+
+
+class CountingModel(StubModel):
+    def __init__(self, latency: float):
+        super().__init__(latency)
+        self.calls = 0
+        self.prompt_tokens = 0
+    
+    def generate_content(self, prompt: str):
+        self.calls += 1
+        self.prompt_tokens += estimate_tokens(prompt)
+        return super().generate_content(prompt)
+
+
+def run(name: str, bot_class, rounds: int, llm_latency: float, **kwargs) -> Dict:
+    llm = CountingModel(llm_latency)
+    bot = bot_class(api=MockBankingAPI(0), llm=llm, router=IntentRouter(threshold=1.1),
+                    cache=ResponseCache(max_entries=0), **kwargs)
+    turns = 0
+    start = time.perf_counter()
+    for round_number in range(rounds):
+        for i, script in enumerate(CONVERSATIONS):
+            # One long session per script, so the context builds up turn after turn
+            for turn in script:
+                bot.chat(turn, session_id=str(i))
+                turns += 1
+    elapsed = time.perf_counter() - start
+    return {
+        "prompts": name,
+        "turns": turns,
+        "model_calls_per_turn": round(llm.calls / turns, 2),
+        "prompt_tokens_per_turn": round(llm.prompt_tokens / turns, 1),
+        "mean_turn_ms": round(elapsed / turns * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="seconds per stub model call")
+    args = parser.parse_args()
+    
+    results = [
+        run("legacy", LegacyPromptChatbot, args.rounds, args.llm_latency),
+        run("templates", BankingChatbot, args.rounds, args.llm_latency),
+        run("merged", BankingChatbot, args.rounds, args.llm_latency, merge_reasoning=True),
+    ]
+    for result in results:
+        print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Benchmark: reply rendering, per-turn string building vs pre-rendered templates
+
+Times each reply the action stage renders, built the old way (the rates table
+rebuilt with .replace().title() per line, the transaction list grown with +=)
+and through ReplyTemplates (rates rendered once per rates version, transaction
+lines from a plain function, the list joined), and checks that both renderings
+produce the same text.
+
+Run from the repository root:
+    python -m benchmarks.bench_response_templates --iterations 20000 --rows 50
+"""
+
+import argparse
+import json
+import time
+from typing import Callable, Dict, List
+
+from banking_chatbot import MockBankingAPI
+from response_templates import ReplyTemplates
+
+
+def legacy_rates(rates: Dict[str, float]) -> str:
+    text = "Here are our current interest rates:\n"
+    for service, rate in rates.items():
+        text += f"• {service.replace('_', ' ').title()}: {rate}% per annum\n"
+    return text
+
+
+def legacy_balance(account: Dict) -> str:
+    return (f"Hello {account['customer_name']}! \n"
+            "            \n"
+            "Your account balance details:\n"
+            f"• Account Number: {account['account_number']}\n"
+            f"• Account Type: {account['account_type']}\n"
+            f"• Available Balance: ₹{account['balance']:,.2f}\n"
+            "\n"
+            "Is there anything else I can help you with?")
+
+
+def legacy_transactions(account_number: str, transactions: List[Dict]) -> str:
+    text = f"Here are your recent transactions for account {account_number}:\n\n"
+    for trans in transactions:
+        text += f"• {trans['date']} - {trans['type']} - ₹{trans['amount']:,.2f} - {trans['description']}\n"
+    return text
+
+
+def per_call_us(fn: Callable[[], str], iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return round((time.perf_counter() - start) / iterations * 1e6, 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--rows", type=int, default=50, help="transactions in the history reply")
+    args = parser.parse_args()
+    
+    api = MockBankingAPI(0)
+    replies = ReplyTemplates()
+    rates = api.interest_rates
+    account = api.store.get("12345678")
+    transactions = [{"date": "2024-01-%02d" % (i % 28 + 1), "type": "Debit", "amount": 1234.5 + i,
+                     "description": "Online Purchase"} for i in range(args.rows)]
+    
+    cases = {
+        "rates": (lambda: legacy_rates(rates), lambda: ''.join(replies.rates(rates))),
+        "balance": (lambda: legacy_balance(account), lambda: replies.account("balance", account)),
+        "transactions": (lambda: legacy_transactions("12345678", transactions),
+                         lambda: ''.join(replies.transactions("12345678", transactions))),
+    }
+    for name, (legacy, templated) in cases.items():
+        print(json.dumps({
+            "reply": name,
+            "same_text": legacy() == templated(),
+            "legacy_us": per_call_us(legacy, args.iterations),
+            "templates_us": per_call_us(templated, args.iterations),
+        }))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Benchmark: multi-turn loan flows across load-balanced workers, in-process sessions vs a shared Redis store
+
+Starts a fake Redis server with a simulated round-trip latency. Then runs N
+chatbot "workers" (separate BankingChatbot instances, as separate processes
+would be), with every turn of every conversation sent to the next worker
+round-robin, as a load balancer would. With in-process SessionManagers a
+worker never sees the earlier turns, so the loan flow breaks; with
+RedisSessionStore it completes. Reports completed flows, store round-trips per
+turn and turn latency. A second phase runs concurrent writers against one
+session and checks that no write was lost. Packed vs JSON context size is
+reported too.
+
+Run from the repository root:
+    python -m benchmarks.bench_session_store --workers 4 --sessions 200 --threads 16 --latency 0.0005
+"""
+
+import argparse
+import json
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+from banking_chatbot import BankingChatbot, MockBankingAPI
+from resp_client import ConnectionPool
+from session_store import RedisSessionStore, SessionConflict, pack
+from sessions import SessionManager
+from tests.fake_redis_server import FakeRedisServer
+from tests.stub_model import StubModel
+
+LOAN_FLOW = ["I want to apply for a loan", "My account number is 12345678", "I'd like a home loan",
+             "Apply for a loan of 500000"]
+
+
+def run_flows(workers: List[BankingChatbot], sessions: int, threads: int) -> Dict:
+    latencies: List[float] = []
+    completed = [0]
+    lock = threading.Lock()
+    
+    def converse(index: int):
+        reply = ""
+        for turn_number, turn in enumerate(LOAN_FLOW):
+            bot = workers[(index + turn_number) % len(workers)]
+            start = time.perf_counter()
+            reply = bot.chat(turn, session_id=f"customer-{index}")
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+        if reply.startswith("Loan Application Processed!"):
+            with lock:
+                completed[0] += 1
+    
+    with ThreadPoolExecutor(threads) as pool:
+        list(pool.map(converse, range(sessions)))
+    latencies.sort()
+    return {
+        "completed_flows": completed[0],
+        "sessions": sessions,
+        "turn_p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "turn_p99_ms": round(latencies[int(len(latencies) * 0.99)] * 1000, 2),
+    }
+
+
+def concurrent_writers(store: RedisSessionStore, writers: int, writes: int) -> Dict:
+    """Every writer keeps setting its own field on one shared session; all final values must survive"""
+    gave_up = [0]
+    
+    def write(writer: int):
+        for i in range(writes):
+            while True:
+                session = store.get("shared")
+                session.user_context[f"writer_{writer}"] = i
+                try:
+                    store.update(session)
+                    break
+                except SessionConflict:
+                    # A real worker would retry the turn; so does this one
+                    gave_up[0] += 1
+    
+    threads = [threading.Thread(target=write, args=(i,)) for i in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    session = store.get("shared")
+    store.release(session)
+    expected = {f"writer_{i}": writes - 1 for i in range(writers)}
+    return {"writers": writers, "writes_each": writes, "no_lost_updates": session.user_context == expected,
+            "conflicts_retried": store.stats["conflicts"], "turns_retried": gave_up[0]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.0005, help="seconds per store round-trip")
+    args = parser.parse_args()
+    
+    def bot(sessions) -> BankingChatbot:
+        return BankingChatbot(api=MockBankingAPI(0), llm=StubModel(0), sessions=sessions)
+    
+    in_process = run_flows([bot(SessionManager()) for _ in range(args.workers)], args.sessions, args.threads)
+    print(json.dumps({"sessions_backend": "in_process", "workers": args.workers, **in_process}))
+    
+    with FakeRedisServer(latency=args.latency) as server:
+        host, port = server.address
+        stores = [RedisSessionStore(ConnectionPool(host, port, max_idle=args.threads))
+                  for _ in range(args.workers)]
+        shared = run_flows([bot(store) for store in stores], args.sessions, args.threads)
+        turns = args.sessions * len(LOAN_FLOW)
+        round_trips = sum(store.pool.round_trips for store in stores)
+        print(json.dumps({"sessions_backend": "redis", "workers": args.workers, **shared,
+                          "round_trips_per_turn": round(round_trips / turns, 2),
+                          "conflicts": sum(store.stats["conflicts"] for store in stores)}))
+        
+        context = stores[0].get("customer-0")
+        stores[0].release(context)
+        print(json.dumps({"context_fields": len(context.user_context),
+                          "packed_bytes": len(pack(context.user_context)),
+                          "json_bytes": len(json.dumps(context.user_context).encode())}))
+        
+        print(json.dumps(concurrent_writers(RedisSessionStore(ConnectionPool(host, port), max_retries=20), 8, 100)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Benchmark: memory and per-turn cost of serving many sessions from one BankingChatbot
+
+Runs one short conversation for each of N session ids through a single shared
+chatbot (zero-latency mock API, stubbed model) and reports traced memory
+growth, SessionManager's own estimate of session memory, and eviction counts
+under an optional memory cap.
+
+Run from the repository root:
+    python -m benchmarks.bench_sessions --sessions 10000 --memory-cap-mb 4
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import time
+import tracemalloc
+
+from banking_chatbot import BankingChatbot, MockBankingAPI
+from benchmarks.bench_async_chat import CONVERSATIONS
+from sessions import SessionManager
+from tests.stub_model import StubModel
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=10000)
+    parser.add_argument("--memory-cap-mb", type=float, default=None)
+    args = parser.parse_args()
+    
+    cap = int(args.memory_cap_mb * 1024 * 1024) if args.memory_cap_mb else None
+    manager = SessionManager(max_memory_bytes=cap)
+    bot = BankingChatbot(api=MockBankingAPI(latency_scale=0), llm=StubModel(0), sessions=manager)
+    
+    tracemalloc.start()
+    baseline = tracemalloc.take_snapshot()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(args.sessions):
+            for turn in CONVERSATIONS[i % len(CONVERSATIONS)]:
+                bot.chat(turn, session_id=f"session-{i}")
+    elapsed = time.perf_counter() - start
+    traced = sum(stat.size_diff for stat in tracemalloc.take_snapshot().compare_to(baseline, "filename"))
+    tracemalloc.stop()
+    
+    print(json.dumps({
+        "sessions_served": args.sessions,
+        "live_sessions": len(manager),
+        "traced_bytes": traced,  # includes the chatbot's shared learning_data
+        "estimated_session_bytes": manager.memory_bytes,
+        "turns_per_s": round(sum(len(CONVERSATIONS[i % len(CONVERSATIONS)]) for i in range(args.sessions)) / elapsed),
+        **manager.stats,
+    }))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Benchmark: import time and cold start to first reply, fresh process vs pre-forked worker
+
+Times, in fresh interpreters, `import banking_chatbot` (with the GenAI SDK
+blocked, proving it is not needed), the same import plus building the model
+the way the module used to at import time (needs the SDK installed), and a
+cold start through one stubbed chat() turn. Then warms a SharedState in this
+process and reports how long forked workers take to their first reply.
+Timings are medians; interpreter start-up is measured separately and subtracted.
+
+Run from the repository root:
+    python -m benchmarks.bench_startup --runs 10 --workers 4
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Optional
+
+from banking_chatbot import MockBankingAPI
+from prefork import SharedState, fork_workers, wait_workers
+from tests.stub_model import StubModel
+
+FIRST_TURN = "What is the balance of account 12345678?"
+
+SNIPPETS = {
+    "interpreter": "pass",
+    "import": "import sys; sys.modules['google'] = None; import banking_chatbot",
+    "import_and_model": "import banking_chatbot; banking_chatbot.model",
+    "first_reply": (
+        "import sys; sys.modules['google'] = None\n"
+        "from banking_chatbot import BankingChatbot, MockBankingAPI\n"
+        "from tests.stub_model import StubModel\n"
+        f"BankingChatbot(api=MockBankingAPI(0), llm=StubModel(0)).chat({FIRST_TURN!r})\n"
+    ),
+}
+
+
+def time_snippet(code: str, runs: int) -> Optional[float]:
+    """Median wall time of a fresh interpreter running the code, None if it fails"""
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True)
+        samples.append(time.perf_counter() - start)
+        if result.returncode != 0:
+            return None
+    return statistics.median(samples)
+
+
+def forked_first_reply(workers: int) -> float:
+    """Median time from fork() to a worker's first reply over pre-warmed shared state"""
+    state = SharedState(api=MockBankingAPI(0))
+    state.warm_up()
+    read_end, write_end = os.pipe()
+    fork_started = [0.0]
+    
+    def worker(index: int):
+        # The child inherits fork_started; CLOCK_MONOTONIC is shared across processes
+        state.chatbot(llm=StubModel(0)).chat(FIRST_TURN)
+        os.write(write_end, f"{time.monotonic() - fork_started[0]}\n".encode())
+    
+    for _ in range(workers):
+        fork_started[0] = time.monotonic()
+        wait_workers(fork_workers(1, worker))
+    os.close(write_end)
+    with os.fdopen(read_end) as f:
+        samples = [float(line) for line in f]
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10, help="fresh interpreters per measurement")
+    parser.add_argument("--workers", type=int, default=4, help="workers forked from the warmed master")
+    args = parser.parse_args()
+    
+    # Fresh interpreters must find the repository's modules, wherever this is run from
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    os.environ["PYTHONPATH"] = os.pathsep.join(filter(None, [root, os.environ.get("PYTHONPATH")]))
+    
+    timings = {name: time_snippet(code, args.runs) for name, code in SNIPPETS.items()}
+    baseline = timings.pop("interpreter")
+    
+    def ms(seconds: Optional[float]) -> Optional[float]:
+        return round((seconds - baseline) * 1000, 1) if seconds is not None else None
+    
+    print(json.dumps({
+        "interpreter_ms": round(baseline * 1000, 1),
+        "import_ms": ms(timings["import"]),
+        "import_and_model_ms": ms(timings["import_and_model"]),
+        "cold_first_reply_ms": ms(timings["first_reply"]),
+        "forked_first_reply_ms": round(forked_first_reply(args.workers) * 1000, 1),
+    }))
+
+
+if __name__ == "__main__":
+    main()
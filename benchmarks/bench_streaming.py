@@ -0,0 +1,100 @@
+"""Benchmark: time to first chunk for chat_stream() vs the full reply from chat()
+
+Replays the scripted conversations with a stubbed model and simulated API
+latency, and reports p50/p99 time-to-first-chunk and total turn latency for
+chat() (where the first byte is the whole reply), chat_stream() and
+achat_stream(). Every streamed reply is checked against chat()'s reply.
+
+Run from the repository root:
+    python -m benchmarks.bench_streaming --rounds 20
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import re
+import time
+from typing import Dict, List, Tuple
+
+from banking_chatbot import BankingChatbot, MockBankingAPI
+from intent_router import IntentRouter
+from llm_cache import ResponseCache
+from benchmarks.bench_async_chat import CONVERSATIONS, percentile
+from tests.stub_model import StubModel
+
+# Loan IDs and timestamps vary from run to run, so they are masked before replies are compared
+_VOLATILE = re.compile(r'LOAN[0-9A-Z]+|\d{4}-\d\d-\d\d \d\d:\d\d:\d\d')
+
+
+def timed_chat(bot: BankingChatbot, turn: str, session_id: str) -> Tuple[float, float, str]:
+    start = time.perf_counter()
+    reply = bot.chat(turn, session_id=session_id)
+    elapsed = time.perf_counter() - start
+    return elapsed, elapsed, reply
+
+
+def timed_stream(bot: BankingChatbot, turn: str, session_id: str) -> Tuple[float, float, str]:
+    start = time.perf_counter()
+    first = None
+    chunks = []
+    for chunk in bot.chat_stream(turn, session_id=session_id):
+        if first is None:
+            first = time.perf_counter() - start
+        chunks.append(chunk)
+    return first, time.perf_counter() - start, ''.join(chunks)
+
+
+def timed_astream(bot: BankingChatbot, turn: str, session_id: str) -> Tuple[float, float, str]:
+    async def run():
+        start = time.perf_counter()
+        first = None
+        chunks = []
+        async for chunk in bot.achat_stream(turn, session_id=session_id):
+            if first is None:
+                first = time.perf_counter() - start
+            chunks.append(chunk)
+        return first, time.perf_counter() - start, ''.join(chunks)
+    return asyncio.run(run())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--llm-latency", type=float, default=0.05)
+    parser.add_argument("--api-latency-scale", type=float, default=0.02)
+    args = parser.parse_args()
+    
+    modes = {"chat": timed_chat, "chat_stream": timed_stream, "achat_stream": timed_astream}
+    samples: Dict[str, Dict[str, List[float]]] = {mode: {"first": [], "total": []} for mode in modes}
+    replies: Dict[str, List[str]] = {mode: [] for mode in modes}
+    
+    with contextlib.redirect_stdout(io.StringIO()):
+        for mode, run in modes.items():
+            # Fast path and cache disabled (confidence never exceeds 1), so every turn pays for the model
+            bot = BankingChatbot(api=MockBankingAPI(args.api_latency_scale), llm=StubModel(args.llm_latency),
+                                 router=IntentRouter(threshold=1.1), cache=ResponseCache(max_entries=0))
+            for round_number in range(args.rounds):
+                for i, script in enumerate(CONVERSATIONS):
+                    session_id = f"{round_number}-{i}"
+                    for turn in script:
+                        first, total, reply = run(bot, turn, session_id)
+                        samples[mode]["first"].append(first)
+                        samples[mode]["total"].append(total)
+                        replies[mode].append(_VOLATILE.sub('#', reply))
+    
+    for mode in modes:
+        assert replies[mode] == replies["chat"], mode
+        print(json.dumps({
+            "mode": mode,
+            "turns": len(samples[mode]["total"]),
+            "first_chunk_p50_ms": round(percentile(samples[mode]["first"], 50) * 1000, 1),
+            "first_chunk_p99_ms": round(percentile(samples[mode]["first"], 99) * 1000, 1),
+            "total_p50_ms": round(percentile(samples[mode]["total"], 50) * 1000, 1),
+            "total_p99_ms": round(percentile(samples[mode]["total"], 99) * 1000, 1),
+        }))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Benchmark: TransactionStore vs the old list-of-dicts layout at 1M+ rows
+
+Generates a synthetic history spread over a number of accounts and times the
+queries the chatbot makes (last 30 days, most recent 5, one page deep in the
+history) against both layouts, plus build time and traced memory. The lists
+hand out the dicts they store, while the store builds each returned row, so
+short tail slices favour the lists.
+
+Run from the repository root:
+    python -m benchmarks.bench_transaction_store --rows 1000000 --accounts 100
+"""
+
+import argparse
+import gc
+import json
+import random
+import time
+import tracemalloc
+from datetime import date, timedelta
+from typing import Callable, Dict, List
+
+from transaction_store import TransactionStore
+
+DESCRIPTIONS = ["Salary Credit", "Online Purchase", "ATM Withdrawal", "Transfer from savings",
+                "Utility Bill", "Card Payment", "Interest Credit", "UPI Transfer"]
+
+
+def generate(rows: int, accounts: int, days: int, seed: int = 7) -> List[Dict]:
+    rng = random.Random(seed)
+    start = date.today() - timedelta(days=days)
+    return [
+        {
+            "account_number": f"{10000000 + i % accounts}",
+            "date": (start + timedelta(days=i * days // rows)).isoformat(),
+            "type": rng.choice(("Credit", "Debit")),
+            "amount": round(rng.uniform(10, 50000), 2),
+            "description": rng.choice(DESCRIPTIONS),
+        }
+        for i in range(rows)
+    ]
+
+
+def build_lists(records: List[Dict]) -> Dict[str, List[Dict]]:
+    """The old layout: one most-recent-first list of dicts per account"""
+    accounts: Dict[str, List[Dict]] = {}
+    for record in records:
+        accounts.setdefault(record["account_number"], []).append(
+            {key: record[key] for key in ("date", "type", "amount", "description")})
+    for history in accounts.values():
+        history.reverse()
+    return accounts
+
+
+def measure_build(build: Callable[[], object]):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    built = build()
+    elapsed = time.perf_counter() - start
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return built, elapsed, size
+
+
+def time_queries(run: Callable[[str], object], account_numbers: List[str]) -> float:
+    start = time.perf_counter()
+    for account_number in account_numbers:
+        run(account_number)
+    return (time.perf_counter() - start) / len(account_numbers) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--accounts", type=int, default=100)
+    parser.add_argument("--days", type=int, default=5 * 365)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+    
+    records = generate(args.rows, args.accounts, args.days)
+    lists, list_build_s, list_bytes = measure_build(lambda: build_lists(records))
+    
+    def build_store():
+        store = TransactionStore()
+        store.load_records(records)
+        return store
+    store, store_build_s, store_bytes = measure_build(build_store)
+    
+    cutoff = (date.today() - timedelta(days=30)).isoformat()
+    account_numbers = [f"{10000000 + i % args.accounts}" for i in range(args.queries)]
+    deep_page = args.rows // args.accounts // 40
+    
+    queries = {
+        "last_30_days": (
+            lambda acct: [t for t in lists[acct] if t["date"] >= cutoff],
+            lambda acct: store.recent(acct, days=30),
+        ),
+        "most_recent_5": (
+            lambda acct: lists[acct][:5],
+            lambda acct: store.recent(acct, limit=5),
+        ),
+        "most_recent_5_in_30_days": (
+            lambda acct: [t for t in lists[acct] if t["date"] >= cutoff][:5],
+            lambda acct: store.recent(acct, days=30, limit=5),
+        ),
+        f"page_{deep_page}_of_20": (
+            lambda acct: lists[acct][deep_page * 20:(deep_page + 1) * 20],
+            lambda acct: store.page(acct, deep_page, 20),
+        ),
+    }
+    
+    print(json.dumps({
+        "rows": args.rows,
+        "accounts": args.accounts,
+        "list_build_s": round(list_build_s, 2),
+        "store_build_s": round(store_build_s, 2),
+        "list_mb": round(list_bytes / 2 ** 20, 1),
+        "store_mb": round(store_bytes / 2 ** 20, 1),
+    }))
+    for name, (list_query, store_query) in queries.items():
+        assert list_query(account_numbers[0]) == store_query(account_numbers[0]), name
+        print(json.dumps({
+            "query": name,
+            "list_us": round(time_queries(list_query, account_numbers), 1),
+            "store_us": round(time_queries(store_query, account_numbers), 1),
+        }))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""Batch evaluation: replay a JSONL corpus of labeled conversations through BankingChatbot
+
+Each line of the corpus is one conversation:
+    {"id": "...", "turns": [{"user": "...", "category": "...", "intent": "..."}, ...]}
+Labels are optional per turn. Conversations are spread over a thread or process
+pool, every worker running its own chatbot with a stub (or any pluggable) model
+and a zero-delay, scaled or recorded-latency mock API. The report gives per-stage
+timings, classification accuracy against the labels and aggregate throughput.
+
+Run from the repository root:
+    python -m benchmarks.evaluate benchmarks/conversations.jsonl --repeat 50 --workers 8 --pool process
+"""
+
+import argparse
+import importlib
+import itertools
+import json
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional
+
+from banking_chatbot import BankingChatbot, MockBankingAPI
+from benchmarks.bench_async_chat import percentile
+from metrics import SamplingProfiler
+from tests.stub_model import StubModel
+
+# BankingChatbot methods chat() runs for every turn, in pipeline order
+STAGES = ('extract_entities', 'sense', 'reason', 'action', 'learn')
+
+
+class RecordedLatencyAPI(MockBankingAPI):
+    """MockBankingAPI whose round-trips replay recorded latencies (seconds) in a loop"""
+    
+    def __init__(self, latencies: List[float]):
+        super().__init__(latency_scale=1.0)
+        self._latencies = itertools.cycle(latencies)
+        self._lock = threading.Lock()
+    
+    def _next_latency(self) -> float:
+        with self._lock:
+            return next(self._latencies)
+    
+    def _simulate_delay(self, seconds: float):
+        super()._simulate_delay(self._next_latency())
+    
+    async def _asimulate_delay(self, seconds: float):
+        await super()._asimulate_delay(self._next_latency())
+
+
+def load_corpus(path: str, repeat: int = 1) -> List[Dict]:
+    """Read the corpus, repeating it with distinct conversation ids so sessions never collide"""
+    with open(path, encoding='utf-8') as f:
+        conversations = [json.loads(line) for line in f if line.strip()]
+    return [
+        {**conversation, "id": f"{conversation.get('id', i)}#{round_number}"}
+        for round_number in range(repeat)
+        for i, conversation in enumerate(conversations)
+    ]
+
+
+def load_model(spec: str, llm_latency: float):
+    """'stub', or 'module:attribute' naming a model instance or a no-argument class or factory"""
+    if spec == 'stub':
+        return StubModel(llm_latency)
+    module_name, _, attribute = spec.partition(':')
+    target = getattr(importlib.import_module(module_name), attribute)
+    if isinstance(target, type) or not hasattr(target, 'generate_content'):
+        target = target()
+    return target
+
+
+def build_chatbot(config: Dict) -> BankingChatbot:
+    if config["api_latencies"]:
+        api = RecordedLatencyAPI(config["api_latencies"])
+    else:
+        api = MockBankingAPI(config["api_latency_scale"])
+    return BankingChatbot(api=api, llm=load_model(config["model"], config["llm_latency"]))
+
+
+def instrument(bot: BankingChatbot) -> Dict[str, float]:
+    """Time every pipeline stage on this instance; the returned dict holds each stage's latest duration"""
+    durations: Dict[str, float] = {}
+    for stage in STAGES:
+        def timed(*args, _method=getattr(bot, stage), _stage=stage, **kwargs):
+            start = time.perf_counter()
+            try:
+                return _method(*args, **kwargs)
+            finally:
+                durations[_stage] = time.perf_counter() - start
+        setattr(bot, stage, timed)
+    return durations
+
+
+class _Worker:
+    """One chatbot per thread or process, built on first use"""
+    
+    _local = threading.local()
+    
+    @classmethod
+    def initialize(cls, config: Dict):
+        cls._config = config
+    
+    @classmethod
+    def run(cls, conversation: Dict) -> List[Dict]:
+        local = cls._local
+        if not hasattr(local, 'bot'):
+            local.bot = build_chatbot(cls._config)
+            local.durations = instrument(local.bot)
+        bot, durations = local.bot, local.durations
+        
+        records = []
+        for turn_number, turn in enumerate(conversation["turns"]):
+            durations.clear()
+            start = time.perf_counter()
+            error = None
+            try:
+                bot.chat(turn["user"], session_id=conversation["id"])
+            except Exception as e:
+                error = repr(e)
+            elapsed = time.perf_counter() - start
+            
+            classification = bot.learning_data[-1]["classification"] if error is None else {}
+            records.append({
+                "conversation": conversation["id"],
+                "turn": turn_number,
+                "user": turn["user"],
+                "expected": [turn.get("category"), turn.get("intent")],
+                "predicted": [classification.get("category"), classification.get("intent")],
+                "source": classification.get("source"),
+                "error": error,
+                "timings": {"turn": elapsed, **durations},
+            })
+        return records
+
+
+def run(conversations: List[Dict], config: Dict, pool: str, workers: int) -> Iterator[List[Dict]]:
+    if pool == 'process':
+        executor = ProcessPoolExecutor(workers, initializer=_Worker.initialize, initargs=(config,))
+    else:
+        _Worker.initialize(config)
+        executor = ThreadPoolExecutor(workers)
+    # Processes pay a pickling round-trip per task, so they take conversations in chunks
+    chunksize = max(1, len(conversations) // (workers * 4)) if pool == 'process' else 1
+    with executor:
+        yield from executor.map(_Worker.run, conversations, chunksize=chunksize)
+
+
+def report(records: List[Dict], elapsed: float, conversations: int) -> Dict:
+    labeled = [record for record in records if record["expected"][0] is not None and record["error"] is None]
+    category_hits = sum(record["predicted"][0] == record["expected"][0] for record in labeled)
+    intent_hits = sum(record["predicted"] == record["expected"] for record in labeled)
+    
+    stages = {}
+    for stage in ('turn',) + STAGES:
+        samples = [record["timings"][stage] for record in records if stage in record["timings"]]
+        if samples:
+            stages[stage] = {
+                "mean_ms": round(sum(samples) / len(samples) * 1000, 3),
+                "p50_ms": round(percentile(samples, 50) * 1000, 3),
+                "p99_ms": round(percentile(samples, 99) * 1000, 3),
+            }
+    
+    return {
+        "conversations": conversations,
+        "turns": len(records),
+        "errors": sum(record["error"] is not None for record in records),
+        "elapsed_s": round(elapsed, 3),
+        "turns_per_s": round(len(records) / elapsed, 1),
+        "conversations_per_s": round(conversations / elapsed, 1),
+        "labeled_turns": len(labeled),
+        "category_accuracy": round(category_hits / len(labeled), 4) if labeled else None,
+        "intent_accuracy": round(intent_hits / len(labeled), 4) if labeled else None,
+        "fast_path_share": round(sum(record["source"] == "fast_path" for record in records) / len(records), 4)
+        if records else None,
+        "stages": stages,
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("corpus", help="JSONL file of conversations")
+    parser.add_argument("--repeat", type=int, default=1, help="replay the corpus this many times")
+    parser.add_argument("--pool", choices=("thread", "process"), default="thread")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--model", default="stub",
+                        help="'stub', or module:attribute naming a model object or a factory returning one")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="seconds per stub model call")
+    parser.add_argument("--api-latency-scale", type=float, default=0.0,
+                        help="multiplier on MockBankingAPI's simulated round-trips (0 = no delay)")
+    parser.add_argument("--api-latencies", help="JSON file with a list of recorded API latencies in seconds")
+    parser.add_argument("--details", help="also write one JSON record per turn to this file")
+    parser.add_argument("--profile", help="sample stacks during the run and write them here in collapsed "
+                                          "(flamegraph) format; thread pool only")
+    args = parser.parse_args(argv)
+    if args.profile and args.pool != 'thread':
+        parser.error("--profile samples this process's threads, so it needs --pool thread")
+    
+    api_latencies = None
+    if args.api_latencies:
+        with open(args.api_latencies, encoding='utf-8') as f:
+            api_latencies = json.load(f)
+    config = {
+        "model": args.model,
+        "llm_latency": args.llm_latency,
+        "api_latency_scale": args.api_latency_scale,
+        "api_latencies": api_latencies,
+    }
+    
+    conversations = load_corpus(args.corpus, args.repeat)
+    records: List[Dict] = []
+    profiler = SamplingProfiler() if args.profile else None
+    if profiler is not None:
+        profiler.start()
+    start = time.perf_counter()
+    for conversation_records in run(conversations, config, args.pool, args.workers):
+        records.extend(conversation_records)
+    elapsed = time.perf_counter() - start
+    
+    summary = {"pool": args.pool, "workers": args.workers, **report(records, elapsed, len(conversations))}
+    if profiler is not None:
+        profiler.stop()
+        profiler.write(args.profile)
+        summary["profile_top"] = profiler.top(10)
+    
+    if args.details:
+        with open(args.details, 'w', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+    
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
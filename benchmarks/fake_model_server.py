@@ -0,0 +1,120 @@
+"""Fake model server: answers classification prompts over HTTP with injected latency and errors
+
+POST /generate with {"prompt": "..."} returns {"text": "..."} using the keyword
+stub model. Every request sleeps `latency` seconds, or `slow_latency` for a
+`slow_rate` fraction of them, and a `error_rate` fraction get a 503. All of
+these can be changed while the server runs, to script outages and recoveries.
+
+Run from the repository root:
+    python -m benchmarks.fake_model_server --port 8765 --latency 0.05 --error-rate 0.1
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from tests.stub_model import StubModel, StubResponse
+
+
+class FakeModelServer:
+    def __init__(self, port: int = 0, latency: float = 0.05, slow_rate: float = 0.0, slow_latency: float = 2.0,
+                 error_rate: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.error_rate = error_rate
+        self.stats = {"requests": 0, "errors": 0, "slow": 0}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._stub = StubModel(0)
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), self._handler())
+        self._server.daemon_threads = True
+    
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/generate"
+    
+    def _handler(self):
+        fake = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                prompt = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))["prompt"]
+                with fake._lock:
+                    fake.stats["requests"] += 1
+                    slow = fake._rng.random() < fake.slow_rate
+                    failed = fake._rng.random() < fake.error_rate
+                    fake.stats["slow"] += slow
+                    fake.stats["errors"] += failed
+                time.sleep(fake.slow_latency if slow else fake.latency)
+                if failed:
+                    self.send_error(503, "injected failure")
+                    return
+                body = json.dumps({"text": fake._stub._reply(prompt).text}).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                pass
+        
+        return Handler
+    
+    def start(self) -> 'FakeModelServer':
+        threading.Thread(target=self._server.serve_forever, name='fake-model-server', daemon=True).start()
+        return self
+    
+    def serve_forever(self):
+        self._server.serve_forever()
+    
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+    
+    def __enter__(self) -> 'FakeModelServer':
+        return self.start()
+    
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+class HTTPModel:
+    """Model client for the fake server, with the generate_content() interface BankingChatbot calls"""
+    
+    def __init__(self, url: str, timeout: float = 60.0):
+        self.url = url
+        self.timeout = timeout
+    
+    def generate_content(self, prompt: str) -> StubResponse:
+        request = urllib.request.Request(self.url, data=json.dumps({"prompt": prompt}).encode(),
+                                         headers={'Content-Type': 'application/json'})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return StubResponse(json.loads(response.read())["text"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--slow-rate", type=float, default=0.0)
+    parser.add_argument("--slow-latency", type=float, default=2.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    
+    server = FakeModelServer(args.port, args.latency, args.slow_rate, args.slow_latency, args.error_rate)
+    print(f"Serving fake model at {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
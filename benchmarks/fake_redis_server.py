@@ -0,0 +1,28 @@
+"""Fake Redis server: serve tests/fake_redis_server.py standalone, with injected latency
+
+Run from the repository root:
+    python -m benchmarks.fake_redis_server --port 6399 --latency 0.0005
+"""
+
+import argparse
+
+from tests.fake_redis_server import FakeRedisServer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=6399)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every round-trip")
+    args = parser.parse_args()
+    
+    server = FakeRedisServer(args.port, args.latency)
+    host, port = server.address
+    print(f"Serving fake Redis at {host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Load generator: replays scripted conversations against the chat server at rising concurrency
+
+Each virtual user takes the next conversation from a JSONL file (the
+evaluation set by default) and sends its turns in order under a fresh
+session id, over one keep-alive HTTP connection or WebSocket, with an
+optional think time between turns. For every concurrency level it runs for
+--duration seconds and reports completed turns per second, p50/p95/p99/max
+turn latency, and how many turns were shed (429), refused (503), timed out
+(504) or failed. A shed turn ends its conversation, since the rest of it
+would run without its context, and its user waits out the Retry-After first.
+
+With --spawn it starts an in-process ChatServer with a stubbed model and
+simulated API latency, so no model key or separate server is needed.
+
+Run from the repository root:
+    python -m benchmarks.load_generator --spawn --concurrency 1,16,64,256 --duration 5
+    python -m benchmarks.load_generator --url http://127.0.0.1:8080 --concurrency 8,32 --protocol ws
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import time
+import uuid
+from collections import Counter
+from typing import Dict, List
+from urllib.parse import urlsplit
+
+from banking_chatbot import BankingChatbot, MockBankingAPI
+from benchmarks.bench_async_chat import percentile
+from chat_server import ChatServer
+from tests.chat_clients import HttpClient, WebSocketClient
+from tests.stub_model import StubModel
+
+DEFAULT_CONVERSATIONS = os.path.join(os.path.dirname(__file__), 'conversations.jsonl')
+
+
+def load_conversations(path: str) -> List[List[str]]:
+    with open(path, encoding='utf-8') as f:
+        return [[turn["user"] for turn in json.loads(line)["turns"]] for line in f if line.strip()]
+
+
+async def run_level(host: str, port: int, protocol: str, concurrency: int, duration: float,
+                    conversations: List[List[str]], think_time: float) -> Dict:
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    scripts = itertools.cycle(conversations)
+    deadline = time.perf_counter() + duration
+    client_class = WebSocketClient if protocol == 'ws' else HttpClient
+    
+    async def user():
+        client = client_class(host, port)
+        try:
+            while time.perf_counter() < deadline:
+                session_id = uuid.uuid4().hex
+                for message in next(scripts):
+                    start = time.perf_counter()
+                    try:
+                        status, retry_after = await client.turn(message, session_id)
+                    except (ConnectionError, asyncio.IncompleteReadError):
+                        status, retry_after = 0, 0.0
+                        await client.close()
+                    statuses[status] += 1
+                    if status != 200:
+                        await asyncio.sleep(max(0.0, min(retry_after, deadline - time.perf_counter())))
+                        break
+                    latencies.append(time.perf_counter() - start)
+                    if think_time:
+                        await asyncio.sleep(think_time)
+        finally:
+            await client.close()
+    
+    start = time.perf_counter()
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        "concurrency": concurrency,
+        "protocol": protocol,
+        "turns_ok": statuses[200],
+        "turns_per_sec": round(statuses[200] / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1) if latencies else None,
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1) if latencies else None,
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1) if latencies else None,
+        "max_ms": round(max(latencies) * 1000, 1) if latencies else None,
+        "shed_429": statuses[429],
+        "draining_503": statuses[503],
+        "timeout_504": statuses[504],
+        "failed": sum(count for status, count in statuses.items() if status not in (200, 429, 503, 504)),
+    }
+
+
+async def run(args) -> None:
+    conversations = load_conversations(args.conversations)
+    server = None
+    if args.spawn:
+        bot = BankingChatbot(api=MockBankingAPI(args.api_latency_scale), llm=StubModel(args.model_latency))
+        server = await ChatServer(bot, port=0, max_inflight=args.max_inflight, max_queue=args.max_queue).start()
+        host, port = server.host, server.port
+    else:
+        parts = urlsplit(args.url)
+        host, port = parts.hostname, parts.port or 80
+    for concurrency in args.concurrency:
+        result = await run_level(host, port, args.protocol, concurrency, args.duration, conversations,
+                                 args.think_time)
+        print(json.dumps(result), flush=True)
+    if server is not None:
+        finished = await server.drain(timeout=10)
+        print(json.dumps({"server": server.stats, "drained_cleanly": finished}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default='http://127.0.0.1:8080', help="server to load, unless --spawn")
+    parser.add_argument("--spawn", action='store_true', help="start an in-process server with a stubbed model")
+    parser.add_argument("--protocol", choices=('http', 'ws'), default='http')
+    parser.add_argument("--concurrency", type=lambda text: [int(n) for n in text.split(',')], default=[1, 16, 64],
+                        help="comma-separated virtual-user counts, run one after another")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per concurrency level")
+    parser.add_argument("--think-time", type=float, default=0.0, help="seconds a user waits between turns")
+    parser.add_argument("--conversations", default=DEFAULT_CONVERSATIONS)
+    parser.add_argument("--model-latency", type=float, default=0.05, help="--spawn: stub model latency")
+    parser.add_argument("--api-latency-scale", type=float, default=0.05, help="--spawn: mock API latency scale")
+    parser.add_argument("--max-inflight", type=int, default=64, help="--spawn: server turn slots")
+    parser.add_argument("--max-queue", type=int, default=256, help="--spawn: server queue before 429s")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,507 @@
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import math
+import signal
+import struct
+import time
+import uuid
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from banking_chatbot import BankingChatbot
+
+logger = logging.getLogger(__name__)
+
+HTTP_SECONDS = 'chatbot_http_request_duration_seconds'
+HTTP_SHED = 'chatbot_http_shed_requests'
+
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 411: 'Length Required',
+            413: 'Payload Too Large', 426: 'Upgrade Required', 429: 'Too Many Requests', 431: 'Request Header Fields Too Large',
+            500: 'Internal Server Error', 503: 'Service Unavailable', 504: 'Gateway Timeout'}
+_WS_GUID = b'258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+_WS_TEXT, _WS_CLOSE, _WS_PING, _WS_PONG = 0x1, 0x8, 0x9, 0xA
+# Close codes: normal, going away (the server is draining), protocol error, message too big
+_WS_NORMAL, _WS_GOING_AWAY, _WS_PROTOCOL_ERROR, _WS_TOO_BIG = 1000, 1001, 1002, 1009
+
+
+class Overloaded(Exception):
+    """The server, or this session, already has as many turns waiting as it allows; retry after retry_after seconds"""
+    
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class Draining(Exception):
+    """The server is shutting down and takes no new turns"""
+
+
+class _BadRequest(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class _Lane:
+    """One session's turns: they run one at a time, in the order they arrived"""
+    
+    __slots__ = ('lock', 'waiting')
+    
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.waiting = 0
+
+
+class ChatServer:
+    """Serves a BankingChatbot over HTTP and WebSocket on one asyncio event loop
+
+    Turns run through achat()/achat_stream(), so a turn waiting on the model or
+    the banking API holds no thread. At most max_inflight turns run at once and
+    up to max_queue more wait for a slot; beyond that, requests are shed with
+    429 and a Retry-After instead of queueing without bound. Turns of one
+    session run strictly in arrival order, one at a time, however many
+    connections they come in on, and a session may have at most session_queue
+    of them pending. drain() stops accepting, lets in-flight turns finish, then
+    closes every connection.
+
+    POST /chat takes {"message": ..., "session_id": ...} and returns
+    {"response": ..., "session_id": ...}; GET /ws upgrades to a WebSocket that
+    takes the same messages and streams each reply as {"chunk": ...} frames and
+    a final {"done": true}. GET /healthz answers 503 while draining, GET /stats
+    returns the server's counters and GET /metrics the bot's Prometheus metrics.
+    """
+    
+    def __init__(self, bot: BankingChatbot, host: str = '127.0.0.1', port: int = 8080, max_inflight: int = 64,
+                 max_queue: int = 256, session_queue: int = 8, request_timeout: float = 30.0,
+                 max_body: int = 64 * 1024):
+        self.bot = bot
+        self.host = host
+        self.port = port
+        self.max_inflight = max_inflight
+        self.max_queue = max_queue
+        self.session_queue = session_queue
+        self.request_timeout = request_timeout
+        self.max_body = max_body
+        self.draining = False
+        self.stats = {"accepted": 0, "completed": 0, "shed": 0, "timed_out": 0, "failed": 0, "connections": 0}
+        self.bot.metrics.describe(HTTP_SECONDS, "Chat turn latency at the server, queueing included")
+        self.bot.metrics.describe(HTTP_SHED, "Chat turns refused because the server or session queue was full")
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._lanes: Dict[str, _Lane] = {}
+        self._pending = 0
+        self._running = 0
+        # Moving average of how long a turn holds its slot, for Retry-After
+        self._turn_seconds = 1.0
+        self._idle: Optional[asyncio.Event] = None
+        # Connections blocked reading their next request, which drain() can close straight away;
+        # the value says whether it is a WebSocket, which gets a close frame first
+        self._waiting: Dict[asyncio.StreamWriter, bool] = {}
+        self._connections: Dict[asyncio.StreamWriter, bool] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._closed: Optional[asyncio.Event] = None
+    
+    @property
+    def inflight(self) -> int:
+        return self._running
+    
+    @property
+    def queued(self) -> int:
+        return self._pending - self._running
+    
+    async def start(self) -> 'ChatServer':
+        self._slots = asyncio.Semaphore(self.max_inflight)
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._closed = asyncio.Event()
+        # Backlog sized to the queue, so connection bursts wait in the kernel instead of being reset
+        self._server = await asyncio.start_server(self._handle, self.host, self.port,
+                                                  backlog=self.max_inflight + self.max_queue,
+                                                  limit=self.max_body + 8192)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+    
+    async def serve_forever(self, drain_timeout: float = 30.0):
+        """Serve until SIGINT or SIGTERM, then drain"""
+        if self._server is None:
+            await self.start()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, lambda: asyncio.ensure_future(self.drain(drain_timeout)))
+        await self._closed.wait()
+    
+    async def drain(self, timeout: float = 30.0) -> bool:
+        """Stop accepting, wait up to timeout for in-flight and queued turns, then close every connection
+
+        Returns whether every turn finished before the timeout.
+        """
+        if self.draining:
+            await self._closed.wait()
+            return self._pending == 0
+        self.draining = True
+        self._server.close()
+        for writer, websocket in list(self._waiting.items()):
+            self._hang_up(writer, websocket)
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finished = self._pending == 0
+        for writer, websocket in list(self._connections.items()):
+            self._hang_up(writer, websocket)
+        await self._server.wait_closed()
+        self._closed.set()
+        return finished
+    
+    def _hang_up(self, writer: asyncio.StreamWriter, websocket: bool):
+        if websocket:
+            writer.write(_ws_frame(_WS_CLOSE, struct.pack('!H', _WS_GOING_AWAY)))
+        writer.close()
+    
+    # Turn admission
+    
+    def _retry_after(self) -> float:
+        """Roughly when the turns queued now will have run"""
+        return max(1.0, self._turn_seconds * (self.queued + 1) / self.max_inflight)
+    
+    async def submit(self, session_id: str, turn: Callable[[], Awaitable], route: str = 'chat'):
+        """Run one turn of session_id, after that session's earlier turns, once a slot is free
+
+        Raises Overloaded at once if the server or the session already has a full
+        queue, Draining after drain() started, and asyncio.TimeoutError if the turn
+        has not finished request_timeout seconds after arriving.
+        """
+        if self.draining:
+            raise Draining("Server is shutting down")
+        if self._pending >= self.max_inflight + self.max_queue:
+            self.stats["shed"] += 1
+            self.bot.metrics.inc(HTTP_SHED, reason='server')
+            raise Overloaded("Server is at capacity", self._retry_after())
+        lane = self._lanes.get(session_id)
+        if lane is None:
+            lane = self._lanes[session_id] = _Lane()
+        elif lane.waiting >= self.session_queue:
+            self.stats["shed"] += 1
+            self.bot.metrics.inc(HTTP_SHED, reason='session')
+            raise Overloaded("Too many turns waiting for this session", self._retry_after())
+        
+        self.stats["accepted"] += 1
+        self._pending += 1
+        self._idle.clear()
+        lane.waiting += 1
+        start = time.perf_counter()
+        status = 'ok'
+        try:
+            return await asyncio.wait_for(self._run(lane, turn), self.request_timeout)
+        except asyncio.TimeoutError:
+            status = 'timeout'
+            self.stats["timed_out"] += 1
+            raise
+        except Exception:
+            status = 'error'
+            self.stats["failed"] += 1
+            raise
+        finally:
+            lane.waiting -= 1
+            if lane.waiting == 0:
+                del self._lanes[session_id]
+            self._pending -= 1
+            if self._pending == 0:
+                self._idle.set()
+            if status == 'ok':
+                self.stats["completed"] += 1
+            self.bot.metrics.observe(HTTP_SECONDS, time.perf_counter() - start, route=route, status=status)
+    
+    async def _run(self, lane: _Lane, turn: Callable[[], Awaitable]):
+        # The session's turn comes first, then a slot, so a waiting turn never holds a slot
+        async with lane.lock:
+            async with self._slots:
+                self._running += 1
+                start = time.perf_counter()
+                try:
+                    return await turn()
+                finally:
+                    self._running -= 1
+                    self._turn_seconds += (time.perf_counter() - start - self._turn_seconds) * 0.05
+    
+    # HTTP
+    
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.stats["connections"] += 1
+        self._connections[writer] = False
+        try:
+            while not self.draining:
+                self._waiting[writer] = False
+                try:
+                    request = await _read_request(reader, self.max_body)
+                finally:
+                    self._waiting.pop(writer, None)
+                if request is None:
+                    break
+                method, path, headers, body = request
+                if path == '/ws' and headers.get('upgrade', '').lower() == 'websocket':
+                    await self._websocket(reader, writer, headers)
+                    break
+                status, payload, extra = await self._route(method, path, body)
+                keep_alive = headers.get('connection', '').lower() != 'close' and not self.draining
+                _respond(writer, status, payload, keep_alive, extra)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except _BadRequest as e:
+            _respond(writer, e.status, {"error": str(e)}, False)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._connections.pop(writer, None)
+            writer.close()
+    
+    async def _route(self, method: str, path: str, body: bytes) -> Tuple[int, object, Dict[str, str]]:
+        if path == '/chat':
+            if method != 'POST':
+                return 405, {"error": "Use POST"}, {"Allow": "POST"}
+            try:
+                message, session_id = _parse_turn(body)
+            except ValueError as e:
+                return 400, {"error": str(e)}, {}
+            try:
+                response = await self.submit(session_id, lambda: self.bot.achat(message, session_id=session_id))
+            except Overloaded as e:
+                return 429, {"error": str(e)}, {"Retry-After": str(math.ceil(e.retry_after))}
+            except Draining as e:
+                return 503, {"error": str(e)}, {"Retry-After": "1"}
+            except asyncio.TimeoutError:
+                return 504, {"error": "The turn did not finish in time"}, {}
+            except Exception:
+                logger.exception("Error serving turn for session %s", session_id)
+                return 500, {"error": "Internal error"}, {}
+            return 200, {"response": response, "session_id": session_id}, {}
+        if method != 'GET':
+            return 405, {"error": "Use GET"}, {"Allow": "GET"}
+        if path == '/healthz':
+            if self.draining:
+                return 503, {"status": "draining"}, {}
+            return 200, {"status": "ok"}, {}
+        if path == '/stats':
+            return 200, {**self.stats, "inflight": self.inflight, "queued": self.queued,
+                         "sessions_waiting": len(self._lanes)}, {}
+        if path == '/metrics':
+            return 200, self.bot.metrics.exposition(), {"Content-Type": "text/plain; version=0.0.4"}
+        return 404, {"error": f"No route for {path}"}, {}
+    
+    # WebSocket
+    
+    async def _websocket(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, headers: Dict[str, str]):
+        key = headers.get('sec-websocket-key')
+        if not key:
+            raise _BadRequest(400, "Missing Sec-WebSocket-Key")
+        if headers.get('sec-websocket-version') != '13':
+            _respond(writer, 426, {"error": "Only WebSocket version 13 is supported"}, False,
+                     {"Sec-WebSocket-Version": "13"})
+            return
+        accept = base64.b64encode(hashlib.sha1(key.encode() + _WS_GUID).digest()).decode()
+        writer.write(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                      f"Sec-WebSocket-Accept: {accept}\r\n\r\n").encode())
+        self._connections[writer] = True
+        # Turns without a session id share one session per connection
+        connection_session = uuid.uuid4().hex
+        
+        def send(payload: Dict):
+            writer.write(_ws_frame(_WS_TEXT, json.dumps(payload).encode()))
+        
+        while not self.draining:
+            self._waiting[writer] = True
+            try:
+                opcode, data = await _read_ws_message(reader, writer, self.max_body)
+            except _BadRequest as e:
+                writer.write(_ws_frame(_WS_CLOSE, struct.pack('!H', e.status)))
+                break
+            finally:
+                self._waiting.pop(writer, None)
+            if opcode == _WS_CLOSE:
+                writer.write(_ws_frame(_WS_CLOSE, data[:2] or struct.pack('!H', _WS_NORMAL)))
+                break
+            if opcode != _WS_TEXT:
+                continue
+            try:
+                message, session_id = _parse_turn(data, connection_session)
+            except ValueError as e:
+                send({"error": str(e), "status": 400})
+                continue
+            
+            async def turn():
+                stream = self.bot.achat_stream(message, session_id=session_id)
+                try:
+                    async for chunk in stream:
+                        send({"chunk": chunk})
+                        # Waits while the client is slow to read, so a slow reader slows its own turn only
+                        await writer.drain()
+                finally:
+                    # Finishes the turn now if the client went away mid-reply, not when the stream is collected
+                    await stream.aclose()
+            
+            try:
+                await self.submit(session_id, turn, route='ws')
+                send({"done": True, "session_id": session_id})
+            except Overloaded as e:
+                send({"error": str(e), "status": 429, "retry_after": math.ceil(e.retry_after)})
+            except Draining as e:
+                send({"error": str(e), "status": 503})
+            except asyncio.TimeoutError:
+                send({"error": "The turn did not finish in time", "status": 504})
+            except ConnectionError:
+                raise
+            except Exception:
+                logger.exception("Error serving turn for session %s", session_id)
+                send({"error": "Internal error", "status": 500})
+            await writer.drain()
+        else:
+            writer.write(_ws_frame(_WS_CLOSE, struct.pack('!H', _WS_GOING_AWAY)))
+        self._connections[writer] = False
+
+
+def _parse_turn(body: bytes, default_session: Optional[str] = None) -> Tuple[str, str]:
+    try:
+        request = json.loads(body)
+    except ValueError:
+        raise ValueError("Body is not valid JSON")
+    if not isinstance(request, dict) or not isinstance(request.get("message"), str):
+        raise ValueError('Expected {"message": "...", "session_id": "..."}')
+    session_id = request.get("session_id") or default_session or uuid.uuid4().hex
+    return request["message"], str(session_id)
+
+
+async def _read_request(reader: asyncio.StreamReader, max_body: int):
+    """(method, path, headers, body) of the next request, or None if the client hung up between requests"""
+    try:
+        head = await reader.readuntil(b'\r\n\r\n')
+    except asyncio.IncompleteReadError as e:
+        if e.partial.strip():
+            raise _BadRequest(400, "Incomplete request")
+        return None
+    except asyncio.LimitOverrunError:
+        raise _BadRequest(431, "Request headers too large")
+    lines = head.decode('latin-1').split('\r\n')
+    try:
+        method, target, _ = lines[0].split(' ', 2)
+    except ValueError:
+        raise _BadRequest(400, "Malformed request line")
+    headers = {}
+    for line in lines[1:]:
+        if line:
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+    if 'transfer-encoding' in headers:
+        raise _BadRequest(411, "Chunked bodies are not supported; send Content-Length")
+    try:
+        length = int(headers.get('content-length') or 0)
+    except ValueError:
+        raise _BadRequest(400, "Bad Content-Length")
+    if length > max_body:
+        raise _BadRequest(413, f"Body over {max_body} bytes")
+    body = await reader.readexactly(length) if length else b''
+    return method.upper(), target.split('?', 1)[0], headers, body
+
+
+def _respond(writer: asyncio.StreamWriter, status: int, payload, keep_alive: bool,
+             headers: Optional[Dict[str, str]] = None):
+    if isinstance(payload, str):
+        body = payload.encode('utf-8')
+        content_type = 'text/plain; charset=utf-8'
+    else:
+        body = json.dumps(payload).encode('utf-8')
+        content_type = 'application/json'
+    head = [f"HTTP/1.1 {status} {_REASONS.get(status, 'Unknown')}", f"Content-Type: {content_type}",
+            f"Content-Length: {len(body)}", f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+    for name, value in (headers or {}).items():
+        if name == 'Content-Type':
+            head[1] = f"Content-Type: {value}"
+        else:
+            head.append(f"{name}: {value}")
+    writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + body)
+
+
+def _ws_frame(opcode: int, payload: bytes) -> bytes:
+    """An unmasked, unfragmented frame, as servers send them"""
+    length = len(payload)
+    if length < 126:
+        header = struct.pack('!BB', 0x80 | opcode, length)
+    elif length < 1 << 16:
+        header = struct.pack('!BBH', 0x80 | opcode, 126, length)
+    else:
+        header = struct.pack('!BBQ', 0x80 | opcode, 127, length)
+    return header + payload
+
+
+async def _read_ws_message(reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                           max_size: int) -> Tuple[int, bytes]:
+    """The next complete data message, reassembling fragments, or a close frame
+
+    Pings are answered and pongs dropped as they come, including between the
+    fragments of a message. Raises _BadRequest with the close code to send for an
+    unmasked or out-of-sequence frame, or an oversized message.
+    """
+    opcode, parts, size = None, [], 0
+    while True:
+        first, second = await reader.readexactly(2)
+        frame_opcode = first & 0x0f
+        length = second & 0x7f
+        if length == 126:
+            length = struct.unpack('!H', await reader.readexactly(2))[0]
+        elif length == 127:
+            length = struct.unpack('!Q', await reader.readexactly(8))[0]
+        if not second & 0x80:
+            # RFC 6455 5.1: a server must close the connection on an unmasked client frame
+            raise _BadRequest(_WS_PROTOCOL_ERROR, "Client frames must be masked")
+        if frame_opcode >= _WS_CLOSE:
+            # Control frames are never fragmented and carry at most 125 bytes
+            if length > 125 or not first & 0x80:
+                raise _BadRequest(_WS_PROTOCOL_ERROR, "Malformed control frame")
+        else:
+            if (frame_opcode == 0) != (opcode is not None):
+                raise _BadRequest(_WS_PROTOCOL_ERROR, "Unexpected continuation or data frame")
+            size += length
+            if size > max_size:
+                raise _BadRequest(_WS_TOO_BIG, "Message too big")
+        mask = await reader.readexactly(4)
+        data = bytes(b ^ mask[i % 4] for i, b in enumerate(await reader.readexactly(length)))
+        if frame_opcode == _WS_PING:
+            writer.write(_ws_frame(_WS_PONG, data))
+            continue
+        if frame_opcode == _WS_PONG:
+            continue
+        if frame_opcode >= _WS_CLOSE:
+            return frame_opcode, data
+        if frame_opcode:
+            opcode = frame_opcode
+        parts.append(data)
+        if first & 0x80:
+            return opcode, b''.join(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the banking chatbot over HTTP and WebSocket")
+    parser.add_argument("--host", default='127.0.0.1')
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--max-inflight", type=int, default=64, help="turns running at once")
+    parser.add_argument("--max-queue", type=int, default=256, help="turns waiting for a slot before 429s")
+    parser.add_argument("--session-queue", type=int, default=8, help="turns one session may have pending")
+    parser.add_argument("--timeout", type=float, default=30.0, help="seconds a turn may take, queueing included")
+    parser.add_argument("--drain-timeout", type=float, default=30.0)
+    args = parser.parse_args()
+    
+    async def serve():
+        server = ChatServer(BankingChatbot(), args.host, args.port, args.max_inflight, args.max_queue,
+                            args.session_queue, args.timeout)
+        await server.start()
+        print(f"Serving the banking chatbot at http://{server.host}:{server.port} (Ctrl+C drains and stops)")
+        await server.serve_forever(args.drain_timeout)
+        print(f"Stopped: {server.stats}")
+    
+    asyncio.run(serve())
+
+
+if __name__ == "__main__":
+    main()
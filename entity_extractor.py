@@ -0,0 +1,119 @@
+import re
+from typing import Dict, Optional
+
+# Spoken Indian-English amount units -> multiplier
+AMOUNT_UNITS = {
+    'k': 1e3, 'thousand': 1e3,
+    'lakh': 1e5, 'lakhs': 1e5, 'lac': 1e5, 'lacs': 1e5,
+    'crore': 1e7, 'crores': 1e7, 'cr': 1e7,
+}
+
+_NUMBER = r'\d+(?:,\d+)*(?:\.\d+)?'
+_CURRENCY = r'(?:₹|\brs\.?|\binr)\s*'
+
+_LOAN_TYPES = ('personal', 'home', 'car')
+_CARD_TYPES = ('credit', 'debit')
+
+# Every number is matched once, with any currency sign before it and unit after it;
+# whether it is an amount or an account number is decided from what was captured
+_ALTERNATIVES = (
+    rf'(?P<amount>(?P<currency>{_CURRENCY})?(?P<number>{_NUMBER})'
+    rf'(?:\s*(?P<unit>{"|".join(sorted(AMOUNT_UNITS, key=len, reverse=True))})\b)?)'
+    rf'|\b(?P<loan_type>{"|".join(_LOAN_TYPES)})(?P<loan_word>\s+loans?)?\b'
+    rf'|\b(?P<card_type>{"|".join(_CARD_TYPES)})\s+cards?\b'
+)
+
+# Every alternative starts at a rupee sign, or a word beginning with a digit or one of
+# these letters; checking that first lets the scanner skip all other positions cheaply.
+# The input is lowercased once up front, which is faster than a case-insensitive scan.
+_FIRST_CHARS = ''.join(sorted({word[0] for word in _LOAN_TYPES + _CARD_TYPES + ('rs', 'inr')}))
+_SCANNER = re.compile(rf'(?=[\d{_FIRST_CHARS}₹])(?:\b|(?=₹))(?:{_ALTERNATIVES})')
+
+_LOAN_NAMES = {loan_type: loan_type.title() + ' Loan' for loan_type in _LOAN_TYPES}
+
+# A bare number only counts as the amount when no figure with a currency sign or unit was given
+_EXPLICIT_AMOUNT = 2
+_BARE_AMOUNT = 1
+
+
+class ExtractedEntities:
+    """Entities found in one utterance; None for anything not mentioned"""
+    
+    __slots__ = ('account_number', 'amount', 'amount_text', 'loan_type', 'card_type')
+    
+    def __init__(self, account_number: Optional[str] = None, amount: Optional[float] = None,
+                 amount_text: Optional[str] = None, loan_type: Optional[str] = None,
+                 card_type: Optional[str] = None):
+        self.account_number = account_number
+        self.amount = amount
+        self.amount_text = amount_text
+        self.loan_type = loan_type
+        self.card_type = card_type
+    
+    def __repr__(self) -> str:
+        return f"ExtractedEntities({self.as_context()})"
+    
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, ExtractedEntities):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+    
+    def as_context(self) -> Dict:
+        """The found entities under the user_context keys the chatbot uses"""
+        context = {}
+        if self.account_number is not None:
+            context['account_number'] = self.account_number
+        if self.amount is not None:
+            context['loan_amount'] = self.amount
+        if self.loan_type is not None:
+            context['loan_type'] = self.loan_type
+        if self.card_type is not None:
+            context['card_type'] = self.card_type
+        return context
+
+
+def parse_amount(number: str, unit: Optional[str] = None) -> float:
+    """'1,50,000' -> 150000.0; '2.5', 'crore' -> 25000000.0"""
+    value = float(number.replace(',', ''))
+    if unit:
+        value *= AMOUNT_UNITS[unit.lower()]
+    return value
+
+
+def extract_entities(user_input: str) -> ExtractedEntities:
+    """Pull account number, amount, loan type and card type out of an utterance in one scan"""
+    text = user_input.lower()
+    account_number = card_type = loan_type = amount = None
+    amount_rank = 0
+    named_loan = False
+    
+    # findall hands back plain tuples of the groups, cheaper than a match object per hit
+    for found, currency, number, unit, loan, loan_word, card in _SCANNER.findall(text):
+        if number:
+            if currency or unit:
+                rank = _EXPLICIT_AMOUNT
+            elif len(number) == 8 and number.isdigit():
+                # A plain 8-digit number is an account number, never an amount
+                if account_number is None:
+                    account_number = number
+                continue
+            else:
+                rank = _BARE_AMOUNT
+            if amount_rank < rank:
+                amount, amount_rank = (found, number, unit), rank
+        elif card:
+            if card_type is None:
+                card_type = card
+        elif loan_type is None or (loan_word and not named_loan):
+            # A type named with "loan" beats a bare "home" or "car" elsewhere
+            loan_type = _LOAN_NAMES[loan]
+            named_loan = bool(loan_word)
+    
+    entities = ExtractedEntities(account_number=account_number, loan_type=loan_type, card_type=card_type)
+    if amount is not None:
+        found, number, unit = amount
+        entities.amount = parse_amount(number, unit)
+        # Report the amount as typed, unless lowercasing changed the text's length
+        start = text.find(found) if len(text) == len(user_input) else -1
+        entities.amount_text = user_input[start:start + len(found)] if start >= 0 else found
+    return entities
@@ -0,0 +1,269 @@
+import json
+import math
+import mmap
+import re
+import sys
+import threading
+import zlib
+from array import array
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+CATEGORIES = ('BASIC_QUERY', 'ACCOUNT_QUERY', 'SPECIFIC_TASK')
+
+# Model file layout: magic, header length, JSON header, padding to _ALIGN, then the
+# float32 idf vector (dim) followed by the weight matrix (dim rows x one column per label)
+_MAGIC = b'BCINTENT1\n'
+_ALIGN = 64
+
+_TOKEN = re.compile(r'[a-z]+|\d+')
+
+# Classifications that are not worth learning from: keyword guesses made after a model
+# failure, and the classifier's own predictions
+_UNTRUSTED_SOURCES = ('fallback', 'local_model')
+
+
+@lru_cache(maxsize=None)
+def _numpy():
+    """NumPy if it is installed, else None; imported on first use since it is slow to load"""
+    try:
+        import numpy
+    except ImportError:  # scoring falls back to pure Python
+        return None
+    return numpy
+
+
+def _bucket(feature: str, dim: int) -> int:
+    # crc32 rather than hash(), which is salted per process and would not survive a save
+    return zlib.crc32(feature.encode()) % dim
+
+
+@lru_cache(maxsize=65536)
+def _word_buckets(word: str, dim: int) -> Tuple[int, ...]:
+    """The word itself plus its character 3- and 4-grams, so typos and inflections still overlap"""
+    padded = f'<{word}>'
+    features = [f'w:{word}']
+    for n in (3, 4):
+        features.extend(f'c:{padded[i:i + n]}' for i in range(len(padded) - n + 1))
+    return tuple(_bucket(feature, dim) for feature in features)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase words, with numbers reduced to their shape: account numbers vs other figures"""
+    return ['<acct>' if token.isdigit() and len(token) == 8 else '<num>' if token.isdigit() else token
+            for token in _TOKEN.findall(text.lower())]
+
+
+def hashed_counts(text: str, dim: int) -> Dict[int, int]:
+    """Bucket -> count over the words, word bigrams and character n-grams of an utterance"""
+    tokens = tokenize(text)
+    counts: Dict[int, int] = {}
+    for token in tokens:
+        for bucket in _word_buckets(token, dim):
+            counts[bucket] = counts.get(bucket, 0) + 1
+    for first, second in zip(tokens, tokens[1:]):
+        bucket = _bucket(f'b:{first} {second}', dim)
+        counts[bucket] = counts.get(bucket, 0) + 1
+    return counts
+
+
+def examples_from_interactions(records: Iterable[Dict]) -> Iterator[Tuple[str, str, str]]:
+    """(utterance, category, intent) for every interaction whose classification can be trusted
+
+    Takes BankingChatbot.learning_data or interaction_log.read_interactions(directory).
+    """
+    for record in records:
+        classification = record.get("classification") or {}
+        if classification.get("source") in _UNTRUSTED_SOURCES:
+            continue
+        category, intent = classification.get("category"), classification.get("intent")
+        if category in CATEGORIES and intent and record.get("user_input"):
+            yield record["user_input"], category, intent
+
+
+class IntentClassifier:
+    """On-box intent classifier: hashed n-gram TF-IDF features scored against label centroids
+
+    A drop-in for the model call in sense(): route() answers when the top label's
+    confidence clears the threshold and returns None otherwise, so the LLM is only
+    consulted for the uncertain rest (threshold=0.0 never defers, for offline use).
+    Batches are scored with one vectorized gather-and-sum when NumPy is installed.
+    """
+    
+    def __init__(self, labels: Sequence[Tuple[str, str]], idf, weights, dim: int,
+                 temperature: float = 10.0, threshold: float = 0.6, _buffer=None):
+        self.labels = [tuple(label) for label in labels]
+        self.dim = dim
+        self.temperature = temperature
+        self.threshold = threshold
+        self.stats = {"local_model": 0, "llm": 0}
+        self._stats_lock = threading.Lock()
+        # float32 buffers: in-memory arrays after train(), views into the mapped file after load()
+        self._idf = idf
+        self._weights = weights
+        self._buffer = _buffer  # keeps the mapping alive
+        np = _numpy()
+        self._matrix = np.frombuffer(weights, dtype=np.float32).reshape(dim, len(self.labels)) \
+            if np is not None else None
+    
+    @property
+    def backend(self) -> str:
+        return 'python' if self._matrix is None else 'numpy'
+    
+    @classmethod
+    def train(cls, examples: Iterable[Tuple[str, str, str]], dim: int = 2 ** 15,
+              temperature: float = 10.0, threshold: float = 0.6) -> 'IntentClassifier':
+        """Fit from (utterance, category, intent) triples, e.g. examples_from_interactions(...)"""
+        label_ids: Dict[Tuple[str, str], int] = {}
+        rows: List[Tuple[int, Dict[int, int]]] = []
+        document_frequency: Dict[int, int] = {}
+        for text, category, intent in examples:
+            label = label_ids.setdefault((category, intent), len(label_ids))
+            counts = hashed_counts(text, dim)
+            if not counts:
+                continue
+            rows.append((label, counts))
+            for bucket in counts:
+                document_frequency[bucket] = document_frequency.get(bucket, 0) + 1
+        if not rows:
+            raise ValueError("no usable training examples")
+        
+        # Unseen buckets get the highest idf, as if they appeared in no training utterance
+        idf = array('f', [math.log(len(rows) + 1) + 1.0]) * dim
+        for bucket, frequency in document_frequency.items():
+            idf[bucket] = math.log((len(rows) + 1) / (frequency + 1)) + 1.0
+        
+        # Each centroid is the normalized sum of its examples' unit vectors
+        n_labels = len(label_ids)
+        centroids: List[Dict[int, float]] = [{} for _ in range(n_labels)]
+        for label, counts in rows:
+            buckets, values = cls._weigh(counts, idf)
+            centroid = centroids[label]
+            for bucket, value in zip(buckets, values):
+                centroid[bucket] = centroid.get(bucket, 0.0) + value
+        weights = array('f', [0.0]) * (dim * n_labels)
+        for label, centroid in enumerate(centroids):
+            norm = math.sqrt(sum(value * value for value in centroid.values())) or 1.0
+            for bucket, value in centroid.items():
+                weights[bucket * n_labels + label] = value / norm
+        
+        labels = sorted(label_ids, key=label_ids.get)
+        return cls(labels, idf, weights, dim, temperature=temperature, threshold=threshold)
+    
+    @staticmethod
+    def _weigh(counts: Dict[int, int], idf) -> Tuple[List[int], List[float]]:
+        """Sublinear tf times idf, scaled to unit length"""
+        buckets = list(counts)
+        values = [(1.0 + math.log(counts[bucket])) * idf[bucket] for bucket in buckets]
+        norm = math.sqrt(sum(value * value for value in values)) or 1.0
+        return buckets, [value / norm for value in values]
+    
+    def save(self, path: str):
+        """Write the model in the memory-mappable layout load() reads"""
+        header = json.dumps({
+            "labels": self.labels,
+            "dim": self.dim,
+            "temperature": self.temperature,
+            "byteorder": sys.byteorder,
+        }).encode()
+        prefix = _MAGIC + len(header).to_bytes(4, 'little') + header
+        prefix += b'\0' * (-len(prefix) % _ALIGN)
+        with open(path, 'wb') as f:
+            f.write(prefix)
+            f.write(memoryview(self._idf).cast('B'))
+            f.write(memoryview(self._weights).cast('B'))
+    
+    @classmethod
+    def load(cls, path: str, threshold: float = 0.6) -> 'IntentClassifier':
+        """Map a saved model read-only; workers forked or started from the same file share its pages"""
+        with open(path, 'rb') as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if buffer[:len(_MAGIC)] != _MAGIC:
+            raise ValueError(f"{path} is not an intent classifier model")
+        start = len(_MAGIC) + 4
+        header_length = int.from_bytes(buffer[len(_MAGIC):start], 'little')
+        header = json.loads(buffer[start:start + header_length])
+        if header["byteorder"] != sys.byteorder:
+            raise ValueError(f"{path} was saved on a {header['byteorder']}-endian machine")
+        
+        dim, n_labels = header["dim"], len(header["labels"])
+        offset = start + header_length
+        offset += -offset % _ALIGN
+        floats = memoryview(buffer)[offset:offset + 4 * dim * (1 + n_labels)].cast('f')
+        return cls(header["labels"], floats[:dim], floats[dim:], dim,
+                   temperature=header["temperature"], threshold=threshold, _buffer=buffer)
+    
+    def prefetch(self):
+        """Ask the OS to read a mapped model into the page cache now rather than on first use"""
+        if self._buffer is not None and hasattr(mmap, 'MADV_WILLNEED'):
+            self._buffer.madvise(mmap.MADV_WILLNEED)
+    
+    @property
+    def hit_rate(self) -> float:
+        """Share of route() calls confident enough to skip the LLM"""
+        with self._stats_lock:
+            local, llm = self.stats["local_model"], self.stats["llm"]
+        return local / (local + llm) if local + llm else 0.0
+    
+    def _count(self, stat: str):
+        with self._stats_lock:
+            self.stats[stat] += 1
+    
+    def classify(self, user_input: str) -> Dict:
+        """Classify one utterance, whatever the confidence"""
+        return self.classify_batch([user_input])[0]
+    
+    def classify_batch(self, utterances: Sequence[str]) -> List[Dict]:
+        """Classify many utterances, scoring them all in one pass over the weights"""
+        vectors = [self._weigh(hashed_counts(text, self.dim), self._idf) for text in utterances]
+        if self._matrix is not None:
+            scores = self._scores_numpy(vectors)
+        else:
+            scores = [self._scores_python(buckets, values) for buckets, values in vectors]
+        return [self._result(row) for row in scores]
+    
+    def _scores_numpy(self, vectors: List[Tuple[List[int], List[float]]]) -> List[List[float]]:
+        np = _numpy()
+        lengths = np.fromiter((len(buckets) for buckets, _ in vectors), dtype=np.intp, count=len(vectors))
+        scores = np.zeros((len(vectors), len(self.labels)), dtype=np.float32)
+        if not lengths.any():
+            return scores.tolist()
+        buckets = np.fromiter((b for row, _ in vectors for b in row), dtype=np.intp, count=int(lengths.sum()))
+        values = np.fromiter((v for _, row in vectors for v in row), dtype=np.float32, count=len(buckets))
+        # A sparse (utterances x dim) times dense (dim x labels) product: gather the weight
+        # rows of every feature, scale them, and sum each utterance's segment
+        contributions = self._matrix[buckets] * values[:, None]
+        present = lengths > 0
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))[present]
+        scores[present] = np.add.reduceat(contributions, starts, axis=0)
+        return scores.tolist()
+    
+    def _scores_python(self, buckets: List[int], values: List[float]) -> List[float]:
+        n_labels = len(self.labels)
+        weights = self._weights
+        scores = [0.0] * n_labels
+        for bucket, value in zip(buckets, values):
+            row = bucket * n_labels
+            for label in range(n_labels):
+                scores[label] += weights[row + label] * value
+        return scores
+    
+    def _result(self, scores: List[float]) -> Dict:
+        # Cosine similarities -> softmax, so near-ties and unfamiliar wording both come out unsure
+        top = max(scores)
+        exponentials = [math.exp(self.temperature * (score - top)) for score in scores]
+        best = scores.index(top)
+        category, intent = self.labels[best]
+        confidence = exponentials[best] / sum(exponentials)
+        return {"category": category, "intent": intent, "entities": {},
+                "confidence": round(confidence, 3), "source": "local_model"}
+    
+    def route(self, user_input: str) -> Optional[Dict]:
+        """Return a classification if it clears the threshold, otherwise None to defer to the LLM"""
+        classification = self.classify(user_input)
+        if classification["confidence"] >= self.threshold:
+            self._count("local_model")
+            return classification
+        
+        self._count("llm")
+        return None
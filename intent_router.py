@@ -0,0 +1,110 @@
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+# keyword pattern -> (category, evidence weight)
+KEYWORD_RULES: List[Tuple[str, str, float]] = [
+    ('balance', 'ACCOUNT_QUERY', 1.0),
+    ('transactions?', 'ACCOUNT_QUERY', 1.0),
+    ('statements?', 'ACCOUNT_QUERY', 0.8),
+    ('history', 'ACCOUNT_QUERY', 0.6),
+    ('details', 'ACCOUNT_QUERY', 0.6),
+    ('account', 'ACCOUNT_QUERY', 0.3),
+    ('loans?', 'SPECIFIC_TASK', 0.8),
+    ('apply|application', 'SPECIFIC_TASK', 0.4),
+    ('block|lost|stolen', 'SPECIFIC_TASK', 0.6),
+    ('cards?', 'SPECIFIC_TASK', 0.4),
+    ('interest', 'BASIC_QUERY', 0.8),
+    ('rates?', 'BASIC_QUERY', 0.8),
+    ('charges?|fees?', 'BASIC_QUERY', 0.8),
+    ('hi|hello|help|services', 'BASIC_QUERY', 0.5),
+]
+
+# Within a category the first rule whose keywords all matched picks the intent
+INTENT_RULES: Dict[str, List[Tuple[Tuple[str, ...], str]]] = {
+    'SPECIFIC_TASK': [(('loans?',), 'loan_application'),
+                      (('block|lost|stolen', 'cards?'), 'card_blocking'),
+                      ((), 'general_task')],
+    'ACCOUNT_QUERY': [(('balance',), 'balance_inquiry'),
+                      (('transactions?',), 'transaction_history'),
+                      (('statements?',), 'transaction_history'),
+                      (('history',), 'transaction_history'),
+                      ((), 'account_details')],
+    'BASIC_QUERY': [((), 'general_inquiry')],
+}
+
+# Pseudo-evidence for "none of the above", so a lone weak keyword never looks certain
+_PRIOR = 0.25
+
+# An account number backs whichever account-bound category the keywords point to
+_ACCOUNT_NUMBER_WEIGHT = 0.3
+
+_ACCOUNT_NUMBER = r'\b\d{8}\b'
+
+
+class IntentRouter:
+    """Deterministic fast path that classifies high-confidence queries without the LLM"""
+    
+    def __init__(self, threshold: float = 0.75):
+        # Routes at or above this confidence skip the model; anything above 1.0 disables the fast path
+        self.threshold = threshold
+        self.stats = {"fast_path": 0, "llm": 0}
+        self._stats_lock = threading.Lock()
+        
+        # One alternation over every keyword; the named group tells which rule matched
+        alternatives = [f'(?P<k{i}>{pattern})' for i, (pattern, _, _) in enumerate(KEYWORD_RULES)]
+        alternatives.append(f'(?P<account_number>{_ACCOUNT_NUMBER})')
+        self._scanner = re.compile(r'\b(?:' + '|'.join(alternatives) + r')\b', re.IGNORECASE)
+        self._rule_index = {pattern: i for i, (pattern, _, _) in enumerate(KEYWORD_RULES)}
+    
+    @property
+    def hit_rate(self) -> float:
+        """Share of route() calls the keyword rules answered"""
+        with self._stats_lock:
+            fast_path, llm = self.stats["fast_path"], self.stats["llm"]
+        return fast_path / (fast_path + llm) if fast_path + llm else 0.0
+    
+    def _count(self, stat: str):
+        with self._stats_lock:
+            self.stats[stat] += 1
+    
+    def classify(self, user_input: str) -> Dict:
+        """Classify with keyword evidence alone, whatever the confidence"""
+        matched = set()
+        entities = {}
+        for match in self._scanner.finditer(user_input):
+            if match.lastgroup == 'account_number':
+                entities['account_number'] = match.group()
+            else:
+                matched.add(int(match.lastgroup[1:]))
+        
+        scores: Dict[str, float] = {}
+        for i in matched:
+            _, category, weight = KEYWORD_RULES[i]
+            scores[category] = scores.get(category, 0.0) + weight
+        
+        if not scores:
+            return {"category": "BASIC_QUERY", "intent": "general_inquiry", "entities": entities, "confidence": 0.0}
+        
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        category, top = ranked[0]
+        runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+        if 'account_number' in entities and category != 'BASIC_QUERY':
+            top += _ACCOUNT_NUMBER_WEIGHT
+        confidence = top / (top + runner_up + _PRIOR)
+        
+        intent = next(intent for keywords, intent in INTENT_RULES[category]
+                      if all(self._rule_index[keyword] in matched for keyword in keywords))
+        
+        return {"category": category, "intent": intent, "entities": entities, "confidence": round(confidence, 3)}
+    
+    def route(self, user_input: str) -> Optional[Dict]:
+        """Return a classification if it clears the threshold, otherwise None to defer to the LLM"""
+        classification = self.classify(user_input)
+        if classification["confidence"] >= self.threshold:
+            self._count("fast_path")
+            classification["source"] = "fast_path"
+            return classification
+        
+        self._count("llm")
+        return None
@@ -0,0 +1,172 @@
+import atexit
+import gzip
+import json
+import os
+import re
+import threading
+from collections import deque
+from typing import Dict, Iterator, List, Optional
+
+_SEGMENT_NAME = re.compile(r'^interactions-(\d{6})\.jsonl(\.gz)?$')
+
+
+def _segment_paths(directory: str) -> List[str]:
+    """Segment files in a log directory, oldest first"""
+    if not os.path.isdir(directory):
+        return []
+    names = sorted((int(match.group(1)), name) for name in os.listdir(directory)
+                   for match in [_SEGMENT_NAME.match(name)] if match)
+    return [os.path.join(directory, name) for _, name in names]
+
+
+def read_interactions(directory: str) -> Iterator[Dict]:
+    """Stream every record in a log directory, oldest first, one segment line at a time
+
+    A line cut short by a crash mid-write is skipped rather than ending the scan.
+    """
+    for path in _segment_paths(directory):
+        opener = gzip.open if path.endswith('.gz') else open
+        with opener(path, 'rt', encoding='utf-8') as f:
+            try:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+            except EOFError:
+                # A compressed segment that was never closed ends without its trailer
+                continue
+
+
+class InteractionLog:
+    """Bounded in-memory ring of recent interactions, optionally persisted to an append-only log
+
+    append() only touches memory; when a directory is given, a background thread
+    writes pending records in batches of up to batch_size to numbered JSONL
+    segments (gzip-compressed if asked), starting a new segment once the current
+    one holds segment_bytes of records.
+    If the writer falls more than max_pending records behind, the oldest pending
+    records are dropped and counted rather than blocking the caller.
+    """
+    
+    def __init__(self, directory: Optional[str] = None, capacity: int = 1000,
+                 segment_bytes: int = 64 * 2 ** 20, compress: bool = False,
+                 flush_interval: float = 1.0, batch_size: int = 1000, max_pending: int = 100000):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.compress = compress
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        
+        self.recent = deque(maxlen=capacity)
+        self.stats = {"appended": 0, "written": 0, "dropped": 0, "write_errors": 0, "segments": 0}
+        
+        self._pending = deque(maxlen=max_pending)
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._flushed = threading.Condition(self._lock)
+        self._closed = False
+        self._file = None
+        self._segment_size = 0
+        self._writer = None
+        
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+            existing = _segment_paths(directory)
+            # Always start a fresh segment; earlier ones are never reopened
+            self._next_segment = 1
+            if existing:
+                self._next_segment = int(_SEGMENT_NAME.match(os.path.basename(existing[-1])).group(1)) + 1
+            self._writer = threading.Thread(target=self._run, name='interaction-log-writer', daemon=True)
+            self._writer.start()
+            atexit.register(self.close)
+    
+    def __len__(self) -> int:
+        return len(self.recent)
+    
+    def __iter__(self) -> Iterator[Dict]:
+        return iter(list(self.recent))
+    
+    def append(self, record: Dict):
+        """Record one interaction without waiting on disk"""
+        with self._lock:
+            self.recent.append(record)
+            self.stats["appended"] += 1
+            if self._writer is None:
+                return
+            if len(self._pending) == self._pending.maxlen:
+                self.stats["dropped"] += 1
+            self._pending.append(record)
+        self._wakeup.set()
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until everything appended so far is on disk; False if the timeout ran out"""
+        if self._writer is None:
+            return True
+        self._wakeup.set()
+        with self._flushed:
+            return self._flushed.wait_for(
+                lambda: not (self._pending or self._in_flight) or not self._writer.is_alive(), timeout)
+    
+    def close(self):
+        """Write out what is pending and stop the writer thread"""
+        if self._writer is None or self._closed:
+            return
+        self._closed = True
+        self._wakeup.set()
+        self._writer.join()
+        atexit.unregister(self.close)
+    
+    def _run(self):
+        closing = False
+        while not closing:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            while True:
+                with self._lock:
+                    closing = self._closed
+                    batch = [self._pending.popleft() for _ in range(min(self.batch_size, len(self._pending)))]
+                    self._in_flight = len(batch)
+                if not batch:
+                    break
+                
+                written = 0
+                try:
+                    self._write(batch)
+                    written = len(batch)
+                except OSError:
+                    # A failed batch is lost, but the writer keeps going for the next one
+                    self._file = None
+                
+                with self._flushed:
+                    self._in_flight = 0
+                    self.stats["written"] += written
+                    if written < len(batch):
+                        self.stats["write_errors"] += 1
+                        self.stats["dropped"] += len(batch)
+                    self._flushed.notify_all()
+        
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+    
+    def _write(self, batch: List[Dict]):
+        data = ''.join(json.dumps(record, ensure_ascii=False, separators=(',', ':'), default=str) + '\n'
+                       for record in batch)
+        if self._file is None or self._segment_size >= self.segment_bytes:
+            self._rotate()
+        self._file.write(data)
+        self._file.flush()
+        self._segment_size += len(data)
+    
+    def _rotate(self):
+        if self._file is not None:
+            self._file.close()
+        name = f"interactions-{self._next_segment:06d}.jsonl" + ('.gz' if self.compress else '')
+        path = os.path.join(self.directory, name)
+        opener = gzip.open if self.compress else open
+        self._file = opener(path, 'at', encoding='utf-8')
+        self._next_segment += 1
+        self._segment_size = 0
+        self.stats["segments"] += 1
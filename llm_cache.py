@@ -0,0 +1,110 @@
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+
+_NON_WORD = re.compile(r'[^a-z#]+')
+_DIGITS = re.compile(r'\d+')
+
+
+def normalize_utterance(user_input: str) -> str:
+    """Lowercase, mask numbers and collapse punctuation so trivially different queries share a key"""
+    return _NON_WORD.sub(' ', _DIGITS.sub('#', user_input.lower())).strip()
+
+
+def prompt_fingerprint(*parts: object) -> str:
+    """Stable cache key for the inputs a prompt is built from"""
+    return hashlib.sha1('\x1f'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """LRU + TTL cache for model responses, with an optional SQLite tier that survives restarts"""
+    
+    def __init__(self, max_entries: int = 4096, ttl: float = 3600.0, path: Optional[str] = None,
+                 clock: Callable[[], float] = time.time):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # Wall-clock time, so expiry stays meaningful for entries persisted across restarts
+        self.clock = clock
+        
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+        
+        self._db = None
+        if path is not None:
+            import sqlite3  # only the persistent tier needs it
+            
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute('PRAGMA synchronous=NORMAL')
+            self._db.execute('CREATE TABLE IF NOT EXISTS responses '
+                             '(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)')
+            self._db.execute('DELETE FROM responses WHERE expires_at <= ?', (self.clock(),))
+            self._db.commit()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from either tier"""
+        hits = self.stats["hits"] + self.stats["disk_hits"]
+        total = hits + self.stats["misses"]
+        return hits / total if total else 0.0
+    
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for this key, or None on a miss"""
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.stats["hits"] += 1
+                    return entry[1]
+                del self._entries[key]
+                self.stats["expirations"] += 1
+            
+            if self._db is not None:
+                row = self._db.execute('SELECT value, expires_at FROM responses WHERE key = ? AND expires_at > ?',
+                                       (key, now)).fetchone()
+                if row is not None:
+                    self._store(key, row[0], row[1])
+                    self.stats["disk_hits"] += 1
+                    return row[0]
+            
+            self.stats["misses"] += 1
+            return None
+    
+    def put(self, key: str, value: str):
+        """Cache a response in memory and, if configured, on disk"""
+        expires_at = self.clock() + self.ttl
+        with self._lock:
+            self._store(key, value, expires_at)
+            if self._db is not None:
+                self._db.execute('INSERT OR REPLACE INTO responses (key, value, expires_at) VALUES (?, ?, ?)',
+                                 (key, value, expires_at))
+                self._db.commit()
+    
+    def clear(self):
+        """Drop every cached response from both tiers"""
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute('DELETE FROM responses')
+                self._db.commit()
+    
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+    
+    def _store(self, key: str, value: str, expires_at: float):
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
@@ -0,0 +1,293 @@
+import random
+import threading
+import time
+import weakref
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Optional, Set
+
+
+class ModelUnavailable(Exception):
+    """The model was not called, or not answered in time; callers should use their local fallback"""
+
+
+class RateLimited(ModelUnavailable):
+    """No request token would free up before the call's deadline"""
+
+
+class DeadlineExceeded(ModelUnavailable):
+    """The model did not answer before the call's deadline"""
+
+
+class CircuitOpen(ModelUnavailable):
+    """Recent calls failed, so the model is not being called until the breaker's cool-down passes"""
+
+
+class TokenBucket:
+    """Allows `rate` requests per second on average, in bursts of up to `burst`"""
+    
+    def __init__(self, rate: float, burst: Optional[int] = None, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1, int(rate))
+        self.clock = clock
+        self._tokens = float(self.burst)
+        self._updated = clock()
+        self._lock = threading.Lock()
+    
+    def reserve(self, max_wait: float) -> Optional[float]:
+        """Take a token and return how long to wait before using it; None, taking nothing, if over max_wait
+
+        Tokens may be reserved ahead of time, so waiters are served in the order they asked.
+        """
+        with self._lock:
+            now = self.clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            delay = max(0.0, (1 - self._tokens) / self.rate)
+            if delay > max_wait:
+                return None
+            self._tokens -= 1
+            return delay
+
+
+class CircuitBreaker:
+    """Opens after `failure_threshold` consecutive failures; every `reset_timeout` after that one probe may try"""
+    
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+    
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+    
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            now = self.clock()
+            if now - self._opened_at >= self.reset_timeout:
+                # One caller gets through to probe; the rest keep failing fast until it reports back,
+                # or until another timeout passes in case the probe never does
+                self.state = self.HALF_OPEN
+                self._opened_at = now
+                return True
+            return False
+    
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self._failures = 0
+    
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self._opened_at = self.clock()
+
+
+class ResilientModel:
+    """Wraps a model with a rate limit, a concurrency cap, deadlines, retries, hedging and a circuit breaker
+
+    Exposes the same generate_content()/generate_content_async() as the model it
+    wraps, so BankingChatbot uses it unchanged. Every failure surfaces as an
+    exception, which sense() and reason() already turn into their local fallback;
+    ModelUnavailable subclasses mean the model was skipped or too slow.
+
+    Sync calls run on a pool of max_concurrency threads, which is what lets them
+    be abandoned at the deadline; async calls hold one of max_concurrency
+    semaphore slots per event loop. With hedge_after set, an attempt that has not
+    answered after that many seconds gets a second, parallel request (rate
+    permitting) and the first answer wins.
+    """
+    
+    def __init__(self, model, rate: Optional[float] = None, burst: Optional[int] = None,
+                 max_concurrency: int = 8, timeout: float = 10.0, retries: int = 2, backoff: float = 0.1,
+                 max_backoff: float = 2.0, hedge_after: Optional[float] = None,
+                 breaker: Optional[CircuitBreaker] = None, clock: Callable[[], float] = time.monotonic):
+        self.model = model
+        self.limiter = TokenBucket(rate, burst, clock) if rate else None
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.hedge_after = hedge_after
+        self.breaker = breaker if breaker is not None else CircuitBreaker(clock=clock)
+        self.clock = clock
+        
+        self._executor = ThreadPoolExecutor(max_concurrency, thread_name_prefix='llm-client')
+        self._semaphores: 'weakref.WeakKeyDictionary' = weakref.WeakKeyDictionary()
+        self._stats_lock = threading.Lock()
+        self.stats = {"calls": 0, "successes": 0, "failures": 0, "retries": 0, "hedges": 0, "hedge_wins": 0,
+                      "rate_limited": 0, "deadline_exceeded": 0, "short_circuited": 0}
+    
+    def _count(self, stat: str):
+        with self._stats_lock:
+            self.stats[stat] += 1
+    
+    def generate_content(self, prompt: str, timeout: Optional[float] = None):
+        deadline = self.clock() + (timeout if timeout is not None else self.timeout)
+        self._count("calls")
+        attempt = 0
+        while True:
+            self._check_breaker()
+            try:
+                response = self._attempt(prompt, deadline)
+            except Exception as e:
+                delay = self._failed(e, attempt, deadline)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+            else:
+                self._succeeded()
+                return response
+    
+    async def generate_content_async(self, prompt: str, timeout: Optional[float] = None):
+        import asyncio
+        
+        deadline = self.clock() + (timeout if timeout is not None else self.timeout)
+        self._count("calls")
+        attempt = 0
+        while True:
+            self._check_breaker()
+            try:
+                response = await self._aattempt(prompt, deadline)
+            except Exception as e:
+                delay = self._failed(e, attempt, deadline)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+            else:
+                self._succeeded()
+                return response
+    
+    def _check_breaker(self):
+        if not self.breaker.allow():
+            self._count("short_circuited")
+            raise CircuitOpen("model circuit is open")
+    
+    def _succeeded(self):
+        self.breaker.record_success()
+        self._count("successes")
+    
+    def _failed(self, error: Exception, attempt: int, deadline: float) -> Optional[float]:
+        """Record a failed attempt; the backoff before retrying, or None to give up"""
+        if isinstance(error, RateLimited):
+            # Nothing reached the model, so this says nothing about its health
+            self._count("rate_limited")
+            return None
+        self.breaker.record_failure()
+        self._count("failures")
+        if isinstance(error, DeadlineExceeded):
+            self._count("deadline_exceeded")
+            return None
+        if attempt >= self.retries:
+            return None
+        # Exponential backoff with full jitter, so retries from many callers spread out
+        delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+        if self.clock() + delay >= deadline:
+            return None
+        self._count("retries")
+        return delay
+    
+    def _reserve(self, deadline: float, max_wait: Optional[float] = None) -> Optional[float]:
+        """Seconds to wait for a request token (0 without a limiter), None if none comes in time"""
+        if self.limiter is None:
+            return 0.0
+        remaining = deadline - self.clock()
+        return self.limiter.reserve(remaining if max_wait is None else min(max_wait, remaining))
+    
+    def _attempt(self, prompt: str, deadline: float):
+        delay = self._reserve(deadline)
+        if delay is None:
+            raise RateLimited("model rate limit reached")
+        if delay:
+            time.sleep(delay)
+        
+        primary = self._executor.submit(self.model.generate_content, prompt)
+        pending: Set[Future] = {primary}
+        if self.hedge_after is not None:
+            done, _ = wait(pending, timeout=max(0.0, min(self.hedge_after, deadline - self.clock())))
+            # A hedge is only worth sending if it can go out right away
+            if not done and self._reserve(deadline, max_wait=0.0) is not None:
+                self._count("hedges")
+                pending.add(self._executor.submit(self.model.generate_content, prompt))
+        
+        error: Optional[BaseException] = None
+        while pending:
+            remaining = deadline - self.clock()
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    for other in pending:
+                        other.cancel()
+                    if future is not primary:
+                        self._count("hedge_wins")
+                    return future.result()
+                error = future.exception()
+        if pending:
+            # Calls already running can't be interrupted; their threads finish in the background
+            for future in pending:
+                future.cancel()
+            raise DeadlineExceeded("model did not answer within the deadline")
+        raise error
+    
+    async def _aattempt(self, prompt: str, deadline: float):
+        import asyncio
+        
+        delay = self._reserve(deadline)
+        if delay is None:
+            raise RateLimited("model rate limit reached")
+        if delay:
+            await asyncio.sleep(delay)
+        
+        primary = asyncio.ensure_future(self._acall(prompt))
+        pending = {primary}
+        try:
+            if self.hedge_after is not None:
+                done, _ = await asyncio.wait(pending, timeout=max(0.0, min(self.hedge_after, deadline - self.clock())))
+                if not done and self._reserve(deadline, max_wait=0.0) is not None:
+                    self._count("hedges")
+                    pending.add(asyncio.ensure_future(self._acall(prompt)))
+            
+            error: Optional[BaseException] = None
+            while pending:
+                remaining = deadline - self.clock()
+                if remaining <= 0:
+                    raise DeadlineExceeded("model did not answer within the deadline")
+                done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self._count("hedge_wins")
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    async def _acall(self, prompt: str):
+        import asyncio
+        
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        async with semaphore:
+            if hasattr(self.model, 'generate_content_async'):
+                return await self.model.generate_content_async(prompt)
+            return await asyncio.to_thread(self.model.generate_content, prompt)
+    
+    def close(self):
+        """Stop the call threads, without waiting for calls abandoned at their deadline"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
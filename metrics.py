@@ -0,0 +1,383 @@
+import bisect
+import functools
+import inspect
+import math
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+# Geometric latency buckets, 10µs to ~4 minutes, each 1.5x the last; fine enough that
+# quantiles interpolated inside a bucket stay within a few percent for typical latencies
+DEFAULT_BUCKETS: Tuple[float, ...] = tuple(float(f'{1e-5 * 1.5 ** i:.3g}') for i in range(43))
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for models that don't report usage: about four characters per token"""
+    return max(1, math.ceil(len(text) / 4)) if text else 0
+
+
+class Histogram:
+    """Bucketed distribution of observations, with quantiles interpolated inside a bucket"""
+    
+    __slots__ = ('bounds', 'counts', 'count', 'sum', 'min', 'max')
+    
+    def __init__(self, bounds: Sequence[float] = DEFAULT_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # the last slot is the +Inf bucket
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+    
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+    
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return math.nan
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = self.bounds[i - 1] if i > 0 else 0.0
+                upper = self.bounds[i] if i < len(self.bounds) else self.max
+                # Clamp to what was actually observed, then interpolate within the bucket
+                lower, upper = max(lower, self.min), min(upper, self.max)
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.max
+
+
+class _Timer:
+    __slots__ = ('metrics', 'name', 'labels', 'start')
+    
+    def __init__(self, metrics: 'Metrics', name: str, labels: Labels):
+        self.metrics = metrics
+        self.name = name
+        self.labels = labels
+    
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.metrics._observe(self.name, self.labels, time.perf_counter() - self.start)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class Metrics:
+    """Thread-safe registry of labelled histograms and counters, exportable as Prometheus text
+
+    A disabled registry records nothing and its timers cost a single attribute check.
+    """
+    
+    def __init__(self, enabled: bool = True, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.buckets = tuple(buckets)
+        self._histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._help: Dict[str, str] = {}
+        self._lock = threading.Lock()
+    
+    def describe(self, name: str, help_text: str):
+        """Set the HELP line exported for a metric"""
+        self._help[name] = help_text
+    
+    def timer(self, name: str, **labels: str):
+        """Context manager that observes its body's wall time, in seconds, into a histogram"""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, name, tuple(sorted(labels.items())))
+    
+    def observe(self, name: str, value: float, **labels: str):
+        if self.enabled:
+            self._observe(name, tuple(sorted(labels.items())), value)
+    
+    def inc(self, name: str, amount: float = 1, **labels: str):
+        """Add to a counter; exported with a _total suffix"""
+        if not self.enabled:
+            return
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+    
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+    
+    def _observe(self, name: str, labels: Labels, value: float):
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(labels)
+            if histogram is None:
+                histogram = series[labels] = Histogram(self.buckets)
+            histogram.observe(value)
+    
+    def summary(self) -> Dict[str, Dict]:
+        """count, mean and p50/p95/p99 per histogram series, plus counter values, keyed by series name"""
+        result = {}
+        with self._lock:
+            for name, series in sorted(self._histograms.items()):
+                for labels, histogram in sorted(series.items()):
+                    result[_series(name, labels)] = {
+                        "count": histogram.count,
+                        "mean": histogram.sum / histogram.count,
+                        **{f"p{round(q * 100)}": histogram.quantile(q) for q in QUANTILES},
+                    }
+            for name, series in sorted(self._counters.items()):
+                for labels, value in sorted(series.items()):
+                    result[_series(name + '_total', labels)] = value
+        return result
+    
+    def exposition(self, openmetrics: bool = False) -> str:
+        """Every metric in the Prometheus text format, or OpenMetrics if asked"""
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._histograms.items()):
+                self._header(lines, name, 'histogram')
+                for labels, histogram in sorted(series.items()):
+                    cumulative = 0
+                    for bound, bucket_count in zip(self.buckets, histogram.counts):
+                        cumulative += bucket_count
+                        lines.append(f"{_series(name + '_bucket', labels + (('le', repr(bound)),))} {cumulative}")
+                    lines.append(f"{_series(name + '_bucket', labels + (('le', '+Inf'),))} {histogram.count}")
+                    lines.append(f"{_series(name + '_sum', labels)} {histogram.sum!r}")
+                    lines.append(f"{_series(name + '_count', labels)} {histogram.count}")
+            for name, series in sorted(self._counters.items()):
+                # OpenMetrics names the counter family without the suffix its samples carry
+                self._header(lines, name if openmetrics else name + '_total', 'counter')
+                for labels, value in sorted(series.items()):
+                    lines.append(f"{_series(name + '_total', labels)} {value!r}")
+        if openmetrics:
+            lines.append('# EOF')
+        return '\n'.join(lines) + '\n'
+    
+    def _header(self, lines: List[str], name: str, kind: str):
+        help_text = self._help.get(name) or self._help.get(name.rsplit('_total', 1)[0])
+        if help_text:
+            lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+    
+    def write(self, path: str, openmetrics: bool = False):
+        """Write the exposition to a file atomically, e.g. for node_exporter's textfile collector"""
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.exposition(openmetrics))
+        os.replace(tmp_path, path)
+    
+    def export_every(self, path: str, interval: float = 15.0) -> threading.Event:
+        """Rewrite the metrics file every interval seconds until the returned event is set"""
+        stop = threading.Event()
+        
+        def run():
+            while not stop.wait(interval):
+                self.write(path)
+            self.write(path)
+        
+        threading.Thread(target=run, name='metrics-file-exporter', daemon=True).start()
+        return stop
+    
+    def serve(self, port: int = 9464, host: str = '127.0.0.1') -> 'ThreadingHTTPServer':
+        """Serve GET /metrics from a background thread; call shutdown() on the result to stop"""
+        # http.server pulls in email and logging; only processes that export pay for them
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        
+        metrics = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?', 1)[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                openmetrics = 'application/openmetrics-text' in self.headers.get('Accept', '')
+                body = metrics.exposition(openmetrics).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+                                 if openmetrics else 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                pass
+        
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True).start()
+        return server
+
+
+def _series(name: str, labels: Labels) -> str:
+    if not labels:
+        return name
+    escaped = ','.join(f'{key}="{_escape(value)}"' for key, value in labels)
+    return f"{name}{{{escaped}}}"
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def timed(metric: str, **labels: str):
+    """Method decorator timing each call into self.metrics; works on plain and async methods"""
+    def decorate(method: Callable):
+        if inspect.iscoroutinefunction(method):
+            @functools.wraps(method)
+            async def async_wrapper(self, *args, **kwargs):
+                with self.metrics.timer(metric, **labels):
+                    return await method(self, *args, **kwargs)
+            return async_wrapper
+        
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.metrics.timer(metric, **labels):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorate
+
+
+class TimedProxy:
+    """Wraps an object so every public method call is timed into a histogram labelled by method name
+
+    Attributes that aren't methods are passed through untouched, assignments go to
+    the wrapped object, and isinstance() sees the wrapped object's class.
+    """
+    
+    _OWN = frozenset(('_target', '_metrics', '_metric', '_wrapped'))
+    
+    def __init__(self, target, metrics: Metrics, metric: str):
+        object.__setattr__(self, '_target', target)
+        object.__setattr__(self, '_metrics', metrics)
+        object.__setattr__(self, '_metric', metric)
+        object.__setattr__(self, '_wrapped', {})
+    
+    @property
+    def __class__(self):
+        return self._target.__class__
+    
+    def __setattr__(self, name: str, value):
+        if name in self._OWN:
+            object.__setattr__(self, name, value)
+            return
+        setattr(self._target, name, value)
+        # A replaced method must be wrapped afresh
+        self._wrapped.pop(name, None)
+    
+    def __delattr__(self, name: str):
+        delattr(self._target, name)
+        self._wrapped.pop(name, None)
+    
+    def __getattr__(self, name: str):
+        wrapped = self._wrapped.get(name)
+        if wrapped is not None:
+            return wrapped
+        attribute = getattr(self._target, name)
+        if name.startswith('_') or not callable(attribute):
+            return attribute
+        
+        metrics, metric = self._metrics, self._metric
+        if inspect.iscoroutinefunction(attribute):
+            async def wrapped(*args, **kwargs):
+                with metrics.timer(metric, method=name):
+                    return await attribute(*args, **kwargs)
+        else:
+            def wrapped(*args, **kwargs):
+                with metrics.timer(metric, method=name):
+                    return attribute(*args, **kwargs)
+        self._wrapped[name] = wrapped
+        return wrapped
+
+
+class SamplingProfiler:
+    """Statistical profiler: samples every other thread's stack at a fixed interval
+
+    Stacks are kept in collapsed form ("module:function;module:function count"),
+    which flamegraph.pl and speedscope read directly. Use as a context manager or
+    call start() and stop() around the code of interest.
+    """
+    
+    def __init__(self, interval: float = 0.005, include: Optional[Callable[[str], bool]] = None):
+        self.interval = interval
+        # Optional filter on the filename of the innermost frame, e.g. to skip idle pool threads
+        self.include = include
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def __enter__(self):
+        self.start()
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.stop()
+        return False
+    
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+    
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                if self.include is not None and not self.include(frame.f_code.co_filename):
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                self.samples[';'.join(reversed(stack))] += 1
+    
+    def collapsed(self) -> str:
+        return ''.join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+    
+    def top(self, n: int = 10) -> List[Tuple[str, int]]:
+        """Functions most often on top of the sampled stacks"""
+        leaves: Counter = Counter()
+        for stack, count in self.samples.items():
+            leaves[stack.rsplit(';', 1)[-1]] += count
+        return leaves.most_common(n)
+    
+    def write(self, path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.collapsed())
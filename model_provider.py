@@ -0,0 +1,83 @@
+import os
+import threading
+import weakref
+from typing import Callable, Dict, Optional
+
+# Live providers, so a forked child can drop clients it inherited (SDK channels are not fork-safe)
+_providers: 'weakref.WeakSet[ModelProvider]' = weakref.WeakSet()
+
+
+class ModelProvider:
+    """Hands out one model client, built by the factory the first time it is asked for
+
+    Nothing is imported or configured until get() is called, so a process that
+    never reaches the model (keyword or local-classifier routing, cached replies,
+    the mock API in tests) never pays for the SDK.
+    """
+    
+    def __init__(self, factory: Callable[[], object]):
+        self._factory = factory
+        self._model = None
+        self._lock = threading.Lock()
+        _providers.add(self)
+    
+    @property
+    def loaded(self) -> bool:
+        return self._model is not None
+    
+    def get(self):
+        model = self._model
+        if model is None:
+            with self._lock:
+                if self._model is None:
+                    self._model = self._factory()
+                model = self._model
+        return model
+    
+    def reset(self):
+        """Drop the client so the next get() builds a new one"""
+        with self._lock:
+            self._model = None
+
+
+def _reset_after_fork():
+    # The parent's lock may have been held mid-build by a thread the child doesn't have
+    for provider in list(_providers):
+        provider._lock = threading.Lock()
+        provider._model = None
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def genai_model(model_name: str = 'gemini-pro', api_key: Optional[str] = None):
+    """Import and configure the Google GenAI SDK, then build the model"""
+    import google.generativeai as genai
+    
+    genai.configure(api_key=api_key or os.environ.get('GOOGLE_API_KEY', 'YOUR_GOOGLE_API_KEY'))
+    return genai.GenerativeModel(model_name)
+
+
+class GenAIProvider(ModelProvider):
+    """Lazily created Gemini model; the API key defaults to $GOOGLE_API_KEY
+
+    The model is wrapped in a ResilientModel (deadlines, retries, circuit breaker,
+    plus any rate limit or hedging given in client_options) unless resilient=False.
+    """
+    
+    def __init__(self, model_name: str = 'gemini-pro', api_key: Optional[str] = None,
+                 resilient: bool = True, client_options: Optional[Dict] = None):
+        super().__init__(self._build)
+        self.model_name = model_name
+        self.api_key = api_key
+        self.resilient = resilient
+        self.client_options = client_options or {}
+    
+    def _build(self):
+        model = genai_model(self.model_name, self.api_key)
+        if not self.resilient:
+            return model
+        from llm_client import ResilientModel
+        
+        return ResilientModel(model, **self.client_options)
@@ -0,0 +1,77 @@
+import gc
+import os
+import traceback
+from typing import Callable, Dict, List, Optional
+
+from banking_chatbot import BankingChatbot, MockBankingAPI
+from entity_extractor import extract_entities
+from intent_classifier import IntentClassifier
+from intent_router import IntentRouter
+
+# Exercise every pattern and lookup table on the request path once before forking
+_WARM_UP_UTTERANCES = (
+    "What is the balance of account 12345678?",
+    "Show my transaction history",
+    "I want a home loan of ₹5 lakhs",
+    "Block my credit card",
+    "What are your interest rates?",
+)
+
+
+class SharedState:
+    """Read-only state a master process builds once and its forked workers inherit
+
+    Forked children share the parent's memory pages until they write to them,
+    so the mock API's rate tables, compiled patterns and a memory-mapped
+    classifier are paid for once instead of in every worker. The model client
+    is deliberately not shared: each worker builds its own on first use.
+    """
+    
+    def __init__(self, api: Optional[MockBankingAPI] = None, router: Optional[IntentRouter] = None,
+                 classifier_path: Optional[str] = None, classifier_threshold: float = 0.6):
+        self.api = api or MockBankingAPI()
+        self.router = router if router is not None else IntentRouter()
+        self.classifier = IntentClassifier.load(classifier_path, threshold=classifier_threshold) \
+            if classifier_path else None
+    
+    def warm_up(self):
+        """Touch everything workers will read, then take it out of the garbage collector's reach"""
+        for utterance in _WARM_UP_UTTERANCES:
+            extract_entities(utterance)
+            self.router.classify(utterance)
+            if self.classifier is not None:
+                self.classifier.classify(utterance)
+        if self.classifier is not None:
+            self.classifier.prefetch()
+        
+        # A collection in a child writes to every tracked object's header, copying the
+        # page it lives on; frozen objects are skipped, so shared pages stay shared
+        gc.collect()
+        gc.freeze()
+    
+    def chatbot(self, **kwargs) -> BankingChatbot:
+        """A chatbot over the shared state; call it in the worker, after the fork"""
+        return BankingChatbot(api=self.api, router=self.router, classifier=self.classifier, **kwargs)
+
+
+def fork_workers(workers: int, target: Callable[[int], None]) -> List[int]:
+    """Fork worker processes that each run target(index) and exit; returns their pids (POSIX only)"""
+    pids = []
+    for index in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                target(index)
+            except BaseException:
+                traceback.print_exc()
+                code = 1
+            finally:
+                os._exit(code)
+        pids.append(pid)
+    return pids
+
+
+def wait_workers(pids: List[int]) -> Dict[int, int]:
+    """Wait for forked workers to finish; pid -> exit code"""
+    return {pid: os.waitstatus_to_exitcode(os.waitpid(pid, 0)[1]) for pid in pids}
@@ -0,0 +1,88 @@
+import json
+from typing import Dict, Iterable, Tuple
+
+from metrics import estimate_tokens
+
+# The only context fields that bear on each intent's next step
+INTENT_FIELDS: Dict[str, Tuple[str, ...]] = {
+    'balance_inquiry': ('account_number',),
+    'transaction_history': ('account_number',),
+    'account_details': ('account_number',),
+    'loan_application': ('account_number', 'loan_type', 'loan_amount'),
+    'card_blocking': ('account_number', 'card_type'),
+}
+_ALL_FIELDS = tuple(sorted({field for fields in INTENT_FIELDS.values() for field in fields}))
+
+
+class PromptTemplate:
+    """A prompt split into a static instruction prefix, built once, and a small per-call suffix
+
+    The prefix comes first and is byte-identical on every call, so providers that
+    cache shared prompt prefixes can reuse it; only the suffix varies.
+    """
+    
+    def __init__(self, name: str, prefix: str, suffix: str):
+        self.name = name
+        self.prefix = prefix.strip() + '\n'
+        self.suffix = suffix
+        self.prefix_tokens = estimate_tokens(self.prefix)
+    
+    def render(self, **fields) -> str:
+        return self.prefix + self.suffix.format(**fields)
+    
+    def tokens(self, **fields) -> int:
+        """Estimated prompt tokens for these fields"""
+        return self.prefix_tokens + estimate_tokens(self.suffix.format(**fields))
+
+
+_CLASSIFY_INSTRUCTIONS = """
+Classify the banking customer query below. Categories and their intents:
+BASIC_QUERY: general_inquiry (services, interest rates, charges)
+ACCOUNT_QUERY: balance_inquiry, transaction_history, account_details
+SPECIFIC_TASK: loan_application, card_blocking, general_task
+"""
+
+CLASSIFY = PromptTemplate('sense', _CLASSIFY_INSTRUCTIONS + """
+Reply with JSON only: {"category": str, "intent": str, "entities": {account numbers, amounts, other details}, "confidence": 0-1}
+""", 'User Query: {query}')
+
+REASON = PromptTemplate('reason', """
+You are a banking assistant planning the next step for a classified customer request.
+In two or three helpful, conversational sentences, say what information is still needed,
+which banking operations apply, and whether to ask the customer to clarify.
+""", 'Category: {category}\nIntent: {intent}\nKnown: {known}\nUser Query: {query}')
+
+# One round-trip instead of two: the classification and the reasoning text together
+CLASSIFY_AND_REASON = PromptTemplate('sense_reason', _CLASSIFY_INSTRUCTIONS + """
+Also plan the next step: in two or three helpful, conversational sentences, say what
+information is still needed given the details already known, which banking operations apply,
+and whether to ask the customer to clarify.
+Reply with JSON only: {"category": str, "intent": str, "entities": {account numbers, amounts, other details}, "confidence": 0-1, "reasoning": str}
+""", 'Known: {known}\nUser Query: {query}')
+
+
+def relevant_fields(intent: str, context: Dict) -> Tuple[str, ...]:
+    """Names of the context fields this intent uses that are already known"""
+    return tuple(field for field in INTENT_FIELDS.get(intent, ()) if field in context)
+
+
+def known_fields(fields: Iterable[str]) -> str:
+    """Compact list of known field names; values stay out, since reasoning is shared across customers"""
+    return ', '.join(fields) or 'nothing'
+
+
+def classification_prompt(user_input: str) -> str:
+    return CLASSIFY.render(query=json.dumps(user_input, ensure_ascii=False))
+
+
+def reasoning_prompt(classification: Dict, user_input: str, context: Dict) -> str:
+    intent = classification['intent']
+    return REASON.render(category=classification['category'], intent=intent,
+                         known=known_fields(relevant_fields(intent, context)),
+                         query=json.dumps(user_input, ensure_ascii=False))
+
+
+def merged_prompt(user_input: str, context: Dict) -> str:
+    # The intent isn't known yet, so every field any intent uses is listed
+    return CLASSIFY_AND_REASON.render(known=known_fields(field for field in _ALL_FIELDS if field in context),
+                                      query=json.dumps(user_input, ensure_ascii=False))
@@ -0,0 +1,120 @@
+import socket
+import threading
+from typing import List, Optional, Sequence, Union
+
+Arg = Union[bytes, str, int, float]
+
+
+class RedisError(Exception):
+    """The server answered a command with an error reply"""
+
+
+def encode_command(args: Sequence[Arg]) -> bytes:
+    """One command as a RESP array of bulk strings"""
+    parts = [b'*%d\r\n' % len(args)]
+    for arg in args:
+        if not isinstance(arg, bytes):
+            arg = str(arg).encode('utf-8')
+        parts.append(b'$%d\r\n' % len(arg))
+        parts.append(arg)
+        parts.append(b'\r\n')
+    return b''.join(parts)
+
+
+class RedisConnection:
+    """A blocking connection speaking RESP2, enough of the Redis protocol for the session store
+
+    Commands are sent in pipelines: every command goes out in one write and the
+    replies are read back together, so a pipeline costs one network round-trip.
+    """
+    
+    def __init__(self, host: str = '127.0.0.1', port: int = 6379, timeout: Optional[float] = 5.0):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._reader = self.sock.makefile('rb')
+        self.round_trips = 0
+    
+    def execute(self, *args: Arg):
+        return self.pipeline([args])[0]
+    
+    def pipeline(self, commands: Sequence[Sequence[Arg]], raise_errors: bool = True) -> List:
+        """Send every command at once and return their replies in order
+
+        Error replies are raised after all replies are read, so the connection stays
+        usable; with raise_errors=False they are returned as RedisError instances.
+        """
+        self.sock.sendall(b''.join(encode_command(command) for command in commands))
+        self.round_trips += 1
+        replies = [self._read_reply() for _ in commands]
+        if raise_errors:
+            for reply in replies:
+                if isinstance(reply, RedisError):
+                    raise reply
+        return replies
+    
+    def _read_reply(self):
+        line = self._reader.readline()
+        if not line.endswith(b'\r\n'):
+            raise ConnectionError("Connection closed by the server")
+        kind, body = line[:1], line[1:-2]
+        if kind == b'+':
+            return body.decode('utf-8')
+        if kind == b'-':
+            return RedisError(body.decode('utf-8'))
+        if kind == b':':
+            return int(body)
+        if kind == b'$':
+            length = int(body)
+            if length < 0:
+                return None
+            data = self._reader.read(length + 2)
+            return data[:-2]
+        if kind == b'*':
+            count = int(body)
+            if count < 0:
+                return None
+            # Errors inside an array (a failed command in EXEC) stay as values for the caller
+            return [self._read_reply() for _ in range(count)]
+        raise ConnectionError(f"Unexpected reply from server: {line!r}")
+    
+    def close(self):
+        try:
+            self._reader.close()
+        finally:
+            self.sock.close()
+
+
+class ConnectionPool:
+    """Reuses connections to one server across threads; at most max_idle are kept open while unused"""
+    
+    def __init__(self, host: str = '127.0.0.1', port: int = 6379, timeout: Optional[float] = 5.0,
+                 max_idle: int = 32):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self._idle: List[RedisConnection] = []
+        self._lock = threading.Lock()
+        self.round_trips = 0
+    
+    def acquire(self) -> RedisConnection:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return RedisConnection(self.host, self.port, self.timeout)
+    
+    def release(self, connection: RedisConnection, broken: bool = False):
+        """Return a connection; a broken one, or one over max_idle, is closed instead"""
+        with self._lock:
+            self.round_trips += connection.round_trips
+            connection.round_trips = 0
+            if not broken and len(self._idle) < self.max_idle:
+                self._idle.append(connection)
+                return
+        connection.close()
+    
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
@@ -0,0 +1,255 @@
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+
+class VersionedDict(dict):
+    """dict that counts its changes, so text rendered from it knows when to rebuild"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.version = 0
+    
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.version += 1
+    
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self.version += 1
+    
+    def update(self, *args, **kwargs):
+        changes = dict(*args, **kwargs)
+        if changes:
+            super().update(changes)
+            self.version += 1
+    
+    def __ior__(self, other):
+        # dict's |= doesn't go through update()
+        self.update(other)
+        return self
+    
+    # These only count as a change when they change something
+    
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self.version += 1
+        return super().setdefault(key, default)
+    
+    def pop(self, key, *default):
+        if key in self:
+            self.version += 1
+        return super().pop(key, *default)
+    
+    def popitem(self):
+        item = super().popitem()
+        self.version += 1
+        return item
+    
+    def clear(self):
+        if self:
+            self.version += 1
+        super().clear()
+
+
+def western_amount(amount: float) -> str:
+    """12,345,678.90"""
+    return f"{amount:,.2f}"
+
+
+def indian_amount(amount: float) -> str:
+    """1,23,45,678.90: thousands, then lakhs and crores in groups of two"""
+    whole, fraction = f"{abs(amount):.2f}".split('.')
+    head, tail = whole[:-3], whole[-3:]
+    groups = []
+    while len(head) > 2:
+        groups.insert(0, head[-2:])
+        head = head[:-2]
+    if head:
+        groups.insert(0, head)
+    return ('-' if amount < 0 else '') + ','.join(groups + [tail]) + '.' + fraction
+
+
+# Every reply the chatbot writes itself; {fields} are filled in per turn
+ENGLISH = {
+    "fallback": "I'm here to help you with your banking needs. Could you please tell me what you'd like to do today?",
+    "ask_account_number": "To assist you better, I'll need your account number. "
+                          "Could you please provide your 8-digit account number?",
+    "ask_loan_type": "What type of loan are you interested in? We offer:\n"
+                     "• Personal Loan\n"
+                     "• Home Loan  \n"
+                     "• Car Loan\n"
+                     "\n"
+                     "Please let me know which one you'd prefer.",
+    "ask_loan_amount": "What loan amount are you looking for? Please specify the amount you need.",
+    "ask_more_info": "I need some additional information to help you. What would you like to do today?",
+    "rates_header": "Here are our current interest rates:\n",
+    "rate_line": "• {service}: {rate}% per annum\n",
+    "charges": """Our current charges:
+• ATM withdrawal (own): Free
+• ATM withdrawal (other banks): ₹20 per transaction
+• SMS alerts: ₹25 per month
+• Cheque book: ₹200 per booklet
+• Account maintenance: ₹500 per quarter (waived for minimum balance ≥ ₹10,000)""",
+    "menu": """I'm here to help you with:
+• Account balance and transaction inquiries
+• Loan applications (Personal, Home, Car loans)
+• Card blocking services
+• Interest rates and charges information
+
+What would you like to know about?""",
+    "account_number_needed": "I need your account number to fetch your account details.",
+    "account_not_found": "I couldn't find an account with that number. Please check and try again.",
+    "balance": "Hello {customer_name}! \n"
+               "            \n"
+               "Your account balance details:\n"
+               "• Account Number: {account_number}\n"
+               "• Account Type: {account_type}\n"
+               "• Available Balance: ₹{balance}\n"
+               "\n"
+               "Is there anything else I can help you with?",
+    "account_details": """Account Details for {customer_name}:
+• Account Number: {account_number}
+• Account Type: {account_type}
+• Balance: ₹{balance}
+• Email: {email}
+• Phone: {phone}""",
+    "no_transactions": "No recent transactions found for your account.",
+    "transactions_header": "Here are your recent transactions for account {account_number}:\n\n",
+    "transaction_line": "• {date} - {type} - ₹{amount} - {description}\n",
+    "task_account_number_needed": "I need your account number to proceed with this request.",
+    "task_menu": "I can help you with loan applications or card blocking. What would you like to do?",
+    "loan_missing": "I need the {missing} to process your loan application.",
+    "loan_missing_type": "loan type",
+    "loan_missing_amount": "loan amount",
+    "loan_missing_joiner": " and ",
+    "loan_invalid_amount": "Please provide a valid loan amount in numbers.",
+    "loan_result": "Loan Application Processed!\n"
+                   "                \n"
+                   "Application ID: {application_id}\n"
+                   "Status: {status}\n"
+                   "\n"
+                   "{message}\n"
+                   "\n"
+                   "Your credit score: {credit_score}\n"
+                   "\n"
+                   "Is there anything else I can help you with?",
+    "card_blocked": """Your {card_type} card has been successfully blocked for security.
+
+• Card Status: BLOCKED
+• Date & Time: {timestamp}
+• Reason: Customer Request
+
+A new card will be dispatched to your registered address within 5-7 business days.
+
+For immediate assistance, please contact our 24/7 helpline.
+Is there anything else I can help you with?""",
+    "card_block_failed": "I couldn't block your card at the moment. Please try again or contact customer service.",
+}
+
+
+
+def _english_balance(account: Dict, balance: str) -> str:
+    return (f"Hello {account['customer_name']}! \n"
+            "            \n"
+            "Your account balance details:\n"
+            f"• Account Number: {account['account_number']}\n"
+            f"• Account Type: {account['account_type']}\n"
+            f"• Available Balance: ₹{balance}\n"
+            "\n"
+            "Is there anything else I can help you with?")
+
+
+def _english_account_details(account: Dict, balance: str) -> str:
+    return (f"Account Details for {account['customer_name']}:\n"
+            f"• Account Number: {account['account_number']}\n"
+            f"• Account Type: {account['account_type']}\n"
+            f"• Balance: ₹{balance}\n"
+            f"• Email: {account['email']}\n"
+            f"• Phone: {account['phone']}")
+
+
+def _english_transaction_line(date: str, kind: str, amount: str, description: str) -> str:
+    return f"• {date} - {kind} - ₹{amount} - {description}\n"
+
+
+# Plain-function equivalents of the texts rendered from fresh data on every turn, which
+# skip str.format's parsing; keyed by the exact text, so a locale that overrides one
+# falls back to str.format. Account replies take (account, balance), transaction lines
+# (date, type, amount, description), with amounts already formatted.
+RENDER_FUNCTIONS: Dict[str, Callable[..., str]] = {
+    ENGLISH["balance"]: _english_balance,
+    ENGLISH["account_details"]: _english_account_details,
+    ENGLISH["transaction_line"]: _english_transaction_line,
+}
+
+# locale -> (texts, amount formatter); register_locale() adds more
+LOCALES: Dict[str, Tuple[Dict[str, str], Callable[[float], str]]] = {
+    'en': (ENGLISH, western_amount),
+    'en-IN': (ENGLISH, indian_amount),
+}
+
+
+def register_locale(locale: str, texts: Optional[Dict[str, str]] = None, base: str = 'en',
+                    format_amount: Optional[Callable[[float], str]] = None):
+    """Add a locale as overrides of another; texts it doesn't give fall back to the base locale's"""
+    base_texts, base_format = LOCALES[base]
+    LOCALES[locale] = ({**base_texts, **(texts or {})}, format_amount or base_format)
+
+
+class ReplyTemplates:
+    """One locale's reply texts, with everything that can be rendered ahead of time rendered once
+
+    Static texts are plain lookups and the rest are filled in with str.format,
+    except the per-account replies and transaction lines, which go through a
+    plain function when RENDER_FUNCTIONS has one for the locale's text. The
+    interest-rate table is rebuilt only when the rates dict's version changes
+    (any dict without one is rebuilt every time). The locale is resolved when
+    the templates are built, so a turn pays nothing for it.
+    """
+    
+    def __init__(self, locale: str = 'en'):
+        if locale not in LOCALES:
+            raise ValueError(f"Unknown locale {locale!r}; known: {', '.join(sorted(LOCALES))}")
+        self.locale = locale
+        self.texts, self.format_amount = LOCALES[locale]
+        self._account_renderers = {name: RENDER_FUNCTIONS.get(self.texts[name]) or self._account_formatter(name)
+                                   for name in ("balance", "account_details")}
+        line = self.texts["transaction_line"]
+        self._transaction_line = RENDER_FUNCTIONS.get(line) or (
+            lambda date, kind, amount, description: line.format(date=date, type=kind, amount=amount,
+                                                                description=description))
+        self._rates: Optional[Tuple[Dict, int, Tuple[str, ...]]] = None
+    
+    def __getitem__(self, name: str) -> str:
+        return self.texts[name]
+    
+    def render(self, name: str, **fields) -> str:
+        return self.texts[name].format(**fields)
+    
+    def rates(self, rates: Dict[str, float]) -> Tuple[str, ...]:
+        """The interest-rate reply as chunks: the header, then one line per rate"""
+        cached = self._rates
+        version = getattr(rates, 'version', None)
+        if cached is not None and cached[0] is rates and version is not None and cached[1] == version:
+            return cached[2]
+        line = self.texts["rate_line"].format
+        chunks = (self.texts["rates_header"],) + tuple(
+            line(service=service.replace('_', ' ').title(), rate=rate) for service, rate in rates.items())
+        self._rates = (rates, version, chunks)
+        return chunks
+    
+    def account(self, name: str, account: Dict) -> str:
+        """The "balance" or "account_details" reply for an account"""
+        return self._account_renderers[name](account, self.format_amount(account["balance"]))
+    
+    def _account_formatter(self, name: str) -> Callable[[Dict, str], str]:
+        text = self.texts[name]
+        return lambda account, balance: text.format(**{**account, "balance": balance})
+    
+    def transactions(self, account_number: str, transactions: Iterable[Dict]) -> List[str]:
+        """The transaction-history reply as chunks: the header, then one line per transaction"""
+        line = self._transaction_line
+        format_amount = self.format_amount
+        chunks = [self.texts["transactions_header"].format(account_number=account_number)]
+        chunks.extend([line(t["date"], t["type"], format_amount(t["amount"]), t["description"])
+                       for t in transactions])
+        return chunks
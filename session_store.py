@@ -0,0 +1,292 @@
+import asyncio
+import hashlib
+import random
+import struct
+import threading
+import time
+import weakref
+from typing import Callable, Dict, List, Optional, Tuple
+
+from resp_client import ConnectionPool, RedisError
+from sessions import SessionState, merge_context
+
+_FORMAT = 1
+_NONE, _TRUE, _FALSE, _INT, _FLOAT, _STR, _LIST, _DICT = range(8)
+_DOUBLE = struct.Struct('<d')
+
+
+def _write_varint(out: bytearray, n: int):
+    while n > 0x7f:
+        out.append(n & 0x7f | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _pack_value(out: bytearray, value):
+    if value is None:
+        out.append(_NONE)
+    elif value is True:
+        out.append(_TRUE)
+    elif value is False:
+        out.append(_FALSE)
+    elif isinstance(value, int):
+        out.append(_INT)
+        # Zigzag, so small negative numbers stay short too
+        _write_varint(out, value << 1 if value >= 0 else (-value << 1) - 1)
+    elif isinstance(value, float):
+        out.append(_FLOAT)
+        out += _DOUBLE.pack(value)
+    elif isinstance(value, str):
+        data = value.encode('utf-8')
+        out.append(_STR)
+        _write_varint(out, len(data))
+        out += data
+    elif isinstance(value, (list, tuple)):
+        out.append(_LIST)
+        _write_varint(out, len(value))
+        for item in value:
+            _pack_value(out, item)
+    elif isinstance(value, dict):
+        out.append(_DICT)
+        _write_varint(out, len(value))
+        for key, item in value.items():
+            _pack_value(out, key)
+            _pack_value(out, item)
+    else:
+        raise TypeError(f"Cannot serialize {type(value).__name__} in session state")
+
+
+def pack(value) -> bytes:
+    """Compact binary encoding of None, bools, ints, floats, strings, lists and dicts
+
+    A tag byte per value, lengths and integers as varints, floats as 8 bytes:
+    typically a third smaller than JSON, and safe to decode from untrusted input.
+    """
+    out = bytearray((_FORMAT,))
+    _pack_value(out, value)
+    return bytes(out)
+
+
+def unpack(data: bytes):
+    """Decode pack()'s output; anything corrupt or truncated raises ValueError"""
+    if not data or data[0] != _FORMAT:
+        raise ValueError("Not a packed session value")
+    try:
+        value, end = _unpack_value(data, 1)
+    except (IndexError, struct.error) as e:
+        raise ValueError("Truncated packed session value") from e
+    if end != len(data):
+        raise ValueError("Trailing bytes after packed session value")
+    return value
+
+
+def _read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    n = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        n |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return n, pos
+        shift += 7
+
+
+def _unpack_value(data: bytes, pos: int):
+    tag = data[pos]
+    pos += 1
+    if tag == _STR:
+        length, pos = _read_varint(data, pos)
+        if pos + length > len(data):
+            raise ValueError("Truncated packed session value")
+        return data[pos:pos + length].decode('utf-8'), pos + length
+    if tag == _INT:
+        n, pos = _read_varint(data, pos)
+        return (n >> 1) ^ -(n & 1), pos
+    if tag == _FLOAT:
+        return _DOUBLE.unpack_from(data, pos)[0], pos + 8
+    if tag == _DICT:
+        count, pos = _read_varint(data, pos)
+        result = {}
+        for _ in range(count):
+            key, pos = _unpack_value(data, pos)
+            result[key], pos = _unpack_value(data, pos)
+        return result, pos
+    if tag == _LIST:
+        count, pos = _read_varint(data, pos)
+        items = []
+        for _ in range(count):
+            item, pos = _unpack_value(data, pos)
+            items.append(item)
+        return items, pos
+    if tag == _NONE:
+        return None, pos
+    if tag == _TRUE:
+        return True, pos
+    if tag == _FALSE:
+        return False, pos
+    raise ValueError(f"Unknown tag {tag} in packed session value")
+
+
+class SessionConflict(Exception):
+    """Other turns kept writing the session while this one tried to save, more times than it retries"""
+
+
+# Saves a session only if nobody saved it since it was loaded, in one atomic server-side step.
+# KEYS: state, history. ARGV: loaded version, new value, ttl in ms, history limit (0 for none),
+# then history entries. Returns {1} when saved, or {0, current value} so the caller can merge
+# without another read. A value is its version as 16 hex digits followed by the packed context.
+SAVE_SCRIPT = b"""
+local current = redis.call('GET', KEYS[1])
+local version = 0
+if current then version = tonumber(string.sub(current, 1, 16), 16) end
+if version ~= tonumber(ARGV[1]) then
+    if current then return {0, current} end
+    return {0}
+end
+redis.call('SET', KEYS[1], ARGV[2], 'PX', ARGV[3])
+if #ARGV > 4 then
+    redis.call('RPUSH', KEYS[2], unpack(ARGV, 5))
+    if tonumber(ARGV[4]) > 0 then redis.call('LTRIM', KEYS[2], -tonumber(ARGV[4]), -1) end
+end
+redis.call('PEXPIRE', KEYS[2], ARGV[3])
+return {1}
+"""
+SAVE_SCRIPT_SHA = hashlib.sha1(SAVE_SCRIPT).hexdigest()
+
+
+def _encode_state(version: int, context: Dict) -> bytes:
+    return b'%016x' % version + pack(context)
+
+
+def _decode_state(blob: Optional[bytes]) -> Tuple[int, Dict]:
+    if blob is None:
+        return 0, {}
+    return int(blob[:16], 16), unpack(blob[16:])
+
+
+class RedisSessionStore:
+    """Session state kept in a Redis-compatible server, so any worker can serve any turn of a conversation
+
+    A drop-in for SessionManager: BankingChatbot calls get() when a turn starts and
+    update() when it ends, one round-trip each, and their a-prefixed variants on the
+    async paths, which run the socket I/O on a worker thread so the event loop never
+    waits on the store. No connection is held while the turn runs.
+
+    update() saves through SAVE_SCRIPT, a compare-and-set on the version the session
+    was loaded at (optimistic versioning). If another worker saved in between, the
+    script answers with the latest state instead. Only the context fields this turn
+    changed are applied on top of it and the save retried, so concurrent turns never
+    clobber each other, and a conflict costs one more round-trip, not two.
+
+    Context is stored with pack(), expiring after idle_ttl. Conversation history
+    goes to a separate capped list that turns only append to, so it is never
+    read back on the hot path; history() fetches it.
+    """
+    
+    def __init__(self, pool: Optional[ConnectionPool] = None, idle_ttl: float = 1800.0,
+                 history_limit: Optional[int] = 50, prefix: str = 'session:', max_retries: int = 10,
+                 backoff: float = 0.001, max_backoff: float = 0.05, clock: Callable[[], float] = time.monotonic):
+        self.pool = pool if pool is not None else ConnectionPool()
+        self.idle_ttl = idle_ttl
+        self.history_limit = history_limit
+        self.prefix = prefix
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.clock = clock
+        # The version and context each loaded session started from; weak, so a turn that
+        # never saves leaves nothing behind
+        self._loaded: "weakref.WeakKeyDictionary[SessionState, Tuple[int, Dict]]" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self.stats = {"loaded": 0, "created": 0, "saved": 0, "conflicts": 0, "released": 0}
+    
+    def _key(self, session_id: str) -> str:
+        return self.prefix + session_id
+    
+    def _history_key(self, session_id: str) -> str:
+        return self.prefix + session_id + ':history'
+    
+    def _count(self, stat: str):
+        with self._lock:
+            self.stats[stat] += 1
+    
+    def _call(self, *args):
+        connection = self.pool.acquire()
+        broken = True
+        try:
+            reply = connection.execute(*args)
+            broken = False
+            return reply
+        except RedisError:
+            # A server error reply leaves the connection in a clean state
+            broken = False
+            raise
+        finally:
+            # Anything else, a cancellation or a garbled reply included, may leave it mid-reply
+            self.pool.release(connection, broken=broken)
+    
+    def get(self, session_id: str) -> SessionState:
+        """Load the session, or start an empty one"""
+        version, context = _decode_state(self._call("GET", self._key(session_id)))
+        session = SessionState(session_id, self.history_limit)
+        session.user_context = context
+        session.last_access = self.clock()
+        with self._lock:
+            self._loaded[session] = (version, dict(context))
+            self.stats["loaded" if version else "created"] += 1
+        return session
+    
+    def update(self, session: SessionState):
+        """Save the session's context and new history turns, merging with any save that happened meanwhile"""
+        with self._lock:
+            loaded = self._loaded.pop(session, None)
+        if loaded is None:
+            return
+        version, base = loaded
+        keys = (self._key(session.session_id), self._history_key(session.session_id))
+        history = [pack(turn) for turn in session.conversation_history]
+        for attempt in range(self.max_retries + 1):
+            args = (version, _encode_state(version + 1, session.user_context), int(self.idle_ttl * 1000),
+                    self.history_limit or 0, *history)
+            reply = self._save(keys, args)
+            if reply[0] == 1:
+                self._count("saved")
+                return
+            # Another turn saved first: replay this turn's changes onto what it saved, after a
+            # jittered pause so turns racing on one session don't keep colliding
+            self._count("conflicts")
+            version, latest = _decode_state(reply[1] if len(reply) > 1 else None)
+            session.user_context = merge_context(latest, base, session.user_context)
+            base = latest
+            time.sleep(random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt)))
+        raise SessionConflict(f"Session {session.session_id} changed on every one of "
+                              f"{self.max_retries + 1} save attempts")
+    
+    def _save(self, keys: Tuple[str, str], args: Tuple) -> List:
+        try:
+            return self._call("EVALSHA", SAVE_SCRIPT_SHA, len(keys), *keys, *args)
+        except RedisError as e:
+            if not str(e).startswith('NOSCRIPT'):
+                raise
+        # First save since the server started: EVAL sends the script, and caches it for EVALSHA
+        return self._call("EVAL", SAVE_SCRIPT, len(keys), *keys, *args)
+    
+    def release(self, session: SessionState):
+        """Give up a loaded session without saving it"""
+        with self._lock:
+            if self._loaded.pop(session, None) is not None:
+                self.stats["released"] += 1
+    
+    async def aget(self, session_id: str) -> SessionState:
+        return await asyncio.to_thread(self.get, session_id)
+    
+    async def aupdate(self, session: SessionState):
+        await asyncio.to_thread(self.update, session)
+    
+    def drop(self, session_id: str) -> bool:
+        """Forget a session, e.g. when the customer logs out"""
+        return self._call("DEL", self._key(session_id), self._history_key(session_id)) > 0
+    
+    def history(self, session_id: str) -> List[Dict]:
+        """The session's stored conversation turns, oldest first"""
+        return [unpack(turn) for turn in self._call("LRANGE", self._history_key(session_id), 0, -1)]
@@ -0,0 +1,200 @@
+import logging
+import sys
+import threading
+import time
+import weakref
+from collections import OrderedDict, deque
+from typing import Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Rough fixed cost of one session (slots object, context dict, history deque)
+_SESSION_OVERHEAD_BYTES = 600
+_MISSING = object()
+
+
+class SessionState:
+    """Per-customer conversation state, kept compact so thousands fit in one process"""
+    
+    __slots__ = ('session_id', 'user_context', 'conversation_history', 'last_access', 'approx_bytes', 'version',
+                 '__weakref__')
+    
+    def __init__(self, session_id: str, history_limit: Optional[int] = None):
+        self.session_id = session_id
+        self.user_context: Dict = {}
+        self.conversation_history = deque(maxlen=history_limit)
+        self.last_access = 0.0
+        self.approx_bytes = _SESSION_OVERHEAD_BYTES
+        self.version = 0
+    
+    def footprint(self) -> int:
+        """Approximate memory held by this session's context and history"""
+        total = _SESSION_OVERHEAD_BYTES
+        for key, value in self.user_context.items():
+            total += sys.getsizeof(key) + sys.getsizeof(value)
+        for turn in self.conversation_history:
+            total += sys.getsizeof(turn) + sum(sys.getsizeof(value) for value in turn.values())
+        return total
+
+
+def merge_context(latest: Dict, base: Dict, mine: Dict) -> Dict:
+    """latest plus the fields mine set or removed relative to base"""
+    merged = dict(latest)
+    for key, value in mine.items():
+        if base.get(key, _MISSING) != value:
+            merged[key] = value
+    for key in base:
+        if key not in mine:
+            merged.pop(key, None)
+    return merged
+
+
+class SessionManager:
+    """Session states keyed by session id, with idle-TTL, LRU and memory-cap eviction
+
+    get() hands each turn its own copy of the session's context, and a history
+    holding only that turn's entries. update() saves them back, so turns that run
+    on one session at once never share a dict. If another turn saved in between,
+    only the fields this turn changed are applied on top, as RedisSessionStore
+    does. A turn whose session was evicted or dropped meanwhile is not saved; it
+    is counted in stats["lost_updates"] and logged.
+    """
+    
+    def __init__(self, idle_ttl: float = 1800.0, max_sessions: int = 100000,
+                 max_memory_bytes: Optional[int] = None, history_limit: Optional[int] = 50,
+                 clock: Callable[[], float] = time.monotonic):
+        self.idle_ttl = idle_ttl
+        self.max_sessions = max_sessions
+        self.max_memory_bytes = max_memory_bytes
+        self.history_limit = history_limit
+        self.clock = clock
+        
+        # Ordered least- to most-recently used, which is also oldest to newest access
+        self._sessions: "OrderedDict[str, SessionState]" = OrderedDict()
+        self._memory_bytes = 0
+        self.stats = {"created": 0, "expired": 0, "evicted_lru": 0, "evicted_memory": 0, "conflicts": 0,
+                      "lost_updates": 0}
+        # Each turn's copy -> the stored session, its version and context when the copy was made;
+        # weak, so a turn that never saves leaves nothing behind
+        self._loaded: "weakref.WeakKeyDictionary[SessionState, Tuple[SessionState, int, Dict]]" = \
+            weakref.WeakKeyDictionary()
+        # One bot, and so one manager, serves many request threads
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self._sessions)
+    
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+    
+    @property
+    def memory_bytes(self) -> int:
+        """Approximate memory held by all live sessions"""
+        return self._memory_bytes
+    
+    def get(self, session_id: str) -> SessionState:
+        """A turn's copy of the session for this id, creating the session if it is new or has expired"""
+        now = self.clock()
+        with self._lock:
+            self._evict_expired(now)
+            
+            stored = self._sessions.get(session_id)
+            if stored is None:
+                stored = SessionState(session_id, self.history_limit)
+                self._sessions[session_id] = stored
+                self._memory_bytes += stored.approx_bytes
+                self.stats["created"] += 1
+                self._enforce_limits()
+            else:
+                self._sessions.move_to_end(session_id)
+            
+            stored.last_access = now
+            session = SessionState(session_id)
+            session.user_context = dict(stored.user_context)
+            session.last_access = now
+            # update() replaces the stored context rather than changing it, so it can serve as the base
+            self._loaded[session] = (stored, stored.version, stored.user_context)
+        return session
+    
+    def update(self, session: SessionState):
+        """Save a turn's copy back, merging with any turn saved meanwhile, and evict others if over the memory cap"""
+        with self._lock:
+            loaded = self._loaded.pop(session, None)
+            if loaded is None:
+                return
+            stored, version, base = loaded
+            if self._sessions.get(session.session_id) is not stored:
+                self.stats["lost_updates"] += 1
+                logger.warning("Session %s was evicted or dropped during a turn; the turn was not saved",
+                               session.session_id)
+                return
+            if stored.version != version:
+                stored.user_context = merge_context(stored.user_context, base, session.user_context)
+                self.stats["conflicts"] += 1
+            else:
+                stored.user_context = session.user_context
+            stored.conversation_history.extend(session.conversation_history)
+            stored.version += 1
+            size = stored.footprint()
+            self._memory_bytes += size - stored.approx_bytes
+            stored.approx_bytes = size
+            self._enforce_limits()
+    
+    def release(self, session: SessionState):
+        """Give up a turn's copy without saving it"""
+        with self._lock:
+            self._loaded.pop(session, None)
+    
+    # Async twins for the chatbot's async paths; in process nothing blocks, so they just delegate
+    
+    async def aget(self, session_id: str) -> SessionState:
+        return self.get(session_id)
+    
+    async def aupdate(self, session: SessionState):
+        self.update(session)
+    
+    def drop(self, session_id: str) -> bool:
+        """Forget a session, e.g. when the customer logs out"""
+        with self._lock:
+            return self._drop(session_id)
+    
+    def _drop(self, session_id: str) -> bool:
+        session = self._sessions.pop(session_id, None)
+        if session is None:
+            return False
+        self._memory_bytes -= session.approx_bytes
+        return True
+    
+    def evict_expired(self, now: Optional[float] = None) -> int:
+        """Drop sessions idle for longer than the TTL"""
+        now = self.clock() if now is None else now
+        with self._lock:
+            return self._evict_expired(now)
+    
+    # The helpers below expect the caller to hold the lock
+    
+    def _evict_expired(self, now: float) -> int:
+        expired = 0
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if now - session.last_access < self.idle_ttl:
+                break
+            self._drop(session_id)
+            expired += 1
+        self.stats["expired"] += expired
+        return expired
+    
+    def _enforce_limits(self):
+        """Evict least recently used sessions until under the count and memory caps"""
+        while len(self._sessions) > self.max_sessions:
+            _, session = self._sessions.popitem(last=False)
+            self._memory_bytes -= session.approx_bytes
+            self.stats["evicted_lru"] += 1
+        
+        if self.max_memory_bytes is None:
+            return
+        # Never evict the most recently used session, it is the one being served
+        while self._memory_bytes > self.max_memory_bytes and len(self._sessions) > 1:
+            _, session = self._sessions.popitem(last=False)
+            self._memory_bytes -= session.approx_bytes
+            self.stats["evicted_memory"] += 1
@@ -0,0 +1,88 @@
+"""Chat server clients: one keep-alive HTTP connection or one WebSocket, driven a turn at a time"""
+
+import asyncio
+import base64
+import json
+import os
+import struct
+from typing import Optional, Tuple
+
+
+class HttpClient:
+    """One keep-alive connection posting turns to /chat"""
+    
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+    
+    async def turn(self, message: str, session_id: str) -> Tuple[int, float]:
+        """The reply's status and Retry-After"""
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        body = json.dumps({"message": message, "session_id": session_id}).encode()
+        self.writer.write(f"POST /chat HTTP/1.1\r\nHost: {self.host}\r\nContent-Type: application/json\r\n"
+                          f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+        head = (await self.reader.readuntil(b'\r\n\r\n')).decode('latin-1').split('\r\n')
+        status = int(head[0].split(' ', 2)[1])
+        headers = dict(line.lower().split(': ', 1) for line in head[1:] if line)
+        await self.reader.readexactly(int(headers.get('content-length', 0)))
+        if headers.get('connection') == 'close':
+            await self.close()
+        return status, float(headers.get('retry-after', 0))
+    
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+
+class WebSocketClient:
+    """One WebSocket to /ws; a turn is done at its {"done": true} frame"""
+    
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+    
+    async def _connect(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        key = base64.b64encode(os.urandom(16)).decode()
+        self.writer.write(f"GET /ws HTTP/1.1\r\nHost: {self.host}\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                          f"Sec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n".encode())
+        head = await self.reader.readuntil(b'\r\n\r\n')
+        if b' 101 ' not in head.split(b'\r\n', 1)[0]:
+            raise ConnectionError(f"WebSocket upgrade refused: {head.splitlines()[0]!r}")
+    
+    async def turn(self, message: str, session_id: str) -> Tuple[int, float]:
+        if self.writer is None:
+            await self._connect()
+        payload = json.dumps({"message": message, "session_id": session_id}).encode()
+        # Clients must mask their frames
+        mask = os.urandom(4)
+        header = struct.pack('!BB', 0x81, 0x80 | len(payload)) if len(payload) < 126 else \
+            struct.pack('!BBH', 0x81, 0x80 | 126, len(payload))
+        self.writer.write(header + mask + bytes(b ^ mask[i % 4] for i, b in enumerate(payload)))
+        while True:
+            first, second = await self.reader.readexactly(2)
+            length = second & 0x7f
+            if length == 126:
+                length = struct.unpack('!H', await self.reader.readexactly(2))[0]
+            elif length == 127:
+                length = struct.unpack('!Q', await self.reader.readexactly(8))[0]
+            data = await self.reader.readexactly(length)
+            if first & 0x0f == 0x8:
+                await self.close()
+                return 503, 0.0
+            reply = json.loads(data)
+            if reply.get("done"):
+                return 200, 0.0
+            if "error" in reply:
+                return reply["status"], reply.get("retry_after", 0.0)
+    
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
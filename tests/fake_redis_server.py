@@ -0,0 +1,278 @@
+"""Fake Redis server: the subset of commands the session store uses, in process, with injected latency
+
+Speaks RESP2 over TCP and implements strings with expiry (GET, SET with
+EX/PX/NX/XX, DEL, EXISTS, EXPIRE, PEXPIRE, PTTL), lists (RPUSH, LRANGE, LTRIM,
+LLEN), PING, DBSIZE and FLUSHALL. There is no Lua: EVAL and EVALSHA run only
+the session store's SAVE_SCRIPT, through an equivalent Python function, and
+EVALSHA answers NOSCRIPT until the script was sent with EVAL, as Redis does.
+Every batch of commands read from a connection waits `latency` seconds before
+its replies go out, which models one network round-trip however many commands
+are pipelined in it.
+
+benchmarks/fake_redis_server.py serves it standalone.
+"""
+
+import socket
+import threading
+import time
+from socketserver import BaseRequestHandler, ThreadingTCPServer
+from typing import Dict, List, Optional, Set, Tuple
+
+from session_store import SAVE_SCRIPT, SAVE_SCRIPT_SHA
+
+
+class _Error(Exception):
+    pass
+
+
+def _encode(reply) -> bytes:
+    if reply is None:
+        return b'$-1\r\n'
+    if isinstance(reply, _Error):
+        return b'-' + str(reply).encode() + b'\r\n'
+    if isinstance(reply, str):
+        return b'+' + reply.encode() + b'\r\n'
+    if isinstance(reply, int):
+        return b':%d\r\n' % reply
+    if isinstance(reply, bytes):
+        return b'$%d\r\n%s\r\n' % (len(reply), reply)
+    return b'*%d\r\n' % len(reply) + b''.join(_encode(item) for item in reply)
+
+
+def _parse(buffer: bytearray) -> Tuple[List[List[bytes]], int]:
+    """Complete commands at the start of the buffer, and how many bytes they used"""
+    commands = []
+    pos = 0
+    while True:
+        if pos >= len(buffer):
+            return commands, pos
+        end = buffer.find(b'\r\n', pos)
+        if end < 0:
+            return commands, pos
+        if buffer[pos:pos + 1] != b'*':
+            # Inline command, as typed into telnet
+            commands.append(bytes(buffer[pos:end]).split())
+            pos = end + 2
+            continue
+        count = int(buffer[pos + 1:end])
+        cursor = end + 2
+        args = []
+        for _ in range(count):
+            end = buffer.find(b'\r\n', cursor)
+            if end < 0:
+                return commands, pos
+            length = int(buffer[cursor + 1:end])
+            start = end + 2
+            if len(buffer) < start + length + 2:
+                return commands, pos
+            args.append(bytes(buffer[start:start + length]))
+            cursor = start + length + 2
+        commands.append(args)
+        pos = cursor
+
+
+class _Server(ThreadingTCPServer):
+    daemon_threads = True
+    # socketserver's default backlog of 5 drops connection bursts, which then wait out a 1s SYN retry
+    request_queue_size = 128
+
+
+class FakeRedisServer:
+    def __init__(self, port: int = 0, latency: float = 0.0):
+        self.latency = latency
+        self.stats = {"connections": 0, "batches": 0, "commands": 0}
+        self._data: Dict[bytes, object] = {}
+        self._expires: Dict[bytes, float] = {}
+        # SHA1s of the scripts sent with EVAL so far
+        self._scripts: Set[bytes] = set()
+        self._lock = threading.Lock()
+        self._server = _Server(('127.0.0.1', port), self._handler())
+    
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self._server.server_address[:2]
+    
+    def _handler(self):
+        fake = self
+        
+        class Handler(BaseRequestHandler):
+            def handle(self):
+                self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                with fake._lock:
+                    fake.stats["connections"] += 1
+                buffer = bytearray()
+                while True:
+                    chunk = self.request.recv(65536)
+                    if not chunk:
+                        return
+                    buffer += chunk
+                    commands, used = _parse(buffer)
+                    del buffer[:used]
+                    if not commands:
+                        continue
+                    replies = [fake._dispatch(command) for command in commands]
+                    with fake._lock:
+                        fake.stats["batches"] += 1
+                        fake.stats["commands"] += len(commands)
+                    if fake.latency:
+                        time.sleep(fake.latency)
+                    self.request.sendall(b''.join(_encode(reply) for reply in replies))
+        
+        return Handler
+    
+    def _dispatch(self, command: List[bytes]):
+        name = command[0].upper().decode()
+        if not hasattr(self, '_cmd_' + name.lower()):
+            return _Error(f"ERR unknown command '{name}'")
+        with self._lock:
+            return self._run(name, command[1:])
+    
+    def _run(self, name: str, args: List[bytes]):
+        try:
+            return getattr(self, '_cmd_' + name.lower())(*args)
+        except TypeError:
+            return _Error(f"ERR wrong number of arguments for '{name.lower()}' command")
+        except _Error as e:
+            return e
+    
+    # Commands; the caller holds the lock
+    
+    def _expire_if_due(self, key: bytes):
+        deadline = self._expires.get(key)
+        if deadline is not None and deadline <= time.monotonic():
+            self._delete(key)
+    
+    def _delete(self, key: bytes) -> bool:
+        self._expires.pop(key, None)
+        return self._data.pop(key, None) is not None
+    
+    def _get(self, key: bytes, kind: type):
+        self._expire_if_due(key)
+        value = self._data.get(key)
+        if value is not None and not isinstance(value, kind):
+            raise _Error("WRONGTYPE Operation against a key holding the wrong kind of value")
+        return value
+    
+    def _cmd_ping(self, *args):
+        return args[0] if args else 'PONG'
+    
+    def _cmd_get(self, key):
+        return self._get(key, bytes)
+    
+    def _cmd_set(self, key, value, *options):
+        options = [option.upper() for option in options]
+        expires: Optional[float] = None
+        if b'EX' in options:
+            expires = time.monotonic() + float(options[options.index(b'EX') + 1])
+        if b'PX' in options:
+            expires = time.monotonic() + float(options[options.index(b'PX') + 1]) / 1000
+        self._expire_if_due(key)
+        if b'NX' in options and key in self._data or b'XX' in options and key not in self._data:
+            return None
+        self._data[key] = value
+        self._expires.pop(key, None)
+        if expires is not None:
+            self._expires[key] = expires
+        return 'OK'
+    
+    def _cmd_del(self, *keys):
+        for key in keys:
+            self._expire_if_due(key)
+        return sum(self._delete(key) for key in keys)
+    
+    def _cmd_exists(self, *keys):
+        return sum(self._get(key, object) is not None for key in keys)
+    
+    def _cmd_pexpire(self, key, milliseconds):
+        if self._get(key, object) is None:
+            return 0
+        self._expires[key] = time.monotonic() + int(milliseconds) / 1000
+        return 1
+    
+    def _cmd_expire(self, key, seconds):
+        return self._cmd_pexpire(key, int(seconds) * 1000)
+    
+    def _cmd_pttl(self, key):
+        if self._get(key, object) is None:
+            return -2
+        deadline = self._expires.get(key)
+        return -1 if deadline is None else int((deadline - time.monotonic()) * 1000)
+    
+    def _cmd_rpush(self, key, *values):
+        items = self._get(key, list)
+        if items is None:
+            items = self._data[key] = []
+        items.extend(values)
+        return len(items)
+    
+    def _cmd_lrange(self, key, start, stop):
+        items = self._get(key, list) or []
+        start, stop = int(start), int(stop)
+        stop = len(items) + stop if stop < 0 else stop
+        return items[max(0, len(items) + start if start < 0 else start):stop + 1]
+    
+    def _cmd_ltrim(self, key, start, stop):
+        items = self._get(key, list)
+        if items is not None:
+            start, stop = int(start), int(stop)
+            stop = len(items) + stop if stop < 0 else stop
+            items[:] = items[max(0, len(items) + start if start < 0 else start):stop + 1]
+            if not items:
+                self._delete(key)
+            else:
+                return 'OK'
+    
+    def _cmd_llen(self, key):
+        return len(self._get(key, list) or [])
+    
+    def _cmd_dbsize(self):
+        return len(self._data)
+    
+    def _cmd_flushall(self, *options):
+        for key in list(self._data):
+            self._delete(key)
+        return 'OK'
+    
+    def _cmd_eval(self, script, numkeys, *keys_and_args):
+        if script != SAVE_SCRIPT:
+            raise _Error("ERR the fake server only runs the session store's save script")
+        self._scripts.add(SAVE_SCRIPT_SHA.encode())
+        return self._cmd_evalsha(SAVE_SCRIPT_SHA.encode(), numkeys, *keys_and_args)
+    
+    def _cmd_evalsha(self, sha, numkeys, *keys_and_args):
+        if sha not in self._scripts:
+            raise _Error("NOSCRIPT No matching script. Please use EVAL.")
+        numkeys = int(numkeys)
+        return self._save_script(keys_and_args[:numkeys], keys_and_args[numkeys:])
+    
+    def _save_script(self, keys, args):
+        """SAVE_SCRIPT, step for step"""
+        key, history_key = keys
+        current = self._get(key, bytes)
+        version = int(current[:16], 16) if current is not None else 0
+        if version != int(args[0]):
+            return [0, current] if current is not None else [0]
+        self._cmd_set(key, args[1], b'PX', args[2])
+        if len(args) > 4:
+            self._cmd_rpush(history_key, *args[4:])
+            if int(args[3]) > 0:
+                self._cmd_ltrim(history_key, -int(args[3]), -1)
+        self._cmd_pexpire(history_key, args[2])
+        return [1]
+    
+    def start(self) -> 'FakeRedisServer':
+        threading.Thread(target=self._server.serve_forever, name='fake-redis-server', daemon=True).start()
+        return self
+    
+    def serve_forever(self):
+        self._server.serve_forever()
+    
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+    
+    def __enter__(self) -> 'FakeRedisServer':
+        return self.start()
+    
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -0,0 +1,49 @@
+"""A keyword-matching stand-in for the Gemini model, for tests and benchmarks that must run without a key"""
+
+import asyncio
+import json
+import re
+import time
+
+LABELS = {
+    "balance": ("ACCOUNT_QUERY", "balance_inquiry"),
+    "transaction": ("ACCOUNT_QUERY", "transaction_history"),
+    "details": ("ACCOUNT_QUERY", "account_details"),
+    "loan": ("SPECIFIC_TASK", "loan_application"),
+    "block": ("SPECIFIC_TASK", "card_blocking"),
+}
+
+
+class StubResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class StubModel:
+    """Stand-in for the Gemini model with a fixed simulated latency"""
+    
+    def __init__(self, latency: float):
+        self.latency = latency
+    
+    def _reply(self, prompt: str) -> StubResponse:
+        query = re.search(r'User Query: "(.*)"', prompt)
+        if not query or 'JSON' not in prompt:
+            return StubResponse("Let me look into that for you.")
+        text = query.group(1).lower()
+        category, intent = "BASIC_QUERY", "general_inquiry"
+        for keyword, label in LABELS.items():
+            if keyword in text:
+                category, intent = label
+                break
+        reply = {"category": category, "intent": intent, "entities": {}, "confidence": 0.9}
+        if '"reasoning"' in prompt:
+            reply["reasoning"] = "Let me look into that for you."
+        return StubResponse(json.dumps(reply))
+    
+    def generate_content(self, prompt: str) -> StubResponse:
+        time.sleep(self.latency)
+        return self._reply(prompt)
+    
+    async def generate_content_async(self, prompt: str) -> StubResponse:
+        await asyncio.sleep(self.latency)
+        return self._reply(prompt)
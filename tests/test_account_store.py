@@ -0,0 +1,105 @@
+import threading
+
+import pytest
+
+from account_store import AccountError, AccountStore, InsufficientFunds, ULIDGenerator, UnknownAccount, \
+    WriteAheadLog
+
+ACCOUNTS = {
+    "11111111": {"account_number": "11111111", "name": "A", "balance": 1000.0, "credit_score": 700},
+    "22222222": {"account_number": "22222222", "name": "B", "balance": 50.0, "credit_score": 650},
+}
+
+
+def test_ulids_increase_within_one_millisecond():
+    generate = ULIDGenerator(clock=lambda: 1700000000.0)
+    ids = [generate() for _ in range(1000)]
+    assert ids == sorted(ids)
+    assert len(set(ids)) == len(ids)
+    assert all(len(ulid) == 26 for ulid in ids)
+
+
+def test_ulids_keep_increasing_when_the_clock_steps_back():
+    times = iter([1700000001.0, 1700000000.0, 1700000000.5, 1700000002.0])
+    generate = ULIDGenerator(clock=lambda: next(times))
+    ids = [generate() for _ in range(4)]
+    assert ids == sorted(ids)
+    assert len(set(ids)) == 4
+
+
+def test_ulid_random_part_overflow_borrows_the_next_millisecond():
+    generate = ULIDGenerator(clock=lambda: 1700000000.0)
+    first = generate()
+    generate._random = 2 ** 80 - 1
+    assert generate() > first
+    assert generate._last_ms == 1700000000001
+
+
+def test_ulids_are_unique_across_threads():
+    generate = ULIDGenerator()
+    results = [[] for _ in range(8)]
+    
+    def worker(out):
+        for _ in range(500):
+            out.append(generate())
+    
+    threads = [threading.Thread(target=worker, args=(out,)) for out in results]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    ids = [ulid for out in results for ulid in out]
+    assert len(set(ids)) == len(ids)
+    assert all(out == sorted(out) for out in results)
+
+
+def test_wal_replay_rebuilds_the_store(tmp_path):
+    path = str(tmp_path / "accounts.wal")
+    wal = WriteAheadLog(path)
+    store = AccountStore(ACCOUNTS, wal=wal)
+    store.transfer("11111111", "22222222", 200.0, reference="T1")
+    store.adjust_balance("22222222", -25.0)
+    store.block_card("11111111", "debit")
+    store.open_account({"account_number": "33333333", "name": "C", "balance": 5.0, "credit_score": 600})
+    wal.close()
+    
+    replayed = []
+    restored = AccountStore(ACCOUNTS, wal=WriteAheadLog(path), on_replay=replayed.append)
+    assert [record["op"] for record in replayed] == ["transfer", "balance", "block_card", "open"]
+    assert replayed[0]["reference"] == "T1"
+    assert restored.get("11111111")["balance"] == 800.0
+    assert restored.get("22222222")["balance"] == 225.0
+    assert restored.get("33333333")["name"] == "C"
+    assert restored.is_card_blocked("11111111", "debit")
+
+
+def test_wal_replay_stops_at_a_torn_final_line(tmp_path):
+    path = str(tmp_path / "accounts.wal")
+    wal = WriteAheadLog(path)
+    store = AccountStore(ACCOUNTS, wal=wal)
+    store.adjust_balance("11111111", 1.0)
+    wal.close()
+    with open(path, 'ab') as f:
+        f.write(b'{"op":"balance","bal')
+    restored = AccountStore(ACCOUNTS, wal=WriteAheadLog(path))
+    assert restored.get("11111111")["balance"] == 1001.0
+
+
+def test_refused_writes_are_not_logged(tmp_path):
+    wal = WriteAheadLog(str(tmp_path / "accounts.wal"))
+    store = AccountStore(ACCOUNTS, wal=wal)
+    with pytest.raises(InsufficientFunds):
+        store.transfer("22222222", "11111111", 100.0)
+    with pytest.raises(UnknownAccount):
+        store.adjust_balance("99999999", 1.0)
+    with pytest.raises(AccountError):
+        store.transfer("11111111", "11111111", 1.0)
+    assert wal.stats["records"] == 0
+    assert store.get("22222222")["balance"] == 50.0
+
+
+def test_every_write_changes_the_version():
+    store = AccountStore(ACCOUNTS)
+    before = store.get("11111111")["version"]
+    store.adjust_balance("11111111", 10.0)
+    assert store.get("11111111")["version"] != before
@@ -0,0 +1,123 @@
+import asyncio
+import threading
+import time
+
+from api_cache import CachingBankingAPI
+
+
+class SlowBackend:
+    """Account reads that block until released, counting backend calls"""
+    
+    def __init__(self):
+        self.balance = 100.0
+        self.calls = 0
+        self.gate = threading.Event()
+        self.gate.set()
+    
+    def get_account_details(self, account_number):
+        self.calls += 1
+        balance = self.balance
+        self.gate.wait()
+        return {"account_number": account_number, "balance": balance}
+    
+    def get_transaction_history(self, account_number, days=30, limit=None, offset=0):
+        self.calls += 1
+        return [{"amount": 1.0}, {"amount": 2.0}]
+    
+    def transfer(self, from_account, to_account, amount):
+        self.balance -= amount
+        return {"status": "success"}
+    
+    async def aget_account_details(self, account_number):
+        self.calls += 1
+        balance = self.balance
+        while not self.gate.is_set():
+            await asyncio.sleep(0.001)
+        return {"account_number": account_number, "balance": balance}
+
+
+def wait_until(condition, timeout: float = 2.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.001)
+    return True
+
+
+def test_reads_are_cached_and_writes_invalidate():
+    backend = SlowBackend()
+    api = CachingBankingAPI(backend)
+    assert api.get_account_details("1")["balance"] == 100.0
+    assert api.get_account_details("1")["balance"] == 100.0
+    assert backend.calls == 1
+    api.transfer("1", "2", 10.0)
+    assert api.get_account_details("1")["balance"] == 90.0
+    assert backend.calls == 2
+
+
+def test_read_after_a_write_does_not_join_an_older_fetch():
+    backend = SlowBackend()
+    backend.gate.clear()
+    api = CachingBankingAPI(backend)
+    results = {}
+    before = threading.Thread(target=lambda: results.update(before=api.get_account_details("1")))
+    before.start()
+    assert wait_until(lambda: backend.calls == 1)
+    api.transfer("1", "2", 10.0)
+    after = threading.Thread(target=lambda: results.update(after=api.get_account_details("1")))
+    after.start()
+    try:
+        assert wait_until(lambda: backend.calls == 2)
+    finally:
+        backend.gate.set()
+    before.join()
+    after.join()
+    assert results["before"]["balance"] == 100.0
+    assert results["after"]["balance"] == 90.0
+    # The stale fetch was not cached either
+    assert api.get_account_details("1")["balance"] == 90.0
+
+
+def test_async_read_after_a_write_does_not_join_an_older_fetch():
+    backend = SlowBackend()
+    backend.gate.clear()
+    api = CachingBankingAPI(backend)
+    
+    async def main():
+        before = asyncio.ensure_future(api.aget_account_details("1"))
+        await asyncio.sleep(0.01)
+        api.transfer("1", "2", 10.0)
+        after = asyncio.ensure_future(api.aget_account_details("1"))
+        await asyncio.sleep(0.01)
+        backend.gate.set()
+        return await before, await after
+    
+    before, after = asyncio.run(main())
+    assert (before["balance"], after["balance"]) == (100.0, 90.0)
+    assert backend.calls == 2
+
+
+def test_cancelling_the_first_async_caller_spares_the_others():
+    backend = SlowBackend()
+    backend.gate.clear()
+    api = CachingBankingAPI(backend)
+    
+    async def main():
+        first = asyncio.ensure_future(api.aget_account_details("1"))
+        second = asyncio.ensure_future(api.aget_account_details("1"))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        backend.gate.set()
+        return await second
+    
+    assert asyncio.run(main())["balance"] == 100.0
+    assert backend.calls == 1
+
+
+def test_callers_get_copies():
+    api = CachingBankingAPI(SlowBackend())
+    api.get_account_details("1")["balance"] = 0.0
+    api.get_transaction_history("1")[0]["amount"] = 99.0
+    assert api.get_account_details("1")["balance"] == 100.0
+    assert api.get_transaction_history("1")[0]["amount"] == 1.0
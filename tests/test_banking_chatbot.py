@@ -0,0 +1,24 @@
+import asyncio
+import logging
+
+from banking_chatbot import DEFAULT_REASONING, BankingChatbot, MockBankingAPI
+from llm_cache import ResponseCache
+
+
+class BrokenModel:
+    def generate_content(self, prompt: str):
+        raise ConnectionError("model unreachable")
+
+
+CLASSIFICATION = {"category": "ACCOUNT_QUERY", "intent": "balance_inquiry", "entities": {}, "source": "llm"}
+
+
+def test_failed_reasoning_calls_fall_back_and_are_logged(caplog):
+    bot = BankingChatbot(api=MockBankingAPI(0), llm=BrokenModel(), cache=ResponseCache())
+    with caplog.at_level(logging.ERROR, logger='banking_chatbot'):
+        sync_plan = bot.reason(CLASSIFICATION, "what is my balance", {})
+        async_plan = asyncio.run(bot.areason(CLASSIFICATION, "what is my balance", {}))
+    assert sync_plan["reasoning"] == async_plan["reasoning"] == DEFAULT_REASONING
+    failures = [record for record in caplog.records if record.message.startswith("Reasoning call failed")]
+    assert len(failures) == 2
+    assert all(isinstance(record.exc_info[1], ConnectionError) for record in failures)
@@ -0,0 +1,258 @@
+import asyncio
+import json
+import logging
+import struct
+
+import pytest
+
+from banking_chatbot import BankingChatbot, MockBankingAPI
+from chat_server import ChatServer, Draining, Overloaded, _BadRequest, _read_request
+from tests.chat_clients import HttpClient, WebSocketClient
+from tests.stub_model import StubModel
+
+
+def make_bot() -> BankingChatbot:
+    return BankingChatbot(api=MockBankingAPI(0), llm=StubModel(0))
+
+
+def run_server(test, bot=None, **kwargs):
+    """Run test(server) against a started server, draining it afterwards"""
+    async def main():
+        server = await ChatServer(bot or make_bot(), port=0, **kwargs).start()
+        try:
+            return await test(server)
+        finally:
+            await server.drain(timeout=1)
+    
+    return asyncio.run(main())
+
+
+def hold_turns(bot: BankingChatbot) -> asyncio.Event:
+    """Make every chat turn wait until the returned event is set"""
+    release = asyncio.Event()
+    
+    async def achat(message, session_id=None):
+        await release.wait()
+        return "done"
+    
+    bot.achat = achat
+    return release
+
+
+async def read_request(data: bytes, limit: int = 2 ** 16, max_body: int = 1024):
+    reader = asyncio.StreamReader(limit=limit)
+    reader.feed_data(data)
+    reader.feed_eof()
+    return await _read_request(reader, max_body)
+
+
+def test_read_request_parses_a_post():
+    request = b'POST /chat?x=1 HTTP/1.1\r\nContent-Type: application/json\r\nContent-Length: 2\r\n\r\n{}'
+    assert asyncio.run(read_request(request)) == ('POST', '/chat', {'content-type': 'application/json',
+                                                                    'content-length': '2'}, b'{}')
+
+
+def test_read_request_returns_none_when_the_client_hangs_up():
+    assert asyncio.run(read_request(b'')) is None
+
+
+@pytest.mark.parametrize("data, status", [
+    (b'GET /healthz HTTP/1.1\r\nHost: x', 400),
+    (b'NONSENSE\r\n\r\n', 400),
+    (b'POST /chat HTTP/1.1\r\nContent-Length: ten\r\n\r\n', 400),
+    (b'POST /chat HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n', 411),
+    (b'POST /chat HTTP/1.1\r\nContent-Length: 5000\r\n\r\n', 413),
+    (b'GET / HTTP/1.1\r\nX-Padding: ' + b'a' * 200 + b'\r\n\r\n', 431),
+])
+def test_read_request_errors(data, status):
+    with pytest.raises(_BadRequest) as error:
+        asyncio.run(read_request(data, limit=128))
+    assert error.value.status == status
+
+
+def test_chat_over_http():
+    async def test(server):
+        client = HttpClient(server.host, server.port)
+        try:
+            return await client.turn("What are your interest rates?", "s1")
+        finally:
+            await client.close()
+    
+    assert run_server(test) == (200, 0.0)
+
+
+def test_full_server_sheds_with_retry_after():
+    bot = make_bot()
+    
+    async def test(server):
+        release = hold_turns(bot)
+        clients = [HttpClient(server.host, server.port) for _ in range(3)]
+        first = asyncio.ensure_future(clients[0].turn("hi", "a"))
+        second = asyncio.ensure_future(clients[1].turn("hi", "b"))
+        while server.queued < 1:
+            await asyncio.sleep(0.01)
+        shed = await clients[2].turn("hi", "c")
+        release.set()
+        results = [await first, await second, shed]
+        for client in clients:
+            await client.close()
+        return results
+    
+    first, second, shed = run_server(test, bot=bot, max_inflight=1, max_queue=1)
+    assert first[0] == second[0] == 200
+    assert shed[0] == 429 and shed[1] >= 1
+
+
+def test_session_queue_sheds_with_overloaded():
+    bot = make_bot()
+    
+    async def test(server):
+        release = hold_turns(bot)
+        first = asyncio.ensure_future(server.submit("a", lambda: bot.achat("hi")))
+        await asyncio.sleep(0.01)
+        with pytest.raises(Overloaded) as error:
+            await server.submit("a", lambda: bot.achat("hi"))
+        release.set()
+        await first
+        return error.value.retry_after
+    
+    assert run_server(test, bot=bot, session_queue=1) >= 1
+
+
+def test_drain_finishes_inflight_turns_and_refuses_new_ones():
+    bot = make_bot()
+    
+    async def test(server):
+        release = hold_turns(bot)
+        turn = asyncio.ensure_future(server.submit("a", lambda: bot.achat("hi")))
+        await asyncio.sleep(0.01)
+        drain = asyncio.ensure_future(server.drain(timeout=5))
+        await asyncio.sleep(0.01)
+        assert not drain.done()
+        with pytest.raises(Draining):
+            await server.submit("b", lambda: bot.achat("hi"))
+        release.set()
+        return await turn, await drain
+    
+    assert run_server(test, bot=bot) == ("done", True)
+
+
+def test_drain_times_out_on_a_stuck_turn():
+    bot = make_bot()
+    
+    async def test(server):
+        hold_turns(bot)
+        turn = asyncio.ensure_future(server.submit("a", lambda: bot.achat("hi")))
+        await asyncio.sleep(0.01)
+        finished = await server.drain(timeout=0.05)
+        turn.cancel()
+        return finished
+    
+    assert run_server(test, bot=bot) is False
+
+
+def test_failed_turn_answers_500_and_logs_the_traceback(caplog):
+    bot = make_bot()
+    
+    async def achat(message, session_id=None):
+        raise RuntimeError("model exploded")
+    
+    bot.achat = achat
+    
+    async def test(server):
+        client = HttpClient(server.host, server.port)
+        try:
+            return await client.turn("hi", "s1")
+        finally:
+            await client.close()
+    
+    with caplog.at_level(logging.ERROR, logger='chat_server'):
+        assert run_server(test, bot=bot)[0] == 500
+    record, = caplog.records
+    assert "s1" in record.getMessage()
+    assert record.exc_info[0] is RuntimeError
+
+
+def test_websocket_streams_a_reply():
+    async def test(server):
+        client = WebSocketClient(server.host, server.port)
+        try:
+            return await client.turn("What are your interest rates?", "s1")
+        finally:
+            await client.close()
+    
+    assert run_server(test) == (200, 0.0)
+
+
+def test_websocket_closes_unmasked_client_frames_with_protocol_error():
+    async def test(server):
+        client = WebSocketClient(server.host, server.port)
+        await client._connect()
+        payload = json.dumps({"message": "hi"}).encode()
+        client.writer.write(struct.pack('!BB', 0x81, len(payload)) + payload)
+        first, second = await client.reader.readexactly(2)
+        code = await client.reader.readexactly(second & 0x7f)
+        await client.close()
+        return first & 0x0f, struct.unpack('!H', code[:2])[0]
+    
+    assert run_server(test) == (0x8, 1002)
+
+
+def masked_frame(first: int, payload: bytes) -> bytes:
+    mask = b'\x01\x02\x03\x04'
+    return struct.pack('!BB', first, 0x80 | len(payload)) + mask + bytes(
+        b ^ mask[i % 4] for i, b in enumerate(payload))
+
+
+async def read_frame(reader: asyncio.StreamReader):
+    first, second = await reader.readexactly(2)
+    return first & 0x0f, await reader.readexactly(second & 0x7f)
+
+
+def test_websocket_answers_a_ping_between_fragments():
+    async def test(server):
+        client = WebSocketClient(server.host, server.port)
+        await client._connect()
+        payload = json.dumps({"message": "What are your interest rates?", "session_id": "s1"}).encode()
+        client.writer.write(masked_frame(0x01, payload[:10]) + masked_frame(0x89, b'are you there')
+                            + masked_frame(0x80, payload[10:]))
+        frames = [await read_frame(client.reader)]
+        while b'"done"' not in frames[-1][1]:
+            frames.append(await read_frame(client.reader))
+        await client.close()
+        return frames
+    
+    frames = run_server(test)
+    assert frames[0] == (0xA, b'are you there')
+    assert any(b'"chunk"' in data for _, data in frames[1:])
+    assert json.loads(frames[-1][1]) == {"done": True, "session_id": "s1"}
+
+
+def test_websocket_closes_a_continuation_without_a_start():
+    async def test(server):
+        client = WebSocketClient(server.host, server.port)
+        await client._connect()
+        client.writer.write(masked_frame(0x80, b'{}'))
+        opcode, data = await read_frame(client.reader)
+        await client.close()
+        return opcode, struct.unpack('!H', data[:2])[0]
+    
+    assert run_server(test) == (0x8, 1002)
+
+
+@pytest.mark.parametrize("version", [None, "8"])
+def test_websocket_upgrade_requires_version_13(version):
+    async def test(server):
+        reader, writer = await asyncio.open_connection(server.host, server.port)
+        head = "GET /ws HTTP/1.1\r\nHost: x\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n" \
+               "Sec-WebSocket-Key: dGhlIHNhbXBsZSBub25jZQ==\r\n"
+        if version:
+            head += f"Sec-WebSocket-Version: {version}\r\n"
+        writer.write((head + "\r\n").encode())
+        response = await reader.readuntil(b'\r\n\r\n')
+        writer.close()
+        return response.decode('latin-1')
+    
+    response = run_server(test)
+    assert response.startswith("HTTP/1.1 426 ")
+    assert "Sec-WebSocket-Version: 13" in response
@@ -0,0 +1,62 @@
+import pytest
+
+from entity_extractor import extract_entities, parse_amount
+
+
+def test_eight_digit_number_is_an_account_number_not_an_amount():
+    entities = extract_entities("Transfer from 12345678 please")
+    assert entities.account_number == "12345678"
+    assert entities.amount is None
+
+
+def test_eight_digit_number_never_becomes_the_amount_next_to_a_bare_number():
+    entities = extract_entities("Account 12345678, loan of 500000")
+    assert entities.account_number == "12345678"
+    assert entities.amount == 500000
+
+
+def test_currency_amount_beats_a_bare_number():
+    entities = extract_entities("I earn 60000 a month and need ₹2,00,000")
+    assert entities.amount == 200000
+    assert entities.amount_text == "₹2,00,000"
+
+
+def test_unit_amount_beats_a_bare_number():
+    entities = extract_entities("For 5 years I want 3 lakhs")
+    assert entities.amount == 300000
+    assert entities.amount_text == "3 lakhs"
+
+
+@pytest.mark.parametrize("text, amount", [
+    ("a loan of 5 lakh", 5e5),
+    ("a loan of 2.5 lakhs", 2.5e5),
+    ("a loan of 10 lacs", 1e6),
+    ("a loan of 1 crore", 1e7),
+    ("a loan of 1.2 cr", 1.2e7),
+    ("a loan of Rs. 50k", 5e4),
+])
+def test_lakh_and_crore_amounts(text, amount):
+    assert extract_entities(text).amount == pytest.approx(amount)
+
+
+def test_parse_amount_handles_indian_grouping():
+    assert parse_amount("1,50,000") == 150000
+    assert parse_amount("2.5", "Crore") == 25000000
+
+
+def test_card_is_not_a_car_loan():
+    entities = extract_entities("Block my credit card")
+    assert entities.card_type == "credit"
+    assert entities.loan_type is None
+
+
+def test_car_loan_is_found():
+    assert extract_entities("I need a car loan").loan_type == "Car Loan"
+
+
+def test_named_loan_beats_a_bare_loan_type():
+    assert extract_entities("My home is far, I want a personal loan").loan_type == "Personal Loan"
+
+
+def test_nothing_mentioned():
+    assert extract_entities("Hello there").as_context() == {}
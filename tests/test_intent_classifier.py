@@ -0,0 +1,117 @@
+import threading
+
+import pytest
+
+from intent_classifier import IntentClassifier, examples_from_interactions, hashed_counts, tokenize
+
+EXAMPLES = [
+    ("what is my balance", "ACCOUNT_QUERY", "balance_inquiry"),
+    ("how much money is in my account", "ACCOUNT_QUERY", "balance_inquiry"),
+    ("check balance for 12345678", "ACCOUNT_QUERY", "balance_inquiry"),
+    ("show my recent transactions", "ACCOUNT_QUERY", "transaction_history"),
+    ("list the payments on my statement", "ACCOUNT_QUERY", "transaction_history"),
+    ("i want to apply for a loan", "SPECIFIC_TASK", "loan_application"),
+    ("can i borrow money with a personal loan", "SPECIFIC_TASK", "loan_application"),
+    ("my card was stolen please block it", "SPECIFIC_TASK", "card_blocking"),
+    ("freeze my lost debit card", "SPECIFIC_TASK", "card_blocking"),
+    ("what are your interest rates", "BASIC_QUERY", "general_inquiry"),
+    ("what fees do you charge", "BASIC_QUERY", "general_inquiry"),
+]
+
+
+@pytest.fixture(scope='module')
+def classifier():
+    return IntentClassifier.train(EXAMPLES, dim=2 ** 12)
+
+
+def test_tokenize_reduces_numbers_to_their_shape():
+    assert tokenize("Send 250 to 12345678!") == ['send', '<num>', 'to', '<acct>']
+
+
+def test_hashed_counts_are_stable_across_calls():
+    assert hashed_counts("my balance", 1024) == hashed_counts("my balance", 1024)
+    assert hashed_counts("", 1024) == {}
+
+
+@pytest.mark.parametrize("text,intent", [
+    ("whats my balanse", "balance_inquiry"),
+    ("show transactions please", "transaction_history"),
+    ("apply for a personal loan", "loan_application"),
+    ("block my stolen card", "card_blocking"),
+    ("what interest rates and fees", "general_inquiry"),
+])
+def test_similar_wording_gets_the_training_label(classifier, text, intent):
+    result = classifier.classify(text)
+    assert result["intent"] == intent
+    assert result["source"] == "local_model"
+    assert 0.0 < result["confidence"] <= 1.0
+
+
+def test_batches_match_single_classifications(classifier):
+    texts = [text for text, _, _ in EXAMPLES] + [""]
+    assert classifier.classify_batch(texts) == [classifier.classify(text) for text in texts]
+
+
+def test_route_defers_below_the_threshold():
+    strict = IntentClassifier.train(EXAMPLES, dim=2 ** 12, threshold=1.01)
+    assert strict.route("what is my balance") is None
+    assert strict.hit_rate == 0.0
+    eager = IntentClassifier.train(EXAMPLES, dim=2 ** 12, threshold=0.0)
+    assert eager.route("zzz") is not None
+    assert eager.hit_rate == 1.0
+
+
+def test_hit_rate_counts_every_route_from_many_threads():
+    classifier = IntentClassifier.train(EXAMPLES, dim=2 ** 12, threshold=0.0)
+    
+    def worker():
+        for _ in range(200):
+            classifier.route("what is my balance")
+    
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert classifier.stats == {"local_model": 1600, "llm": 0}
+
+
+def test_saved_models_load_with_the_same_scores(classifier, tmp_path):
+    path = str(tmp_path / 'intent.model')
+    classifier.save(path)
+    loaded = IntentClassifier.load(path)
+    loaded.prefetch()
+    assert loaded.labels == classifier.labels
+    texts = ["what is my balance", "block my card", "hello there"]
+    assert loaded.classify_batch(texts) == classifier.classify_batch(texts)
+
+
+def test_load_rejects_other_files(tmp_path):
+    path = tmp_path / 'not.model'
+    path.write_bytes(b'{"labels": []}')
+    with pytest.raises(ValueError):
+        IntentClassifier.load(str(path))
+
+
+def test_training_needs_usable_examples():
+    with pytest.raises(ValueError):
+        IntentClassifier.train([("!!!", "BASIC_QUERY", "general_inquiry")])
+
+
+def test_only_trusted_interactions_become_examples():
+    records = [
+        {"user_input": "balance", "classification": {"category": "ACCOUNT_QUERY", "intent": "balance_inquiry"}},
+        {"user_input": "loan", "classification": {"category": "SPECIFIC_TASK", "intent": "loan_application",
+                                                  "source": "fast_path"}},
+        {"user_input": "guess", "classification": {"category": "BASIC_QUERY", "intent": "general_inquiry",
+                                                   "source": "fallback"}},
+        {"user_input": "echo", "classification": {"category": "BASIC_QUERY", "intent": "general_inquiry",
+                                                  "source": "local_model"}},
+        {"user_input": "odd", "classification": {"category": "UNKNOWN", "intent": "x"}},
+        {"user_input": "", "classification": {"category": "BASIC_QUERY", "intent": "general_inquiry"}},
+        {"user_input": "none"},
+    ]
+    assert list(examples_from_interactions(records)) == [
+        ("balance", "ACCOUNT_QUERY", "balance_inquiry"),
+        ("loan", "SPECIFIC_TASK", "loan_application"),
+    ]
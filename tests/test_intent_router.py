@@ -0,0 +1,55 @@
+import threading
+
+import pytest
+
+from intent_router import IntentRouter
+
+
+@pytest.mark.parametrize("text,category,intent", [
+    ("Check the balance of account 12345678", "ACCOUNT_QUERY", "balance_inquiry"),
+    ("Show my transaction history", "ACCOUNT_QUERY", "transaction_history"),
+    ("I want a loan", "SPECIFIC_TASK", "loan_application"),
+    ("block my card, it was stolen", "SPECIFIC_TASK", "card_blocking"),
+    ("what are your interest rates", "BASIC_QUERY", "general_inquiry"),
+])
+def test_clear_queries_take_the_fast_path(text, category, intent):
+    routed = IntentRouter().route(text)
+    assert routed is not None
+    assert (routed["category"], routed["intent"], routed["source"]) == (category, intent, "fast_path")
+
+
+def test_account_numbers_are_extracted():
+    routed = IntentRouter().route("Check the balance of account 12345678")
+    assert routed["entities"] == {"account_number": "12345678"}
+
+
+@pytest.mark.parametrize("text", ["hello", "something random", "account 12345678"])
+def test_weak_evidence_defers_to_the_model(text):
+    assert IntentRouter().route(text) is None
+
+
+def test_no_keywords_means_no_confidence():
+    assert IntentRouter().classify("something random")["confidence"] == 0.0
+
+
+def test_a_threshold_above_one_disables_the_fast_path():
+    router = IntentRouter(threshold=1.01)
+    assert router.route("Check the balance of account 12345678") is None
+    assert router.hit_rate == 0.0
+
+
+def test_hit_rate_counts_every_route_from_many_threads():
+    router = IntentRouter()
+    
+    def worker():
+        for _ in range(500):
+            router.route("What is my balance")
+            router.route("hello")
+    
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert router.stats == {"fast_path": 4000, "llm": 4000}
+    assert router.hit_rate == 0.5
@@ -0,0 +1,106 @@
+import os
+import threading
+
+from interaction_log import InteractionLog, read_interactions
+
+
+def records(count: int, start: int = 0):
+    return [{"user_input": f"turn {i}", "classification": {"intent": "balance_inquiry"}}
+            for i in range(start, start + count)]
+
+
+def test_memory_only_log_keeps_the_most_recent_records():
+    log = InteractionLog(capacity=3)
+    for record in records(5):
+        log.append(record)
+    assert len(log) == 3
+    assert [record["user_input"] for record in log] == ["turn 2", "turn 3", "turn 4"]
+    assert log.flush() is True
+    assert log.stats["appended"] == 5
+
+
+def test_records_round_trip_through_the_directory(tmp_path):
+    log = InteractionLog(str(tmp_path), flush_interval=60)
+    for record in records(10):
+        log.append(record)
+    assert log.flush(timeout=5)
+    assert list(read_interactions(str(tmp_path))) == records(10)
+    log.close()
+    assert log.stats["written"] == 10
+
+
+def test_segments_rotate_and_a_new_log_never_reopens_one(tmp_path):
+    log = InteractionLog(str(tmp_path), segment_bytes=200, batch_size=2, flush_interval=60)
+    for record in records(10):
+        log.append(record)
+    log.close()
+    assert log.stats["segments"] > 1
+    
+    reopened = InteractionLog(str(tmp_path), flush_interval=60)
+    reopened.append(records(1, start=10)[0])
+    reopened.close()
+    names = sorted(os.listdir(tmp_path))
+    assert names[-1] == f"interactions-{log.stats['segments'] + 1:06d}.jsonl"
+    assert list(read_interactions(str(tmp_path))) == records(11)
+
+
+def test_compressed_segments_are_readable_before_and_after_close(tmp_path):
+    log = InteractionLog(str(tmp_path), compress=True, flush_interval=60)
+    for record in records(3):
+        log.append(record)
+    assert log.flush(timeout=5)
+    # The segment is still open, so it has no gzip trailer yet
+    assert list(read_interactions(str(tmp_path))) == records(3)
+    log.close()
+    assert os.listdir(tmp_path) == ["interactions-000001.jsonl.gz"]
+    assert list(read_interactions(str(tmp_path))) == records(3)
+
+
+def test_a_line_cut_short_is_skipped(tmp_path):
+    (tmp_path / "interactions-000001.jsonl").write_text('{"user_input": "a"}\n{"user_in')
+    (tmp_path / "interactions-000002.jsonl").write_text('{"user_input": "b"}\n')
+    (tmp_path / "notes.txt").write_text('not a segment\n')
+    assert list(read_interactions(str(tmp_path))) == [{"user_input": "a"}, {"user_input": "b"}]
+    assert list(read_interactions(str(tmp_path / "missing"))) == []
+
+
+def test_a_stalled_writer_drops_the_oldest_pending_records(tmp_path):
+    log = InteractionLog(str(tmp_path), max_pending=3, batch_size=1, flush_interval=60)
+    release = threading.Event()
+    started = threading.Event()
+    write = log._write
+    
+    def stalled_write(batch):
+        started.set()
+        release.wait(5)
+        write(batch)
+    
+    log._write = stalled_write
+    log.append(records(1)[0])
+    assert started.wait(5)
+    for record in records(5, start=1):
+        log.append(record)
+    release.set()
+    log.close()
+    assert log.stats["dropped"] == 2
+    assert [record["user_input"] for record in read_interactions(str(tmp_path))] == \
+        ["turn 0", "turn 3", "turn 4", "turn 5"]
+
+
+def test_a_failed_write_is_counted_and_the_writer_carries_on(tmp_path):
+    log = InteractionLog(str(tmp_path), flush_interval=60)
+    write = log._write
+    failures = [OSError("disk full")]
+    
+    def failing_write(batch):
+        if failures:
+            raise failures.pop()
+        write(batch)
+    
+    log._write = failing_write
+    log.append(records(1)[0])
+    assert log.flush(timeout=5)
+    log.append(records(1, start=1)[0])
+    log.close()
+    assert (log.stats["write_errors"], log.stats["dropped"], log.stats["written"]) == (1, 1, 1)
+    assert list(read_interactions(str(tmp_path))) == records(1, start=1)
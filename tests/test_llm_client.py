@@ -0,0 +1,242 @@
+import asyncio
+import threading
+
+import pytest
+
+from llm_client import (CircuitBreaker, CircuitOpen, DeadlineExceeded, RateLimited, ResilientModel,
+                        TokenBucket)
+
+
+class FakeClock:
+    """A monotonic clock that only moves when told to"""
+    
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+    
+    def __call__(self) -> float:
+        return self.now
+    
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+class ScriptedModel:
+    """Fails the first `failures` calls, then answers; calls listed in `slow` block until released"""
+    
+    def __init__(self, failures: int = 0, slow=()):
+        self.failures = failures
+        self.slow = set(slow)
+        self.calls = 0
+        self.release = threading.Event()
+        self._lock = threading.Lock()
+    
+    def _next(self) -> int:
+        with self._lock:
+            self.calls += 1
+            return self.calls
+    
+    def generate_content(self, prompt: str):
+        call = self._next()
+        if call in self.slow:
+            self.release.wait(5)
+        if call <= self.failures:
+            raise ConnectionError(f"call {call} failed")
+        return f"reply {call}"
+
+
+class AsyncScriptedModel(ScriptedModel):
+    async def generate_content_async(self, prompt: str):
+        call = self._next()
+        if call in self.slow:
+            await asyncio.sleep(5)
+        if call <= self.failures:
+            raise ConnectionError(f"call {call} failed")
+        return f"reply {call}"
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def resilient():
+    clients = []
+    
+    def make(model, **options):
+        client = ResilientModel(model, backoff=0.0, **options)
+        clients.append(client)
+        return client
+    
+    yield make
+    for client in clients:
+        client.close()
+
+
+def test_token_bucket_allows_a_burst_then_queues_waiters_in_order(clock):
+    bucket = TokenBucket(rate=2, burst=2, clock=clock)
+    assert bucket.reserve(0) == 0.0
+    assert bucket.reserve(0) == 0.0
+    # Over max_wait: nothing is taken
+    assert bucket.reserve(0) is None
+    assert bucket.reserve(1.0) == 0.5
+    assert bucket.reserve(1.0) == 1.0
+    clock.advance(1.5)
+    assert bucket.reserve(0) == 0.0
+    assert bucket.reserve(0) is None
+
+
+def test_token_bucket_refills_no_further_than_its_burst(clock):
+    bucket = TokenBucket(rate=1, burst=3, clock=clock)
+    clock.advance(100)
+    assert [bucket.reserve(0) for _ in range(4)] == [0.0, 0.0, 0.0, None]
+
+
+def test_breaker_opens_after_consecutive_failures_only(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30, clock=clock)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+
+def test_breaker_lets_one_probe_through_after_the_cool_down(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30, clock=clock)
+    breaker.record_failure()
+    clock.advance(29.9)
+    assert not breaker.allow()
+    clock.advance(0.1)
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()
+    
+    # A failed probe opens the breaker for another full cool-down
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    clock.advance(29.9)
+    assert not breaker.allow()
+    clock.advance(0.1)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow() and breaker.allow()
+
+
+def test_breaker_probe_that_never_reports_back_is_retried_after_another_cool_down(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30, clock=clock)
+    breaker.record_failure()
+    clock.advance(30)
+    assert breaker.allow()
+    clock.advance(30)
+    assert breaker.allow()
+
+
+def test_transient_failures_are_retried(resilient):
+    model = ScriptedModel(failures=2)
+    client = resilient(model, retries=2)
+    assert client.generate_content("hi") == "reply 3"
+    assert client.stats["retries"] == 2
+    assert client.stats["failures"] == 2
+    assert client.stats["successes"] == 1
+
+
+def test_the_last_error_surfaces_once_retries_run_out(resilient):
+    model = ScriptedModel(failures=5)
+    client = resilient(model, retries=2)
+    with pytest.raises(ConnectionError, match="call 3"):
+        client.generate_content("hi")
+    assert model.calls == 3
+
+
+def test_a_slow_call_is_abandoned_at_its_deadline_and_not_retried(resilient):
+    model = ScriptedModel(slow={1})
+    client = resilient(model, retries=2)
+    try:
+        with pytest.raises(DeadlineExceeded):
+            client.generate_content("hi", timeout=0.05)
+    finally:
+        model.release.set()
+    assert model.calls == 1
+    assert client.stats["deadline_exceeded"] == 1
+
+
+def test_rate_limited_calls_fail_fast_without_tripping_the_breaker(clock, resilient):
+    model = ScriptedModel()
+    breaker = CircuitBreaker(failure_threshold=1, clock=clock)
+    client = resilient(model, rate=1, burst=1, breaker=breaker, clock=clock)
+    assert client.generate_content("hi", timeout=0.5) == "reply 1"
+    # The next token is a second away, past the half-second deadline
+    with pytest.raises(RateLimited):
+        client.generate_content("hi", timeout=0.5)
+    assert model.calls == 1
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert client.stats["rate_limited"] == 1
+    clock.advance(1)
+    assert client.generate_content("hi", timeout=0.5) == "reply 2"
+
+
+def test_an_open_breaker_short_circuits_until_its_probe(clock, resilient):
+    model = ScriptedModel(failures=1)
+    client = resilient(model, retries=0, breaker=CircuitBreaker(failure_threshold=1, reset_timeout=30, clock=clock),
+                       clock=clock)
+    with pytest.raises(ConnectionError):
+        client.generate_content("hi")
+    with pytest.raises(CircuitOpen):
+        client.generate_content("hi")
+    assert model.calls == 1
+    assert client.stats["short_circuited"] == 1
+    clock.advance(30)
+    assert client.generate_content("hi") == "reply 2"
+    assert client.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_a_hedge_answers_for_a_slow_primary(resilient):
+    model = ScriptedModel(slow={1})
+    client = resilient(model, hedge_after=0.02, timeout=2.0)
+    try:
+        assert client.generate_content("hi") == "reply 2"
+    finally:
+        model.release.set()
+    assert client.stats["hedges"] == 1
+    assert client.stats["hedge_wins"] == 1
+
+
+def test_no_hedge_is_sent_without_a_spare_request_token(clock, resilient):
+    model = ScriptedModel(slow={1})
+    client = resilient(model, rate=1, burst=1, hedge_after=0.02, timeout=0.2, clock=clock)
+    try:
+        # The fake clock never reaches the deadline, so release the primary from another thread
+        threading.Timer(0.1, model.release.set).start()
+        assert client.generate_content("hi") == "reply 1"
+    finally:
+        model.release.set()
+    assert model.calls == 1
+    assert client.stats["hedges"] == 0
+
+
+def test_async_calls_retry_hedge_and_meet_their_deadline(resilient):
+    async def scenario():
+        flaky = resilient(AsyncScriptedModel(failures=1), retries=1)
+        assert await flaky.generate_content_async("hi") == "reply 2"
+        
+        hedged = resilient(AsyncScriptedModel(slow={1}), hedge_after=0.02, timeout=2.0)
+        assert await hedged.generate_content_async("hi") == "reply 2"
+        assert hedged.stats["hedge_wins"] == 1
+        
+        stuck = resilient(AsyncScriptedModel(slow={1}), retries=2)
+        with pytest.raises(DeadlineExceeded):
+            await stuck.generate_content_async("hi", timeout=0.05)
+        assert stuck.model.calls == 1
+    
+    asyncio.run(scenario())
+
+
+def test_async_calls_run_a_sync_only_model_on_a_thread(resilient):
+    model = ScriptedModel()
+    client = resilient(model)
+    assert asyncio.run(client.generate_content_async("hi")) == "reply 1"
@@ -0,0 +1,206 @@
+import asyncio
+import math
+import threading
+import time
+import urllib.error
+import urllib.request
+from types import SimpleNamespace
+
+import pytest
+
+import metrics as metrics_module
+from metrics import Histogram, Metrics, SamplingProfiler, TimedProxy, estimate_tokens, timed
+
+
+class FakeClock:
+    """Stands in for the timers' perf_counter; each call moves it on by `step` seconds"""
+    
+    def __init__(self, step: float):
+        self.now = 0.0
+        self.step = step
+    
+    def __call__(self) -> float:
+        self.now += self.step
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock(0.25)
+    monkeypatch.setattr(metrics_module, 'time', SimpleNamespace(perf_counter=fake))
+    return fake
+
+
+class Account:
+    def __init__(self, metrics: Metrics):
+        self.metrics = metrics
+        self.balance = 0
+    
+    @timed('account_seconds', op='deposit')
+    def deposit(self, amount: int) -> int:
+        self.balance += amount
+        return self.balance
+    
+    @timed('account_seconds', op='adeposit')
+    async def adeposit(self, amount: int) -> int:
+        return self.deposit(amount)
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("hi") == 1
+    assert estimate_tokens("x" * 9) == 3
+
+
+def test_histogram_quantiles_interpolate_within_the_observed_range():
+    histogram = Histogram((1.0, 2.0, 4.0))
+    for value in (0.5, 1.5, 1.5, 3.0):
+        histogram.observe(value)
+    assert histogram.counts == [1, 2, 1, 0]
+    assert (histogram.count, histogram.sum, histogram.min, histogram.max) == (4, 6.5, 0.5, 3.0)
+    assert histogram.quantile(0.5) == pytest.approx(1.5)
+    assert histogram.quantile(1.0) == 3.0
+    assert histogram.quantile(0.0) == 0.5
+    assert math.isnan(Histogram().quantile(0.5))
+
+
+def test_values_past_the_last_bound_land_in_the_inf_bucket():
+    histogram = Histogram((1.0,))
+    histogram.observe(10.0)
+    assert histogram.counts == [0, 1]
+    assert histogram.quantile(0.99) <= 10.0
+
+
+def test_timers_and_decorators_observe_elapsed_time(clock):
+    registry = Metrics()
+    with registry.timer('stage_seconds', stage='sense'):
+        pass
+    account = Account(registry)
+    assert account.deposit(5) == 5
+    assert asyncio.run(account.adeposit(5)) == 10
+    summary = registry.summary()
+    assert summary['stage_seconds{stage="sense"}']["mean"] == 0.25
+    assert summary['account_seconds{op="deposit"}']["count"] == 2
+    # The async call's timer spans the inner deposit's timer too
+    assert summary['account_seconds{op="adeposit"}']["mean"] == 0.75
+
+
+def test_a_disabled_registry_records_nothing(clock):
+    registry = Metrics(enabled=False)
+    with registry.timer('stage_seconds'):
+        pass
+    registry.observe('stage_seconds', 1.0)
+    registry.inc('turns')
+    assert registry.summary() == {}
+    assert clock.now == 0.0
+
+
+def test_counters_sum_per_label_set_and_reset():
+    registry = Metrics()
+    registry.inc('turns', route='fast_path')
+    registry.inc('turns', 2, route='fast_path')
+    registry.inc('turns', route='llm')
+    assert registry.summary() == {'turns_total{route="fast_path"}': 3, 'turns_total{route="llm"}': 1}
+    registry.reset()
+    assert registry.summary() == {}
+
+
+def test_concurrent_observations_are_all_counted():
+    registry = Metrics()
+    
+    def worker():
+        for _ in range(1000):
+            registry.observe('latency_seconds', 0.001)
+            registry.inc('turns')
+    
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    summary = registry.summary()
+    assert summary['latency_seconds']["count"] == 8000
+    assert summary['turns_total'] == 8000
+
+
+def test_exposition_is_cumulative_and_escapes_label_values():
+    registry = Metrics(buckets=(0.1, 1.0))
+    registry.describe('latency_seconds', 'Turn latency')
+    registry.describe('turns', 'Turns served')
+    registry.observe('latency_seconds', 0.05, path='say "hi"\n')
+    registry.observe('latency_seconds', 0.5, path='say "hi"\n')
+    registry.inc('turns')
+    lines = registry.exposition().splitlines()
+    assert lines[:2] == ['# HELP latency_seconds Turn latency', '# TYPE latency_seconds histogram']
+    assert 'latency_seconds_bucket{path="say \\"hi\\"\\n",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{path="say \\"hi\\"\\n",le="1.0"} 2' in lines
+    assert 'latency_seconds_bucket{path="say \\"hi\\"\\n",le="+Inf"} 2' in lines
+    assert 'latency_seconds_count{path="say \\"hi\\"\\n"} 2' in lines
+    assert lines[-3:] == ['# HELP turns_total Turns served', '# TYPE turns_total counter', 'turns_total 1']
+
+
+def test_openmetrics_names_counter_families_without_the_suffix():
+    registry = Metrics()
+    registry.inc('turns')
+    lines = registry.exposition(openmetrics=True).splitlines()
+    assert lines == ['# TYPE turns counter', 'turns_total 1', '# EOF']
+
+
+def test_write_replaces_the_file_whole(tmp_path):
+    registry = Metrics()
+    registry.inc('turns')
+    path = tmp_path / 'chatbot.prom'
+    registry.write(str(path))
+    assert path.read_text() == registry.exposition()
+    assert [p.name for p in tmp_path.iterdir()] == ['chatbot.prom']
+
+
+def test_serve_answers_metrics_requests():
+    registry = Metrics()
+    registry.inc('turns')
+    server = registry.serve(port=0)
+    try:
+        host, port = server.server_address[:2]
+        with urllib.request.urlopen(f'http://{host}:{port}/metrics') as response:
+            assert response.read().decode() == registry.exposition()
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(f'http://{host}:{port}/other')
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_timed_proxy_times_public_methods_and_forwards_the_rest(clock):
+    registry = Metrics()
+    account = Account(Metrics(enabled=False))
+    proxy = TimedProxy(account, registry, 'api_seconds')
+    assert isinstance(proxy, Account)
+    assert proxy.deposit(3) == 3
+    proxy.balance = 10
+    assert account.balance == 10 and proxy.balance == 10
+    assert registry.summary()['api_seconds{method="deposit"}']["count"] == 1
+    
+    # A replaced method is timed in its new form
+    proxy.deposit = lambda amount: -amount
+    assert proxy.deposit(3) == -3
+    assert registry.summary()['api_seconds{method="deposit"}']["count"] == 2
+
+
+def test_sampling_profiler_sees_a_busy_thread():
+    stop = threading.Event()
+    
+    def busy():
+        while not stop.is_set():
+            sum(range(1000))
+    
+    thread = threading.Thread(target=busy)
+    thread.start()
+    try:
+        with SamplingProfiler(interval=0.001) as profiler:
+            time.sleep(0.1)
+    finally:
+        stop.set()
+        thread.join()
+    assert any('test_metrics.py:busy' in stack for stack in profiler.samples)
+    assert profiler.collapsed().splitlines()[0].rsplit(' ', 1)[1].isdigit()
+    assert profiler.top(1)
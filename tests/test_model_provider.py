@@ -0,0 +1,64 @@
+import threading
+import time
+
+import model_provider
+from llm_client import ResilientModel
+from model_provider import GenAIProvider, ModelProvider
+
+
+def test_the_factory_runs_on_first_get_only():
+    built = []
+    provider = ModelProvider(lambda: built.append(object()) or built[-1])
+    assert not provider.loaded
+    assert built == []
+    model = provider.get()
+    assert provider.loaded
+    assert provider.get() is model
+    assert len(built) == 1
+
+
+def test_concurrent_first_gets_build_one_model():
+    built = []
+    
+    def factory():
+        time.sleep(0.01)
+        built.append(object())
+        return built[-1]
+    
+    provider = ModelProvider(factory)
+    models = []
+    threads = [threading.Thread(target=lambda: models.append(provider.get())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(built) == 1
+    assert all(model is built[0] for model in models)
+
+
+def test_reset_and_fork_drop_the_model():
+    provider = ModelProvider(object)
+    first = provider.get()
+    provider.reset()
+    assert not provider.loaded
+    second = provider.get()
+    assert second is not first
+    
+    model_provider._reset_after_fork()
+    assert not provider.loaded
+    assert provider.get() is not second
+
+
+def test_genai_provider_wraps_the_model_unless_told_not_to(monkeypatch):
+    raw = object()
+    monkeypatch.setattr(model_provider, 'genai_model', lambda model_name, api_key: raw)
+    
+    wrapped = GenAIProvider(client_options={"timeout": 3.0, "retries": 0}).get()
+    try:
+        assert isinstance(wrapped, ResilientModel)
+        assert wrapped.model is raw
+        assert (wrapped.timeout, wrapped.retries) == (3.0, 0)
+    finally:
+        wrapped.close()
+    
+    assert GenAIProvider(resilient=False).get() is raw
@@ -0,0 +1,78 @@
+import pytest
+
+from response_templates import ENGLISH, LOCALES, ReplyTemplates, VersionedDict, indian_amount, register_locale
+
+ACCOUNT = {"account_number": "12345678", "customer_name": "John Doe", "account_type": "Savings",
+           "balance": 1234567.5, "email": "john@example.com", "phone": "+91-9876543210", "version": 3}
+ROWS = [{"date": "2024-01-01", "type": "Debit", "amount": 1500.0, "description": "Groceries"},
+        {"date": "2024-01-02", "type": "Credit", "amount": 25.25, "description": "Refund"}]
+
+
+@pytest.mark.parametrize("name", ["balance", "account_details"])
+def test_account_replies_match_their_texts(name):
+    expected = ENGLISH[name].format(**{**ACCOUNT, "balance": "1,234,567.50"})
+    assert ReplyTemplates().account(name, ACCOUNT) == expected
+
+
+def test_transaction_lines_match_their_text():
+    expected = [ENGLISH["transactions_header"].format(account_number="12345678")] + [
+        ENGLISH["transaction_line"].format(**{**row, "amount": f"{row['amount']:,.2f}"}) for row in ROWS]
+    assert ReplyTemplates().transactions("12345678", ROWS) == expected
+
+
+def test_overridden_texts_fall_back_to_str_format():
+    register_locale('test-xx', {"balance": "{customer_name}: {balance}",
+                                "transaction_line": "{date}|{type}|{amount}|{description}\n"},
+                    format_amount=indian_amount)
+    try:
+        replies = ReplyTemplates('test-xx')
+        assert replies.account("balance", ACCOUNT) == "John Doe: 12,34,567.50"
+        assert replies.transactions("1", ROWS)[1:] == ["2024-01-01|Debit|1,500.00|Groceries\n",
+                                                       "2024-01-02|Credit|25.25|Refund\n"]
+        # Texts the locale didn't override keep the base locale's
+        assert replies["menu"] == ENGLISH["menu"]
+    finally:
+        del LOCALES['test-xx']
+
+
+def test_unknown_locale():
+    with pytest.raises(ValueError):
+        ReplyTemplates('xx')
+
+
+def test_rates_table_is_rebuilt_only_when_the_rates_change():
+    rates = VersionedDict(home_loan=8.75)
+    replies = ReplyTemplates()
+    first = replies.rates(rates)
+    assert replies.rates(rates) is first
+    rates |= {"car_loan": 9.25}
+    assert replies.rates(rates)[1:] == ("• Home Loan: 8.75% per annum\n", "• Car Loan: 9.25% per annum\n")
+
+
+def test_plain_dict_rates_are_rebuilt_every_time():
+    rates = {"home_loan": 8.75}
+    replies = ReplyTemplates()
+    replies.rates(rates)
+    rates["home_loan"] = 9.0
+    assert replies.rates(rates)[1] == "• Home Loan: 9.0% per annum\n"
+
+
+def test_versioned_dict_counts_only_real_changes():
+    rates = VersionedDict(a=1)
+    rates.update({})
+    rates.setdefault("a", 2)
+    rates.pop("missing", None)
+    VersionedDict().clear()
+    assert rates.version == 0
+    rates["a"] = 2
+    rates.update(b=3)
+    rates |= {"c": 4}
+    del rates["c"]
+    rates.pop("b")
+    assert rates.version == 5
+
+
+def test_indian_amount_grouping():
+    assert indian_amount(1234567.5) == "12,34,567.50"
+    assert indian_amount(-999.0) == "-999.00"
+    assert indian_amount(100000) == "1,00,000.00"
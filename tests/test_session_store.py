@@ -0,0 +1,127 @@
+import asyncio
+
+import pytest
+
+from resp_client import ConnectionPool
+from session_store import RedisSessionStore, SessionConflict, pack, unpack
+from sessions import merge_context
+from tests.fake_redis_server import FakeRedisServer
+
+
+@pytest.fixture
+def server():
+    with FakeRedisServer() as server:
+        yield server
+
+
+def make_store(server, **kwargs) -> RedisSessionStore:
+    return RedisSessionStore(ConnectionPool(*server.address), backoff=0, **kwargs)
+
+
+@pytest.mark.parametrize("value", [
+    None, True, False, 0, 1, -1, 2 ** 70, -(2 ** 70), 1.5, -0.25, "", "₹ 1,50,000",
+    [], [1, "two", None], {}, {"account_number": "12345678", "loan_amount": 500000.0,
+                               "nested": {"list": [True, False], "n": -300}},
+])
+def test_pack_round_trip(value):
+    assert unpack(pack(value)) == value
+
+
+def test_pack_rejects_unknown_types():
+    with pytest.raises(TypeError):
+        pack({"when": object()})
+
+
+@pytest.mark.parametrize("data", [b"", b"\x02\x00", pack(1) + b"\x00", b"\x01\x09", b"\x01\x05\x03\xff\xfe\xfd"])
+def test_unpack_rejects_bad_input(data):
+    with pytest.raises(ValueError):
+        unpack(data)
+
+
+def test_unpack_rejects_every_truncation():
+    data = pack({"a": [1, 2 ** 70, "xyz", 1.5], "b": {"c": None, "d": -3}})
+    for end in range(len(data)):
+        with pytest.raises(ValueError):
+            unpack(data[:end])
+
+
+def test_failed_call_returns_its_connection_to_the_pool(server):
+    store = make_store(server)
+    
+    def explode(*args):
+        raise KeyboardInterrupt
+    
+    connection = store.pool.acquire()
+    connection.execute = explode
+    store.pool.release(connection)
+    released = []
+    release = store.pool.release
+    store.pool.release = lambda connection, broken=False: released.append(broken) or release(connection, broken)
+    with pytest.raises(KeyboardInterrupt):
+        store.get("s1")
+    # Given back as broken, so it is closed rather than leaked or reused mid-reply
+    assert released == [True]
+    assert store.get("s1").user_context == {}
+    assert released == [True, False]
+
+
+def test_merge_applies_only_my_changes():
+    base = {"a": 1, "b": 2, "c": 3}
+    latest = {"a": 1, "b": 20, "c": 3, "d": 4}
+    mine = {"a": 10, "b": 2}
+    assert merge_context(latest, base, mine) == {"a": 10, "b": 20, "d": 4}
+
+
+def test_get_and_update_round_trip(server):
+    store = make_store(server)
+    session = store.get("s1")
+    assert session.user_context == {}
+    session.user_context["account_number"] = "12345678"
+    session.conversation_history.append({"user": "hi", "bot": "hello"})
+    store.update(session)
+    assert store.get("s1").user_context == {"account_number": "12345678"}
+    assert store.history("s1") == [{"user": "hi", "bot": "hello"}]
+    assert store.stats["created"] == 1 and store.stats["saved"] == 1
+
+
+def test_conflict_is_merged_and_retried(server):
+    first, second = make_store(server), make_store(server)
+    mine = first.get("s1")
+    theirs = second.get("s1")
+    theirs.user_context["loan_type"] = "Home Loan"
+    second.update(theirs)
+    mine.user_context["account_number"] = "12345678"
+    first.update(mine)
+    assert first.stats["conflicts"] == 1
+    assert first.get("s1").user_context == {"loan_type": "Home Loan", "account_number": "12345678"}
+
+
+def test_conflict_past_max_retries_raises(server):
+    first, second = make_store(server, max_retries=0), make_store(server)
+    mine = first.get("s1")
+    theirs = second.get("s1")
+    second.update(theirs)
+    with pytest.raises(SessionConflict):
+        first.update(mine)
+
+
+def test_release_forgets_the_session(server):
+    store = make_store(server)
+    session = store.get("s1")
+    store.release(session)
+    session.user_context["x"] = 1
+    store.update(session)
+    assert store.get("s1").user_context == {}
+    assert store.stats["released"] == 1
+
+
+def test_async_get_and_update(server):
+    store = make_store(server)
+    
+    async def turn():
+        session = await store.aget("s1")
+        session.user_context["card_type"] = "debit"
+        await store.aupdate(session)
+    
+    asyncio.run(turn())
+    assert store.get("s1").user_context == {"card_type": "debit"}
@@ -0,0 +1,112 @@
+import logging
+import threading
+
+from sessions import SessionManager
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_turns_work_on_their_own_copy():
+    manager = SessionManager()
+    turn = manager.get("s1")
+    turn.user_context["account_number"] = "12345678"
+    assert manager.get("s1").user_context == {}
+    manager.update(turn)
+    assert manager.get("s1").user_context == {"account_number": "12345678"}
+
+
+def test_concurrent_turns_on_one_session_are_merged():
+    manager = SessionManager()
+    first, second = manager.get("s1"), manager.get("s1")
+    first.user_context["loan_type"] = "Home Loan"
+    second.user_context["account_number"] = "12345678"
+    first.conversation_history.append({"user": "a"})
+    second.conversation_history.append({"user": "b"})
+    manager.update(first)
+    manager.update(second)
+    assert manager.get("s1").user_context == {"loan_type": "Home Loan", "account_number": "12345678"}
+    assert list(manager._sessions["s1"].conversation_history) == [{"user": "a"}, {"user": "b"}]
+    assert manager.stats["conflicts"] == 1
+
+
+def test_threads_on_one_session_lose_no_fields():
+    manager = SessionManager()
+    
+    def run(writer: int):
+        for i in range(200):
+            turn = manager.get("shared")
+            turn.user_context[f"writer_{writer}"] = i
+            manager.update(turn)
+    
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert manager.get("shared").user_context == {f"writer_{i}": 199 for i in range(8)}
+
+
+def test_released_turn_is_not_saved():
+    manager = SessionManager()
+    turn = manager.get("s1")
+    turn.user_context["x"] = 1
+    manager.release(turn)
+    manager.update(turn)
+    assert manager.get("s1").user_context == {}
+
+
+def test_update_after_eviction_is_counted_and_logged(caplog):
+    clock = FakeClock()
+    manager = SessionManager(idle_ttl=10, clock=clock)
+    turn = manager.get("s1")
+    turn.user_context["x"] = 1
+    clock.now = 11
+    manager.get("s2")
+    with caplog.at_level(logging.WARNING, logger='sessions'):
+        manager.update(turn)
+    assert manager.stats["lost_updates"] == 1
+    assert "s1" in caplog.records[0].getMessage()
+    assert "s1" not in manager
+
+
+def test_idle_sessions_expire():
+    clock = FakeClock()
+    manager = SessionManager(idle_ttl=10, clock=clock)
+    manager.get("s1")
+    clock.now = 5
+    manager.get("s2")
+    clock.now = 12
+    assert manager.evict_expired() == 1
+    assert "s1" not in manager and "s2" in manager
+
+
+def test_lru_and_memory_caps():
+    manager = SessionManager(max_sessions=2)
+    for session_id in ("a", "b", "a", "c"):
+        manager.update(manager.get(session_id))
+    assert "b" not in manager and {"a", "c"} <= set(manager._sessions)
+    assert manager.stats["evicted_lru"] == 1
+    
+    manager = SessionManager(max_memory_bytes=5000)
+    for i in range(3):
+        turn = manager.get(f"s{i}")
+        turn.user_context["notes"] = "x" * 2000
+        manager.update(turn)
+    assert manager.stats["evicted_memory"] >= 1
+    assert manager.memory_bytes <= 5000
+    assert manager.memory_bytes == sum(session.approx_bytes for session in manager._sessions.values())
+
+
+def test_history_is_capped():
+    manager = SessionManager(history_limit=3)
+    for i in range(5):
+        turn = manager.get("s1")
+        turn.conversation_history.append({"turn": i})
+        manager.update(turn)
+    assert [turn["turn"] for turn in manager._sessions["s1"].conversation_history] == [2, 3, 4]
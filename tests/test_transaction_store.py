@@ -0,0 +1,85 @@
+import threading
+from datetime import date, timedelta
+
+from transaction_store import TransactionStore
+
+TODAY = date(2024, 6, 30)
+
+
+def day(days_ago: int) -> str:
+    return (TODAY - timedelta(days=days_ago)).isoformat()
+
+
+def make_store() -> TransactionStore:
+    store = TransactionStore()
+    for days_ago, description in [(10, "b"), (40, "a"), (1, "d"), (10, "c"), (0, "e")]:
+        store.add("1", day(days_ago), "Debit", float(days_ago), description)
+    return store
+
+
+def descriptions(rows):
+    return [row["description"] for row in rows]
+
+
+def test_rows_added_out_of_order_come_back_newest_first():
+    assert descriptions(make_store().recent("1", as_of=TODAY)) == ["e", "d", "c", "b", "a"]
+
+
+def test_recent_window_limit_and_offset():
+    store = make_store()
+    assert descriptions(store.recent("1", days=10, as_of=TODAY)) == ["e", "d", "c", "b"]
+    assert descriptions(store.recent("1", limit=2, as_of=TODAY)) == ["e", "d"]
+    assert descriptions(store.recent("1", limit=2, offset=3, as_of=TODAY)) == ["b", "a"]
+    assert store.recent("1", offset=10, as_of=TODAY) == []
+    assert store.recent("2", as_of=TODAY) == []
+
+
+def test_rows_after_as_of_are_left_out():
+    assert descriptions(make_store().recent("1", as_of=TODAY - timedelta(days=5))) == ["c", "b", "a"]
+
+
+def test_date_range_and_pages():
+    store = make_store()
+    assert descriptions(store.date_range("1", day(10), day(1))) == ["d", "c", "b"]
+    assert [descriptions(store.page("1", page, 2)) for page in range(4)] == [["e", "d"], ["c", "b"], ["a"], []]
+
+
+def test_rows_are_fresh_dicts():
+    store = make_store()
+    store.recent("1", as_of=TODAY)[0]["amount"] = 99.0
+    assert store.recent("1", as_of=TODAY)[0] == {"date": day(0), "type": "Debit", "amount": 0.0,
+                                                 "description": "e"}
+
+
+def test_load_records_and_count():
+    store = TransactionStore()
+    loaded = store.load_records({"account_number": str(i % 2), "date": day(i), "type": "Credit", "amount": i,
+                                 "description": "x"} for i in range(6))
+    assert loaded == len(store) == 6
+    assert store.count("0") == 3 and "1" in store
+
+
+def test_reads_see_consistent_rows_while_writers_insert():
+    store = TransactionStore()
+    errors = []
+    done = threading.Event()
+    
+    def write():
+        for i in range(3000):
+            # Amount mirrors the date, so a row stitched from misaligned columns would show
+            store.add("1", day(i % 50), "Debit", float(i % 50), "x")
+        done.set()
+    
+    def read():
+        while not done.is_set():
+            for row in store.recent("1", limit=20, as_of=TODAY):
+                if row["date"] != day(int(row["amount"])):
+                    errors.append(row)
+    
+    threads = [threading.Thread(target=write), threading.Thread(target=read)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert store.count("1") == 3000
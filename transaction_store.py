@@ -0,0 +1,171 @@
+import csv
+import json
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, time as datetime_time, timedelta
+from typing import Dict, Iterable, List, Optional
+
+
+class _AccountColumns:
+    """Column arrays for one account's transactions, kept sorted by date ordinal"""
+    
+    __slots__ = ('dates', 'amounts', 'types', 'descriptions')
+    
+    def __init__(self):
+        self.dates = array('i')
+        self.amounts = array('d')
+        self.types = array('B')
+        self.descriptions = array('I')
+
+
+class TransactionStore:
+    """Array-backed, date-indexed transaction history per account
+
+    Rows are stored as parallel columns (date ordinal, amount, type code and an
+    interned description id) kept sorted by date as they are added, so date
+    ranges, the most recent k transactions and pages are located by binary
+    search and only the rows returned are turned back into dicts. Writers insert
+    under a lock; readers take it only to find and copy their slice, and never
+    change the columns.
+    """
+    
+    def __init__(self):
+        self._accounts: Dict[str, _AccountColumns] = {}
+        # Interned values: a handful of transaction types, and descriptions that repeat heavily
+        self._types: List[str] = []
+        self._type_ids: Dict[str, int] = {}
+        self._descriptions: List[str] = []
+        self._description_ids: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._ordinals: Dict[str, int] = {}
+        self._iso_dates: Dict[int, str] = {}
+        # Today's ordinal, and the time.time() at which it stops being today
+        self._today = (0, 0.0)
+    
+    def __len__(self) -> int:
+        return sum(len(columns.dates) for columns in list(self._accounts.values()))
+    
+    def __contains__(self, account_number: str) -> bool:
+        return account_number in self._accounts
+    
+    def count(self, account_number: str) -> int:
+        columns = self._accounts.get(account_number)
+        return len(columns.dates) if columns else 0
+    
+    def add(self, account_number: str, date_iso: str, txn_type: str, amount: float, description: str):
+        """Add one transaction, after any others on the same date"""
+        with self._lock:
+            self._insert(account_number, date_iso, txn_type, amount, description)
+    
+    def _insert(self, account_number: str, date_iso: str, txn_type: str, amount: float, description: str):
+        """add() with the lock already held"""
+        ordinal = self._ordinal(date_iso)
+        type_id = self._intern(txn_type, self._types, self._type_ids)
+        description_id = self._intern(description, self._descriptions, self._description_ids)
+        columns = self._accounts.get(account_number)
+        if columns is None:
+            columns = self._accounts[account_number] = _AccountColumns()
+        if not columns.dates or ordinal >= columns.dates[-1]:
+            columns.dates.append(ordinal)
+            columns.amounts.append(float(amount))
+            columns.types.append(type_id)
+            columns.descriptions.append(description_id)
+        else:
+            position = bisect_right(columns.dates, ordinal)
+            columns.dates.insert(position, ordinal)
+            columns.amounts.insert(position, float(amount))
+            columns.types.insert(position, type_id)
+            columns.descriptions.insert(position, description_id)
+    
+    def load_records(self, records: Iterable[Dict]) -> int:
+        """Bulk load dicts with account_number, date, type, amount and description"""
+        loaded = 0
+        with self._lock:
+            for record in records:
+                self._insert(record['account_number'], record['date'], record['type'],
+                             record['amount'], record['description'])
+                loaded += 1
+        return loaded
+    
+    def load_csv(self, path: str) -> int:
+        """Bulk load a CSV file with a header row naming the record fields"""
+        with open(path, newline='', encoding='utf-8') as f:
+            return self.load_records(csv.DictReader(f))
+    
+    def load_jsonl(self, path: str) -> int:
+        """Bulk load a file of one JSON record per line"""
+        with open(path, encoding='utf-8') as f:
+            return self.load_records(json.loads(line) for line in f if line.strip())
+    
+    def date_range(self, account_number: str, start: Optional[str] = None, end: Optional[str] = None,
+                   limit: Optional[int] = None, offset: int = 0) -> List[Dict]:
+        """Transactions dated start..end inclusive, most recent first, paginated by offset/limit"""
+        return self._rows(account_number, self._ordinal(start) if start else None,
+                          self._ordinal(end) if end else None, limit, offset)
+    
+    def recent(self, account_number: str, days: Optional[int] = None, limit: Optional[int] = None,
+               offset: int = 0, as_of: Optional[date] = None) -> List[Dict]:
+        """The last `days` days of transactions up to as_of (default today), most recent first"""
+        end = as_of.toordinal() if as_of else self._today_ordinal()
+        start = end - days if days is not None else None
+        return self._rows(account_number, start, end, limit, offset)
+    
+    def page(self, account_number: str, page: int, page_size: int = 20) -> List[Dict]:
+        """One page of the full history, most recent first, counting pages from 0"""
+        return self._rows(account_number, None, None, page_size, page * page_size)
+    
+    def _rows(self, account_number: str, start: Optional[int], end: Optional[int], limit: Optional[int],
+              offset: int) -> List[Dict]:
+        """Rows dated start..end ordinals, newest first, skipping offset and at most `limit` of them"""
+        with self._lock:
+            columns = self._accounts.get(account_number)
+            if columns is None:
+                return []
+            dates = columns.dates
+            lo = bisect_left(dates, start) if start is not None else 0
+            # Usually nothing is dated after the end, and the rows wanted are a plain tail slice
+            hi = len(dates) if end is None or (dates and dates[-1] <= end) else bisect_right(dates, end)
+            hi -= offset
+            if limit is not None:
+                lo = max(lo, hi - limit)
+            if lo >= hi:
+                return []
+            dates = dates[lo:hi]
+            amounts = columns.amounts[lo:hi]
+            types = columns.types[lo:hi]
+            descriptions = columns.descriptions[lo:hi]
+        iso_dates, type_names, description_texts = self._iso_dates, self._types, self._descriptions
+        rows = [
+            {"date": iso_dates[ordinal], "type": type_names[type_id], "amount": amount,
+             "description": description_texts[description_id]}
+            for ordinal, amount, type_id, description_id in zip(dates, amounts, types, descriptions)
+        ]
+        rows.reverse()
+        return rows
+    
+    def _intern(self, value: str, values: List[str], ids: Dict[str, int]) -> int:
+        value_id = ids.get(value)
+        if value_id is None:
+            value_id = ids[value] = len(values)
+            values.append(value)
+        return value_id
+    
+    def _ordinal(self, date_iso: str) -> int:
+        ordinal = self._ordinals.get(date_iso)
+        if ordinal is None:
+            day = date.fromisoformat(date_iso)
+            ordinal = day.toordinal()
+            # Every stored ordinal has its ISO date ready, so reads only look it up
+            self._iso_dates.setdefault(ordinal, day.isoformat())
+            self._ordinals[date_iso] = ordinal
+        return ordinal
+    
+    def _today_ordinal(self) -> int:
+        ordinal, expires = self._today
+        if time.time() >= expires:
+            today = date.today()
+            ordinal = today.toordinal()
+            self._today = (ordinal, datetime.combine(today + timedelta(days=1), datetime_time()).timestamp())
+        return ordinal